@@ -0,0 +1,558 @@
+"""
+Batch Jobs
+==========
+
+Asynchronous scoring of large catalog uploads.
+
+Submitting a CSV creates a job and returns its ID right away. The upload is
+spooled to disk and a small pool of job workers parses and scores it in
+fixed-size row chunks. Each chunk's per-row results and the job's progress
+are committed to a local SQLite database in one transaction, so clients can
+page through partial results while the job runs, and a job interrupted by a
+restart resumes after its last committed chunk.
+
+Several server processes can share one job directory (see ``prefork``). A
+job is scored by the process that claims it: each ``BatchJobManager`` claims
+jobs under an owner token of its process ID and a per-server nonce, and
+releases them when it stops in the middle of a job.
+
+Jobs are deduplicated by the SHA-256 of the upload, the mission and the
+fingerprint of the model serving it: resubmitting a catalog that is queued,
+running or already completed returns the existing job (and its stored
+results) instead of scoring it again.
+
+Job workers are separate from the request executor, so a long catalog never
+occupies the slots that interactive requests are admitted to.
+
+Author: Felipe Coutinho
+NASA Space Apps Challenge 2025
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+JOB_STATUSES = ("queued", "running", "completed", "failed")
+
+# Statuses whose job can stand in for a resubmission of the same upload
+REUSABLE_STATUSES = ("queued", "running", "completed")
+
+COUNT_COLUMNS = ("total", "successful", "exoplanets", "false_positives")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    dedup_key TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    mission TEXT NOT NULL,
+    model_fingerprint TEXT,
+    filename TEXT,
+    upload_path TEXT,
+    upload_bytes INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    error TEXT,
+    total INTEGER NOT NULL DEFAULT 0,
+    successful INTEGER NOT NULL DEFAULT 0,
+    exoplanets INTEGER NOT NULL DEFAULT 0,
+    false_positives INTEGER NOT NULL DEFAULT 0,
+    chunks INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL,
+    started_at TEXT,
+    finished_at TEXT,
+    owner TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_dedup_key ON jobs (dedup_key, status);
+CREATE TABLE IF NOT EXISTS results (
+    job_id TEXT NOT NULL,
+    row_index INTEGER NOT NULL,
+    result TEXT NOT NULL,
+    PRIMARY KEY (job_id, row_index)
+) WITHOUT ROWID;
+"""
+
+
+class UnknownJobError(KeyError):
+    """Raised when a job ID does not exist."""
+
+
+class JobStore:
+    """
+    SQLite persistence of jobs, their progress and per-row results.
+
+    One connection is shared by all threads and serialized with a lock;
+    the database runs in WAL mode so committed chunks are durable.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open (or create) the job database.
+
+        Args:
+            path: SQLite database file
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+            columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+            if "owner" not in columns:
+                # Databases created before jobs were claimed
+                self._conn.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")
+
+    def create_job(self, job: Dict[str, Any]) -> None:
+        """
+        Insert a new job.
+
+        Args:
+            job: Column values; ``job_id``, ``dedup_key``, ``content_hash``,
+                 ``mission`` and ``upload_bytes`` are required
+        """
+        record = dict(job, status="queued", created_at=datetime.now().isoformat())
+        columns = ", ".join(record)
+        placeholders = ", ".join(f":{column}" for column in record)
+        with self._lock, self._conn:
+            self._conn.execute(f"INSERT INTO jobs ({columns}) VALUES ({placeholders})", record)
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Return a job, or None if it does not exist.
+
+        Args:
+            job_id: Job ID
+
+        Returns:
+            Optional[Dict]: Job columns
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return dict(row) if row is not None else None
+
+    def find_reusable(self, dedup_key: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the most recent queued, running or completed job for a key.
+
+        Args:
+            dedup_key: Upload, mission and model identity
+
+        Returns:
+            Optional[Dict]: Job columns, or None
+        """
+        placeholders = ", ".join("?" for _ in REUSABLE_STATUSES)
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT * FROM jobs WHERE dedup_key = ? AND status IN ({placeholders}) "
+                "ORDER BY created_at DESC LIMIT 1",
+                (dedup_key, *REUSABLE_STATUSES)
+            ).fetchone()
+        return dict(row) if row is not None else None
+
+    def unfinished_jobs(self) -> List[Dict[str, Any]]:
+        """Queued and running jobs, oldest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM jobs WHERE status IN ('queued', 'running') ORDER BY created_at"
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def claim(self, job_id: str, owner: str) -> bool:
+        """
+        Mark an unfinished job running under ``owner``, unless another owner
+        holds it.
+
+        Args:
+            job_id: Job ID
+            owner: Claiming process's owner token
+
+        Returns:
+            bool: True if ``owner`` now holds the job
+        """
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = 'running', started_at = COALESCE(started_at, ?), owner = ? "
+                "WHERE job_id = ? AND status IN ('queued', 'running') AND (owner IS NULL OR owner = ?)",
+                (datetime.now().isoformat(), owner, job_id, owner)
+            )
+        return cursor.rowcount == 1
+
+    def release(self, owner: Optional[str] = None, job_id: Optional[str] = None) -> int:
+        """
+        Release job claims so that another process can resume the jobs.
+
+        Args:
+            owner: Only release this owner's claims (default: every owner)
+            job_id: Only release this job
+
+        Returns:
+            int: Claims released
+        """
+        conditions, parameters = ["owner IS NOT NULL"], []
+        if owner is not None:
+            conditions.append("owner = ?")
+            parameters.append(owner)
+        if job_id is not None:
+            conditions.append("job_id = ?")
+            parameters.append(job_id)
+        with self._lock, self._conn:
+            cursor = self._conn.execute(f"UPDATE jobs SET owner = NULL WHERE {' AND '.join(conditions)}", parameters)
+        return cursor.rowcount
+
+    def save_chunk(self, job_id: str, results: List[Dict[str, Any]], counts: Dict[str, int]) -> None:
+        """
+        Store a scored chunk and advance the job's progress atomically.
+
+        Args:
+            job_id: Job ID
+            results: Per-row results, each with a ``row_index``
+            counts: Chunk counts for the keys in ``COUNT_COLUMNS``
+        """
+        assignments = ", ".join(f"{column} = {column} + :{column}" for column in COUNT_COLUMNS)
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO results (job_id, row_index, result) VALUES (?, ?, ?)",
+                [(job_id, result["row_index"], json.dumps(result)) for result in results]
+            )
+            self._conn.execute(
+                f"UPDATE jobs SET {assignments}, chunks = chunks + 1 WHERE job_id = :job_id",
+                dict({column: counts[column] for column in COUNT_COLUMNS}, job_id=job_id)
+            )
+
+    def finish(self, job_id: str, status: str, error: Optional[str] = None) -> None:
+        """
+        Mark a job completed or failed.
+
+        Args:
+            job_id: Job ID
+            status: "completed" or "failed"
+            error: Failure message
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished_at = ?, upload_path = NULL WHERE job_id = ?",
+                (status, error, datetime.now().isoformat(), job_id)
+            )
+
+    def get_results(self, job_id: str, offset: int = 0, limit: int = 1000) -> List[Dict[str, Any]]:
+        """
+        Return a page of stored results in row order.
+
+        Args:
+            job_id: Job ID
+            offset: Results to skip
+            limit: Maximum results returned
+
+        Returns:
+            List[Dict]: Per-row results
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT result FROM results WHERE job_id = ? ORDER BY row_index LIMIT ? OFFSET ?",
+                (job_id, limit, offset)
+            ).fetchall()
+        return [json.loads(row["result"]) for row in rows]
+
+    def count_by_status(self) -> Dict[str, int]:
+        """Number of jobs per status."""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) AS jobs FROM jobs GROUP BY status").fetchall()
+        counts = {status: 0 for status in JOB_STATUSES}
+        counts.update({row["status"]: row["jobs"] for row in rows})
+        return counts
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class BatchJobManager:
+    """
+    Accepts catalog uploads as jobs and scores them on background workers.
+
+    The database and upload directory are created on first use.
+    """
+
+    def __init__(self, directory: str, get_model: Callable[[str], Any],
+                 required_columns: Callable[[Any], List[str]],
+                 read_batches: Callable[[BinaryIO, int], Any],
+                 format_results: Callable[[Any, Any, Dict[str, Any]], List[Dict[str, Any]]],
+                 workers: int = 1, chunk_rows: int = 5000):
+        """
+        Initialize the manager.
+
+        Args:
+            directory: Directory holding ``jobs.sqlite3`` and spooled uploads
+            get_model: Returns the detector serving a mission
+            required_columns: Columns an upload must have for a detector
+            read_batches: Yields DataFrames of ``chunk_rows`` rows from a
+                          binary CSV file object
+            format_results: Builds per-row results from a detector, a chunk
+                            and its ``predict_batch`` output
+            workers: Jobs scored concurrently
+            chunk_rows: Rows parsed, scored and committed together
+        """
+        self.directory = directory
+        self.db_path = os.path.join(directory, "jobs.sqlite3")
+        self.upload_dir = os.path.join(directory, "uploads")
+        self.get_model = get_model
+        self.required_columns = required_columns
+        self.read_batches = read_batches
+        self.format_results = format_results
+        self.workers = workers
+        self.chunk_rows = chunk_rows
+
+        self._store: Optional[JobStore] = None
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._init_lock = threading.Lock()
+        self._stopping = threading.Event()
+        # Shared by the processes forked from this manager, not by restarts
+        self._nonce = uuid.uuid4().hex[:12]
+
+    def owner(self, pid: Optional[int] = None) -> str:
+        """
+        Owner token under which a process claims jobs.
+
+        Args:
+            pid: Process ID (default: the current process)
+
+        Returns:
+            str: Token unique to the process within this server run
+        """
+        return f"{pid or os.getpid()}-{self._nonce}"
+
+    @property
+    def store(self) -> JobStore:
+        """The job database, opened on first use."""
+        with self._init_lock:
+            if self._store is None:
+                os.makedirs(self.upload_dir, exist_ok=True)
+                self._store = JobStore(self.db_path)
+            return self._store
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        with self._init_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="batch-job")
+            return self._pool
+
+    def submit(self, source: BinaryIO, filename: str, mission: str) -> Tuple[Dict[str, Any], bool]:
+        """
+        Spool an upload to disk and queue it, unless an equivalent job exists.
+
+        Args:
+            source: Binary file object with the CSV upload
+            filename: Client-side file name
+            mission: Registered model scoring the job
+
+        Returns:
+            Tuple[Dict, bool]: The job and whether it was an existing
+                               (deduplicated) one
+
+        Raises:
+            ValueError: If the upload is empty or lacks required columns
+        """
+        import pandas as pd
+
+        store = self.store
+        job_id = uuid.uuid4().hex
+        upload_path = os.path.join(self.upload_dir, f"{job_id}.csv")
+        digest = hashlib.sha256()
+        upload_bytes = 0
+        with open(upload_path, "wb") as f:
+            for block in iter(lambda: source.read(1024 * 1024), b""):
+                digest.update(block)
+                f.write(block)
+                upload_bytes += len(block)
+
+        try:
+            model = self.get_model(mission)
+            dedup_key = f"{digest.hexdigest()}:{mission}:{model.fingerprint}"
+            existing = store.find_reusable(dedup_key)
+            if existing is not None:
+                os.remove(upload_path)
+                logger.info(f"Upload {filename} matches job {existing['job_id']}")
+                return existing, True
+
+            try:
+                columns = pd.read_csv(upload_path, comment="#", nrows=0).columns
+            except (pd.errors.EmptyDataError, UnicodeDecodeError) as e:
+                raise ValueError(f"Could not read the CSV header: {e}")
+            missing_columns = set(self.required_columns(model)) - set(columns)
+            if missing_columns:
+                raise ValueError(f"Missing required columns: {list(missing_columns)}")
+        except BaseException:
+            os.remove(upload_path)
+            raise
+
+        store.create_job({
+            "job_id": job_id,
+            "dedup_key": dedup_key,
+            "content_hash": digest.hexdigest(),
+            "mission": mission,
+            "model_fingerprint": model.fingerprint,
+            "filename": filename,
+            "upload_path": upload_path,
+            "upload_bytes": upload_bytes
+        })
+        self._get_pool().submit(self._run, job_id)
+        logger.info(f"Queued job {job_id} for {filename} ({upload_bytes} bytes)")
+        return store.get_job(job_id), False
+
+    def resume(self, release: bool = True) -> int:
+        """
+        Requeue jobs left unfinished by a previous process.
+
+        Does nothing (and creates nothing) if no job database exists yet.
+
+        Args:
+            release: Release every claim first. Only correct when no other
+                     process is scoring jobs from the same directory; the
+                     workers of a pre-fork server pass False and leave it to
+                     the parent (see ``release_claims``)
+
+        Returns:
+            int: Jobs requeued; those claimed by a live process are skipped
+                 when their turn comes
+        """
+        if not os.path.exists(self.db_path):
+            return 0
+        if release:
+            self.store.release()
+        jobs = self.store.unfinished_jobs()
+        for job in jobs:
+            self._get_pool().submit(self._run, job["job_id"])
+        if jobs:
+            logger.info(f"Resuming {len(jobs)} unfinished batch jobs")
+        return len(jobs)
+
+    def release_claims(self, owner: Optional[str] = None) -> int:
+        """
+        Release job claims from outside the job workers, e.g. those of a
+        pre-fork worker that exited, so that the next ``resume`` picks the
+        jobs up.
+
+        Uses a short-lived connection, so it is safe in a process that forks
+        afterwards.
+
+        Args:
+            owner: Owner token (default: every owner)
+
+        Returns:
+            int: Claims released
+        """
+        if not os.path.exists(self.db_path):
+            return 0
+        store = JobStore(self.db_path)
+        try:
+            return store.release(owner)
+        finally:
+            store.close()
+
+    def get_job(self, job_id: str) -> Dict[str, Any]:
+        """
+        Return a job.
+
+        Raises:
+            UnknownJobError: If the job does not exist
+        """
+        job = self.store.get_job(job_id)
+        if job is None:
+            raise UnknownJobError(job_id)
+        return job
+
+    def get_results(self, job_id: str, offset: int = 0, limit: int = 1000) -> List[Dict[str, Any]]:
+        """
+        Return a page of a job's results (partial while it runs).
+
+        Raises:
+            UnknownJobError: If the job does not exist
+        """
+        self.get_job(job_id)
+        return self.store.get_results(job_id, offset, limit)
+
+    def _run(self, job_id: str) -> None:
+        """Score a job chunk by chunk, skipping rows committed before a restart."""
+        store = self.store
+        job = store.get_job(job_id)
+        if job is None or job["status"] not in ("queued", "running") or self._stopping.is_set():
+            return
+        owner = self.owner()
+        if not store.claim(job_id, owner):
+            logger.info(f"Job {job_id} is being scored by another process")
+            return
+
+        try:
+            model = self.get_model(job["mission"])
+            done = job["total"]
+            position = 0
+            with open(job["upload_path"], "rb") as f:
+                for df in self.read_batches(f, self.chunk_rows):
+                    if self._stopping.is_set():
+                        # Left running; resumed after the last committed chunk
+                        store.release(owner, job_id)
+                        return
+                    start, position = position, position + len(df)
+                    if position <= done:
+                        continue
+                    if start < done:
+                        df = df.iloc[done - start:]
+
+                    batch = model.predict_batch(df)
+                    if not batch["success"]:
+                        raise ValueError(batch["error"])
+                    error_mask = batch["error_mask"]
+                    predictions = batch["predictions"]
+                    counts = {
+                        "total": len(df),
+                        "successful": int((~error_mask).sum()),
+                        "exoplanets": int((predictions == 1).sum()),
+                        "false_positives": int(((predictions == 0) & ~error_mask).sum())
+                    }
+                    store.save_chunk(job_id, self.format_results(model, df, batch), counts)
+        except Exception as e:
+            logger.error(f"Batch job {job_id} failed: {e}")
+            store.finish(job_id, "failed", str(e))
+        else:
+            store.finish(job_id, "completed")
+            logger.info(f"Batch job {job_id} completed ({position} rows)")
+        if os.path.exists(job["upload_path"]):
+            os.remove(job["upload_path"])
+
+    def shutdown(self) -> None:
+        """
+        Stop accepting work and close the database.
+
+        Running jobs finish their current chunk; unfinished jobs resume on
+        the next start.
+        """
+        self._stopping.set()
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+        if self._store is not None:
+            self._store.close()
+            self._store = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return the job configuration and, once the database exists, counts
+        of jobs by status.
+
+        Returns:
+            Dict: Worker count, chunk size and jobs per status
+        """
+        stats: Dict[str, Any] = {"workers": self.workers, "chunk_rows": self.chunk_rows}
+        if self._store is not None:
+            stats["jobs"] = self._store.count_by_status()
+        return stats
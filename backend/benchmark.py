@@ -0,0 +1,476 @@
+"""
+Benchmarks
+==========
+
+Reproducible performance benchmarks for the exoplanet detector and API.
+
+Synthetic KOI tables are drawn from the Kepler cumulative catalog at each
+requested size: whole catalog rows are resampled with a fixed seed and their
+continuous features jittered, so the tables follow the catalog's joint
+distribution (including its missing values) without repeating rows. For
+every size the suite times:
+
+- in process: ``preprocess_data``, ``predict`` and ``predict_batch``
+- over HTTP through an in-process ASGI client: ``/predict``,
+  ``/predict-json`` and ``/predict-csv``
+
+Each case records throughput (rows per second), p50/p99 latency per call,
+the RSS when it started and its own peak RSS: the kernel's high-water mark
+is reset before every case (Linux only; elsewhere no peak is reported).
+Tables are generated one size at a time and freed afterwards, so smaller
+cases do not carry the memory of larger tables. Results are written as
+JSON. Against a stored baseline, cases whose throughput, p50 latency or peak
+RSS got worse by more than the tolerance are reported as regressions and
+the command exits with status 1.
+
+Usage:
+    python benchmark.py --output benchmark_results.json
+    python benchmark.py --sizes 1 100 10000 --baseline benchmark_baseline.json
+    python benchmark.py --save-baseline benchmark_baseline.json
+
+The prediction cache is disabled so repeated calls measure the model.
+
+Author: Felipe Coutinho
+NASA Space Apps Challenge 2025
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+backend_dir = Path(__file__).resolve().parent
+CATALOG = backend_dir / "cumulative_2025.10.04_14.14.53.csv"
+
+DEFAULT_SIZES = [1, 100, 10_000, 100_000, 1_000_000]
+
+IN_PROCESS_CASES = ["preprocess_data", "predict", "predict_batch"]
+HTTP_CASES = ["http_predict", "http_predict_json", "http_predict_csv"]
+
+# Relative standard deviation of the jitter applied to continuous features
+JITTER = 0.01
+
+# Calls made by per-candidate cases, whatever the table size
+MAX_SINGLE_CALLS = 1000
+MAX_HTTP_SINGLE_CALLS = 200
+
+# Whole-table HTTP cases above this size are skipped (the JSON request or
+# response would not fit comfortably in memory)
+MAX_HTTP_ROWS = 100_000
+
+# Whole-table cases repeat until they have run this long (or MAX_REPEATS)
+MIN_CASE_SECONDS = 1.0
+MAX_REPEATS = 20
+
+# Metrics compared against a baseline: (name, True if higher is better)
+COMPARED_METRICS = [
+    ("throughput_rows_per_s", True),
+    ("p50_ms", False),
+    ("peak_rss_mb", False)
+]
+
+
+def synthetic_catalog(n_rows: int, features: List[str], seed: int = 0,
+                      catalog_path: Path = CATALOG) -> pd.DataFrame:
+    """
+    Draw a synthetic KOI table from the distribution of the Kepler catalog.
+
+    Args:
+        n_rows: Rows to generate
+        features: Model feature columns
+        seed: Random seed; the same seed always gives the same table
+        catalog_path: Source catalog
+
+    Returns:
+        pd.DataFrame: Table with kepid, kepoi_name and the feature columns
+    """
+    source = pd.read_csv(catalog_path, comment="#", usecols=features)[features]
+    rng = np.random.default_rng(seed)
+
+    table = source.iloc[rng.integers(0, len(source), n_rows)].reset_index(drop=True)
+
+    # False-positive flags stay binary; everything else is jittered
+    continuous = [feature for feature in features if not feature.startswith("koi_fpflag")]
+    table[continuous] = table[continuous].to_numpy() * rng.normal(1.0, JITTER, (n_rows, len(continuous)))
+    if "koi_score" in table.columns:
+        table["koi_score"] = table["koi_score"].clip(0.0, 1.0)
+
+    table.insert(0, "kepid", np.arange(10_000_000, 10_000_000 + n_rows))
+    table.insert(1, "kepoi_name", [f"K{index:08d}.01" for index in range(n_rows)])
+    return table
+
+
+def json_records(table: pd.DataFrame) -> List[Dict]:
+    """Rows as JSON-ready dictionaries, with missing values as None (null)."""
+    return table.astype(object).where(table.notna(), None).to_dict("records")
+
+
+def memory_status() -> Dict[str, float]:
+    """Current (VmRSS) and peak (VmHWM) resident set size in MB, on Linux."""
+    status = {}
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(("VmRSS:", "VmHWM:")):
+                    name, value = line.split(":")
+                    status[name] = int(value.split()[0]) / 1024
+    except OSError:
+        pass
+    return status
+
+
+def reset_peak_rss() -> Optional[float]:
+    """
+    Start a new peak RSS measurement.
+
+    Writing 5 to /proc/self/clear_refs resets the kernel's high-water mark
+    to the current RSS, so the next ``peak_rss_mb`` covers only what ran in
+    between.
+
+    Returns:
+        Optional[float]: RSS in MB, or None where the peak cannot be reset
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        return None
+    return memory_status().get("VmRSS")
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak RSS in MB since the last ``reset_peak_rss``, where the platform reports it."""
+    return memory_status().get("VmHWM")
+
+
+def summarize(latencies: List[float], rows_per_call: int, rss_before_mb: Optional[float] = None) -> Dict:
+    """
+    Throughput and latency percentiles of a case.
+
+    Args:
+        latencies: Seconds per call
+        rows_per_call: Rows processed by each call
+        rss_before_mb: RSS when the case started, from ``reset_peak_rss``;
+                       None if the peak could not be reset, in which case
+                       no peak is reported
+
+    Returns:
+        Dict: Calls, rows, throughput, p50/p99/mean latency, and the RSS
+              before and peak RSS during the case
+    """
+    seconds = np.asarray(latencies)
+    total = float(seconds.sum())
+    return {
+        "calls": len(seconds),
+        "rows": len(seconds) * rows_per_call,
+        "seconds": total,
+        "throughput_rows_per_s": len(seconds) * rows_per_call / total if total else None,
+        "p50_ms": float(np.percentile(seconds, 50)) * 1000,
+        "p99_ms": float(np.percentile(seconds, 99)) * 1000,
+        "mean_ms": float(seconds.mean()) * 1000,
+        "rss_before_mb": rss_before_mb,
+        "peak_rss_mb": peak_rss_mb() if rss_before_mb is not None else None
+    }
+
+
+def time_calls(call: Callable, arguments: List) -> List[float]:
+    """Time one call per argument."""
+    latencies = []
+    for argument in arguments:
+        start = time.perf_counter()
+        call(argument)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def time_repeated(call: Callable) -> List[float]:
+    """Time a whole-table call until MIN_CASE_SECONDS or MAX_REPEATS is reached."""
+    latencies = []
+    while len(latencies) < MAX_REPEATS and sum(latencies) < MIN_CASE_SECONDS:
+        start = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def run_in_process(detector, table: pd.DataFrame, cases: List[str]) -> Dict[str, Dict]:
+    """
+    Time the detector directly.
+
+    Args:
+        detector: Loaded ExoplanetDetector without a prediction cache
+        table: Synthetic table
+        cases: In-process cases to run
+
+    Returns:
+        Dict[str, Dict]: Summary per case
+    """
+    results = {}
+    records = table.head(MAX_SINGLE_CALLS).to_dict("records")
+
+    if "preprocess_data" in cases:
+        rss_before = reset_peak_rss()
+        results["preprocess_data"] = summarize(time_calls(detector.preprocess_data, records), 1, rss_before)
+
+    if "predict" in cases:
+        rss_before = reset_peak_rss()
+        results["predict"] = summarize(time_calls(detector.predict, records), 1, rss_before)
+
+    if "predict_batch" in cases:
+        def score_table():
+            batch = detector.predict_batch(table)
+            if not batch["success"]:
+                raise RuntimeError(batch["error"])
+        rss_before = reset_peak_rss()
+        results["predict_batch"] = summarize(time_repeated(score_table), len(table), rss_before)
+
+    return results
+
+
+async def run_http(app, table: pd.DataFrame, cases: List[str],
+                   max_http_rows: int = MAX_HTTP_ROWS) -> Dict[str, Dict]:
+    """
+    Time the API endpoints through an in-process ASGI client.
+
+    Args:
+        app: FastAPI application, with its lifespan already entered
+        table: Synthetic table
+        cases: HTTP cases to run
+        max_http_rows: Largest table sent to the whole-table endpoints
+
+    Returns:
+        Dict[str, Dict]: Summary per case; skipped cases carry the reason
+    """
+    import httpx
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+
+        async def timed_post(*args, **kwargs) -> float:
+            start = time.perf_counter()
+            response = await client.post(*args, **kwargs)
+            elapsed = time.perf_counter() - start
+            if response.status_code != 200:
+                raise RuntimeError(f"{args[0]} returned {response.status_code}: {response.text[:200]}")
+            return elapsed
+
+        if "http_predict" in cases:
+            records = json_records(table.head(MAX_HTTP_SINGLE_CALLS))
+            rss_before = reset_peak_rss()
+            latencies = [await timed_post("/predict", json={"candidate_data": record}) for record in records]
+            results["http_predict"] = summarize(latencies, 1, rss_before)
+
+        whole_table = [case for case in ["http_predict_json", "http_predict_csv"] if case in cases]
+        if whole_table and len(table) > max_http_rows:
+            for case in whole_table:
+                results[case] = {"skipped": f"more than {max_http_rows} rows"}
+            return results
+
+        if "http_predict_json" in cases:
+            payload = {"data": json_records(table)}
+            rss_before = reset_peak_rss()
+            latencies = []
+            while len(latencies) < MAX_REPEATS and sum(latencies) < MIN_CASE_SECONDS:
+                latencies.append(await timed_post("/predict-json", json=payload))
+            results["http_predict_json"] = summarize(latencies, len(table), rss_before)
+            del payload
+
+        if "http_predict_csv" in cases:
+            content = table.to_csv(index=False).encode("utf-8")
+            rss_before = reset_peak_rss()
+            latencies = []
+            while len(latencies) < MAX_REPEATS and sum(latencies) < MIN_CASE_SECONDS:
+                latencies.append(await timed_post("/predict-csv", files={"file": ("benchmark.csv", content)}))
+            results["http_predict_csv"] = summarize(latencies, len(table), rss_before)
+
+    return results
+
+
+def run_suite(sizes: List[int], cases: Optional[List[str]] = None, engine: str = "xgboost",
+              seed: int = 0, max_http_rows: int = MAX_HTTP_ROWS) -> Dict:
+    """
+    Run every selected case at every size.
+
+    Args:
+        sizes: Synthetic table sizes in rows
+        cases: Cases to run (default: all)
+        engine: Inference engine of the in-process detector
+        seed: Seed of the synthetic tables
+        max_http_rows: Largest table sent to the whole-table endpoints
+
+    Returns:
+        Dict: Environment metadata and a summary per "case/size"
+    """
+    from exoplanet_detector_model import ExoplanetDetector
+
+    cases = cases or IN_PROCESS_CASES + HTTP_CASES
+    in_process_cases = [case for case in cases if case in IN_PROCESS_CASES]
+    http_cases = [case for case in cases if case in HTTP_CASES]
+
+    detector = ExoplanetDetector(
+        model_path=str(backend_dir / "exoplanet_detector_model.pkl"),
+        scaler_path=str(backend_dir / "exoplanet_scaler.pkl"),
+        features_path=str(backend_dir / "exoplanet_features.pkl"),
+        engine=engine
+    )
+    if not detector.is_loaded:
+        raise RuntimeError("Model could not be loaded")
+    detector.warm_up()
+
+    app = None
+    if http_cases:
+        # The app reads its configuration at import; measure the model, not the cache
+        os.environ["EXOPLANET_CACHE_SIZE"] = "0"
+        import main
+        app = main.app
+
+    results = {}
+
+    def record(summaries: Dict[str, Dict], size: int) -> None:
+        for case, summary in summaries.items():
+            results[f"{case}/{size}"] = summary
+            logger.info(f"{case}/{size}: {format_summary(summary)}")
+
+    async def run_sizes():
+        for size in sizes:
+            # One table at a time, freed before the next size is generated
+            table = synthetic_catalog(size, detector.features, seed=seed)
+            record(run_in_process(detector, table, in_process_cases), size)
+            if app is not None:
+                record(await run_http(app, table, http_cases, max_http_rows), size)
+            del table
+            gc.collect()
+
+    async def run_all():
+        if app is None:
+            await run_sizes()
+            return
+        async with app.router.lifespan_context(app):
+            await run_sizes()
+
+    asyncio.run(run_all())
+
+    import xgboost
+    return {
+        "meta": {
+            "created_at": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "xgboost": xgboost.__version__,
+            "engine": engine,
+            "seed": seed,
+            "sizes": sizes
+        },
+        "cases": results
+    }
+
+
+def format_summary(summary: Dict) -> str:
+    """One-line description of a case summary."""
+    if "skipped" in summary:
+        return f"skipped ({summary['skipped']})"
+    return (
+        f"{summary['throughput_rows_per_s']:,.0f} rows/s, "
+        f"p50 {summary['p50_ms']:.2f} ms, p99 {summary['p99_ms']:.2f} ms, "
+        f"peak RSS {summary['peak_rss_mb'] or 0:.0f} MB (from {summary.get('rss_before_mb') or 0:.0f} MB)"
+    )
+
+
+def compare_to_baseline(results: Dict, baseline: Dict, tolerance: float = 0.25) -> List[Dict]:
+    """
+    Find cases that got worse than the baseline.
+
+    Args:
+        results: Output of ``run_suite``
+        baseline: Stored output of an earlier ``run_suite``
+        tolerance: Relative change allowed before a metric is a regression
+
+    Returns:
+        List[Dict]: One entry per regressed metric (case, metric, baseline,
+                    current value and relative change)
+    """
+    regressions = []
+    for key, summary in results["cases"].items():
+        reference = baseline.get("cases", {}).get(key)
+        if reference is None or "skipped" in summary or "skipped" in reference:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS:
+            current, previous = summary.get(metric), reference.get(metric)
+            if not current or not previous:
+                continue
+            change = (current - previous) / previous
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append({
+                    "case": key,
+                    "metric": metric,
+                    "baseline": previous,
+                    "current": current,
+                    "change": change
+                })
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the exoplanet detector and API.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Synthetic table sizes")
+    parser.add_argument("--cases", nargs="+", choices=IN_PROCESS_CASES + HTTP_CASES, help="Cases to run (default: all)")
+    parser.add_argument("--engine", choices=["xgboost", "compiled"], default="xgboost")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-http-rows", type=int, default=MAX_HTTP_ROWS,
+                        help="Largest table sent to /predict-json and /predict-csv")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Compare against this stored results file")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Relative change tolerated before flagging a regression (default: 0.25)")
+    parser.add_argument("--save-baseline", help="Write the results as the new baseline file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    # The API resolves its model files relative to the working directory
+    os.chdir(backend_dir)
+
+    results = run_suite(args.sizes, args.cases, engine=args.engine, seed=args.seed,
+                        max_http_rows=args.max_http_rows)
+
+    print("-" * 50)
+    for key, summary in results["cases"].items():
+        print(f"{key:32s} {format_summary(summary)}")
+
+    for path in [args.output, args.save_baseline]:
+        if path:
+            Path(path).write_text(json.dumps(results, indent=2))
+            print(f"Results written to {path}")
+
+    if args.baseline:
+        regressions = compare_to_baseline(results, json.loads(Path(args.baseline).read_text()), args.tolerance)
+        print("-" * 50)
+        if not regressions:
+            print(f"No regressions against {args.baseline}")
+            return
+        for regression in regressions:
+            print(
+                f"REGRESSION {regression['case']} {regression['metric']}: "
+                f"{regression['baseline']:.4g} -> {regression['current']:.4g} ({regression['change']:+.0%})"
+            )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
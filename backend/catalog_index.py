@@ -0,0 +1,377 @@
+"""
+Catalog Index
+=============
+
+Precomputed scores of a known catalog, served without touching the model.
+
+Most requests ask about KOIs of the cumulative catalog. ``CatalogIndexManager``
+scores the configured catalog once, at startup or whenever the catalog file
+or the model changes, and keeps an immutable ``CatalogIndex`` of the results:
+
+    by_kepoi_name  KOI name -> row
+    by_kepid       kepid -> rows (a star can host several KOIs)
+    order          scored rows by decreasing probability, with the negated
+                   probabilities alongside for binary search
+
+Lookups are dictionary hits and probability-range or top-k queries are two
+binary searches plus a slice, so both run in microseconds. Every row's
+result is JSON-encoded when the index is built, so responses are assembled
+by joining bytes.
+
+Rebuilds are incremental: rows whose KOI name and feature values are
+unchanged keep their probability, and only new or edited rows are scored.
+The model is rescored in full when its fingerprint changes.
+
+Author: Felipe Coutinho
+NASA Space Apps Challenge 2025
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogIndex:
+    """
+    Immutable scored snapshot of a catalog.
+    """
+
+    def __init__(self, source: str, source_stat: Tuple[int, int], fingerprint: Optional[str],
+                 kepids: np.ndarray, kepoi_names: List[str], values: np.ndarray,
+                 probabilities: np.ndarray, error_mask: np.ndarray, records: List[bytes],
+                 build_stats: Dict[str, Any]):
+        """
+        Index scored catalog rows.
+
+        Args:
+            source: Catalog path
+            source_stat: (mtime_ns, size) of the catalog when it was read
+            fingerprint: Fingerprint of the model that scored it
+            kepids: kepid per row
+            kepoi_names: KOI name per row
+            values: Coerced feature matrix (NaN where missing), kept to
+                    detect edited rows on the next rebuild
+            probabilities: Exoplanet probability per row (NaN for failed rows)
+            error_mask: True for rows that could not be scored
+            records: JSON-encoded result per row
+            build_stats: Timings and row counts of the build
+        """
+        self.source = source
+        self.source_stat = source_stat
+        self.fingerprint = fingerprint
+        self.kepids = kepids
+        self.kepoi_names = kepoi_names
+        self.values = values
+        self.probabilities = probabilities
+        self.error_mask = error_mask
+        self.records = records
+        self.build_stats = build_stats
+
+        self.by_kepoi_name = {name: position for position, name in enumerate(kepoi_names) if name}
+        self.by_kepid: Dict[int, List[int]] = {}
+        for position, kepid in enumerate(kepids.tolist()):
+            self.by_kepid.setdefault(kepid, []).append(position)
+
+        # Decreasing probability; ties keep catalog order
+        scored = np.flatnonzero(~error_mask)
+        self.order = scored[np.argsort(-probabilities[scored], kind="stable")]
+        self._negated = -probabilities[self.order]
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def lookup(self, identifier: str) -> List[int]:
+        """
+        Rows of a KOI name (e.g. ``K00752.01``) or of every KOI of a kepid.
+
+        Args:
+            identifier: KOI name or kepid
+
+        Returns:
+            List[int]: Matching rows (empty if unknown)
+        """
+        identifier = identifier.strip()
+        if identifier.isdigit():
+            return self.by_kepid.get(int(identifier), [])
+        position = self.by_kepoi_name.get(identifier.upper())
+        return [] if position is None else [position]
+
+    def top(self, k: int = 10, min_probability: float = 0.0, max_probability: float = 1.0,
+            offset: int = 0) -> Tuple[List[int], int]:
+        """
+        Highest-probability rows within a probability range.
+
+        Args:
+            k: Rows returned
+            min_probability: Inclusive lower bound
+            max_probability: Inclusive upper bound
+            offset: Matching rows skipped (for paging)
+
+        Returns:
+            Tuple: Rows by decreasing probability and the number of rows in
+                   the range
+        """
+        first = int(np.searchsorted(self._negated, -max_probability, side="left"))
+        last = int(np.searchsorted(self._negated, -min_probability, side="right"))
+        start = first + offset
+        return self.order[start:min(last, start + k)].tolist(), max(last - first, 0)
+
+    def encode(self, positions: List[int], **fields: Any) -> bytes:
+        """
+        JSON response with ``status``, ``fields`` and the rows' results.
+
+        Args:
+            positions: Rows, in response order
+            **fields: Extra top-level keys
+
+        Returns:
+            bytes: Encoded response body
+        """
+        head = json.dumps(dict({"status": "success"}, **fields))[:-1].encode("utf-8")
+        return b"".join([head, b', "results": [', b", ".join(self.records[p] for p in positions), b"]}"])
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return the index contents and how it was built.
+
+        Returns:
+            Dict: Source, row counts and build statistics
+        """
+        return dict({
+            "source": self.source,
+            "rows": len(self),
+            "scored_rows": len(self.order),
+            "kepids": len(self.by_kepid)
+        }, **self.build_stats)
+
+
+def read_catalog(path: str) -> "pd.DataFrame":
+    """Read a catalog CSV, skipping the archive's '#' comment lines."""
+    import pandas as pd
+
+    df = pd.read_csv(path, comment='#', low_memory=False)
+    df.columns = df.columns.str.strip()
+    return df
+
+
+def build_index(path: str, model, format_results: Callable[[Any, Any, Dict[str, Any]], List[Dict[str, Any]]],
+                previous: Optional[CatalogIndex] = None) -> CatalogIndex:
+    """
+    Score a catalog and index the results, reusing a previous index's
+    probabilities for unchanged rows.
+
+    Args:
+        path: Catalog CSV with ``kepid`` and the model's feature columns
+        model: Loaded detector
+        format_results: Builds per-row results from a detector, a frame and
+                        its ``predict_batch``-style output
+        previous: Index of an earlier version of the catalog
+
+    Returns:
+        CatalogIndex: The new index
+
+    Raises:
+        ValueError: If the catalog lacks columns or cannot be scored
+    """
+    import pandas as pd
+
+    start = time.perf_counter()
+    stat = os.stat(path)
+    df = read_catalog(path)
+    missing = {'kepid', *model.features} - set(df.columns)
+    if missing:
+        raise ValueError(f"Catalog {path} is missing columns: {sorted(missing)}")
+    read_seconds = time.perf_counter() - start
+
+    kepids = pd.to_numeric(df['kepid'], errors='coerce').fillna(0).to_numpy(dtype=np.int64)
+    if 'kepoi_name' in df.columns:
+        kepoi_names = df['kepoi_name'].fillna('').astype(str).str.strip().str.upper().tolist()
+    else:
+        kepoi_names = [''] * len(df)
+    values = model.validator.coerce(df[model.features])["values"]
+
+    n_rows = len(df)
+    probabilities = np.full(n_rows, np.nan)
+    error_mask = np.zeros(n_rows, dtype=bool)
+    errors: List[Optional[str]] = [None] * n_rows
+
+    # Probabilities of rows whose name and features did not change
+    reused = np.zeros(n_rows, dtype=bool)
+    if previous is not None and previous.fingerprint == model.fingerprint:
+        old = np.array([previous.by_kepoi_name.get(name, -1) if name else -1 for name in kepoi_names],
+                       dtype=np.int64)
+        matched = np.flatnonzero(old >= 0)
+        old_rows = old[matched]
+        same = (
+            (previous.values[old_rows] == values[matched])
+            | (np.isnan(previous.values[old_rows]) & np.isnan(values[matched]))
+        ).all(axis=1) & ~previous.error_mask[old_rows]
+        reused[matched[same]] = True
+        probabilities[matched[same]] = previous.probabilities[old_rows[same]]
+
+    score_start = time.perf_counter()
+    rescore = np.flatnonzero(~reused)
+    if len(rescore):
+        batch = model.predict_batch(df.iloc[rescore][model.features])
+        if not batch["success"]:
+            raise ValueError(batch["error"])
+        probabilities[rescore] = batch["probabilities"]
+        error_mask[rescore] = batch["error_mask"]
+        for position, error in zip(rescore.tolist(), batch["errors"]):
+            errors[position] = error
+    score_seconds = time.perf_counter() - score_start
+
+    predictions = np.where(error_mask, -1, (probabilities > model.decision_threshold).astype(np.int64))
+    results = format_results(model, df, {
+        "predictions": predictions,
+        "probabilities": probabilities,
+        "error_mask": error_mask,
+        "errors": errors
+    })
+    records = [json.dumps(result).encode("utf-8") for result in results]
+
+    build_stats = {
+        "built_at": datetime.now().isoformat(),
+        "build_seconds": time.perf_counter() - start,
+        "read_seconds": read_seconds,
+        "score_seconds": score_seconds,
+        "scored_rows_in_build": int(len(rescore)),
+        "reused_rows": int(reused.sum())
+    }
+    index = CatalogIndex(
+        path, (stat.st_mtime_ns, stat.st_size), model.fingerprint, kepids, kepoi_names, values,
+        probabilities, error_mask, records, build_stats
+    )
+    logger.info(
+        f"Indexed {n_rows} catalog rows from {path} in {build_stats['build_seconds']:.2f}s "
+        f"({len(rescore)} scored, {build_stats['reused_rows']} reused)"
+    )
+    return index
+
+
+class CatalogIndexManager:
+    """
+    Keeps the index of one catalog current.
+
+    Readers take ``current()``, which is never blocked by a rebuild: a
+    changed catalog file or model is detected at most every
+    ``check_interval`` seconds and rebuilt in a background thread, and the
+    new index replaces the old one when it is complete.
+    """
+
+    def __init__(self, path: str, get_model: Callable[[], Any],
+                 format_results: Callable[[Any, Any, Dict[str, Any]], List[Dict[str, Any]]],
+                 check_interval: float = 5.0):
+        """
+        Initialize the manager; nothing is read until the first build.
+
+        Args:
+            path: Catalog CSV
+            get_model: Returns the detector that scores the catalog
+            format_results: Builds per-row results (see ``build_index``)
+            check_interval: Minimum seconds between change checks
+        """
+        self.path = path
+        self.get_model = get_model
+        self.format_results = format_results
+        self.check_interval = check_interval
+
+        self._index: Optional[CatalogIndex] = None
+        self._build_lock = threading.Lock()
+        self._refreshing = threading.Event()
+        self._last_check = 0.0
+        self.builds = 0
+        self.error: Optional[str] = None
+
+    def current(self) -> Optional[CatalogIndex]:
+        """
+        The latest index, starting a background refresh when a check is due.
+
+        Returns:
+            Optional[CatalogIndex]: None until the first build finished
+        """
+        now = time.monotonic()
+        if self._index is not None and now - self._last_check >= self.check_interval:
+            self._last_check = now
+            if not self._refreshing.is_set():
+                self._refreshing.set()
+                threading.Thread(target=self._refresh_in_background, name="catalog-index", daemon=True).start()
+        return self._index
+
+    def get(self) -> CatalogIndex:
+        """
+        The latest index, building it first if there is none yet.
+
+        Raises:
+            ValueError: If the catalog cannot be read or scored
+            FileNotFoundError: If the catalog does not exist
+        """
+        index = self.current()
+        if index is None:
+            self.refresh()
+            index = self._index
+        return index
+
+    def stale(self, model=None) -> bool:
+        """Whether the catalog file or the model changed since the last build."""
+        index = self._index
+        if index is None:
+            return True
+        stat = os.stat(self.path)
+        model = model or self.get_model()
+        return (stat.st_mtime_ns, stat.st_size) != index.source_stat or model.fingerprint != index.fingerprint
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Rebuild the index if the catalog or the model changed.
+
+        Args:
+            force: Rebuild even if nothing changed
+
+        Returns:
+            bool: True if a new index was built
+        """
+        with self._build_lock:
+            model = self.get_model()
+            if not force and not self.stale(model):
+                return False
+            try:
+                self._index = build_index(self.path, model, self.format_results, self._index)
+            except Exception as e:
+                self.error = str(e)
+                raise
+            self.error = None
+            self.builds += 1
+            self._last_check = time.monotonic()
+            return True
+
+    def _refresh_in_background(self) -> None:
+        try:
+            self.refresh()
+        except Exception as e:
+            logger.error(f"Catalog index refresh failed: {e}")
+        finally:
+            self._refreshing.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return the catalog path, build count, last error and index stats.
+
+        Returns:
+            Dict: Manager state, plus the index's ``get_stats`` once built
+        """
+        stats: Dict[str, Any] = {"path": self.path, "builds": self.builds, "error": self.error}
+        if self._index is not None:
+            stats.update(self._index.get_stats())
+        return stats
@@ -0,0 +1,126 @@
+"""
+Columnar Formats
+================
+
+Parquet and Arrow IPC support for the exoplanet detection API.
+
+Uploads are read with column projection, so only the columns the model and
+the response need are decoded, and the feature columns are copied straight
+from Arrow buffers into one contiguous float64 matrix for the model, without
+creating per-row Python objects. Results can be written back in the same
+format.
+
+pyarrow is imported on first use; without it these formats are unavailable
+and the rest of the API keeps working.
+
+Author: Felipe Coutinho
+NASA Space Apps Challenge 2025
+"""
+
+import io
+import json
+from typing import Any, Dict, List
+
+import numpy as np
+
+COLUMNAR_FORMATS = ("parquet", "arrow")
+
+FILE_EXTENSIONS = {
+    "parquet": "parquet",
+    "arrow": "arrows"
+}
+
+
+def read_table(contents: bytes, fmt: str, columns: List[str]):
+    """
+    Read the available ``columns`` of a Parquet file or Arrow IPC stream.
+
+    Args:
+        contents: Uploaded bytes
+        fmt: "parquet" or "arrow" (IPC stream or file)
+        columns: Wanted columns; absent ones are skipped
+
+    Returns:
+        pyarrow.Table: Table holding the projected columns
+    """
+    import pyarrow as pa
+
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(pa.BufferReader(contents))
+        available = set(parquet_file.schema_arrow.names)
+        return parquet_file.read(columns=[column for column in columns if column in available])
+
+    if fmt == "arrow":
+        # Arrow IPC stream, or the random-access file format
+        try:
+            table = pa.ipc.open_stream(pa.BufferReader(contents)).read_all()
+        except pa.ArrowInvalid:
+            table = pa.ipc.open_file(pa.BufferReader(contents)).read_all()
+        return table.select([column for column in columns if column in table.column_names])
+
+    raise ValueError(f"Unknown columnar format '{fmt}', expected one of {list(COLUMNAR_FORMATS)}")
+
+
+def feature_matrix(table, features: List[str]) -> np.ndarray:
+    """
+    Copy feature columns into a float64 matrix in model column order.
+
+    Each column is cast to float64 inside Arrow (nulls become NaN) and copied
+    into its slot of a Fortran-ordered matrix, so every column is a single
+    contiguous write.
+
+    Args:
+        table: pyarrow.Table holding every feature column
+        features: Feature names in model order
+
+    Returns:
+        np.ndarray: Matrix of shape (n_rows, n_features)
+
+    Raises:
+        ValueError: If a feature column is not numeric
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    X = np.empty((table.num_rows, len(features)), dtype=np.float64, order="F")
+    for position, feature in enumerate(features):
+        column = table.column(feature)
+        if not (pa.types.is_integer(column.type) or pa.types.is_floating(column.type)
+                or pa.types.is_boolean(column.type) or pa.types.is_null(column.type)):
+            raise ValueError(f"Column '{feature}' must be numeric, got {column.type}")
+        column = pc.fill_null(column.cast(pa.float64()), np.nan)
+        offset = 0
+        for chunk in column.chunks:
+            values = chunk.to_numpy(zero_copy_only=True)
+            X[offset:offset + len(values), position] = values
+            offset += len(values)
+    return X
+
+
+def write_table(columns: Dict[str, Any], fmt: str, metadata: Dict[str, Any]) -> bytes:
+    """
+    Serialize result columns as Parquet or an Arrow IPC stream.
+
+    Args:
+        columns: Column name to array
+        fmt: "parquet" or "arrow"
+        metadata: JSON-serializable values stored in the schema metadata
+
+    Returns:
+        bytes: Serialized table
+    """
+    import pyarrow as pa
+
+    table = pa.table(columns)
+    table = table.replace_schema_metadata({key: json.dumps(value) for key, value in metadata.items()})
+
+    sink = io.BytesIO()
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        pq.write_table(table, sink)
+    else:
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+    return sink.getvalue()
@@ -0,0 +1,313 @@
+"""
+Compiled Tree Ensemble
+======================
+
+Flat, array-backed evaluation of the trained XGBoost booster.
+
+The booster is exported to parallel NumPy arrays (one entry per node) and the
+StandardScaler is folded into the split thresholds, so raw KOI features can be
+scored directly without the scaler or the xgboost runtime. Trees are walked
+level by level for a whole batch of rows at once.
+
+Author: Felipe Coutinho
+NASA Space Apps Challenge 2025
+"""
+
+import json
+import numpy as np
+from typing import List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Rows evaluated per step; keeps the (rows x trees) working arrays in cache
+DEFAULT_CHUNK_SIZE = 256
+
+
+# Trees are padded to perfect binary trees, so the layout grows as 2**depth
+MAX_COMPILED_DEPTH = 12
+
+
+class CompiledTreeEnsemble:
+    """
+    Binary logistic tree ensemble compiled into flat node arrays.
+
+    Every tree is padded to a perfect binary tree of depth ``depth`` and stored
+    heap-ordered: internal node ``i`` has children ``2i + 1`` (left) and
+    ``2i + 2`` (right), so a batch of rows is advanced one level at a time with
+    integer arithmetic only. Missing values are routed by evaluating each node
+    against one of two copies of the input, with NaN replaced by -inf (default
+    left) or +inf (default right); ``feature`` indexes that widened matrix.
+    """
+
+    def __init__(self, feature: np.ndarray, threshold: np.ndarray,
+                 leaf_value: np.ndarray, depth: int, n_features: int,
+                 base_margin: float, features: Optional[List[str]] = None):
+        """
+        Initialize the compiled ensemble from its node arrays.
+
+        Args:
+            feature: Column of the widened input per internal node,
+                     shape (n_trees * (2**depth - 1),)
+            threshold: Split threshold per internal node in raw (unscaled)
+                       feature units; rows below it go left
+            leaf_value: Leaf output per tree, shape (n_trees * 2**depth,)
+            depth: Depth of every (padded) tree
+            n_features: Number of input columns
+            base_margin: Global bias added to the summed leaf values
+            features: Feature names in column order
+        """
+        self.feature = feature
+        self.threshold = threshold
+        self.leaf_value = leaf_value
+        self.depth = depth
+        self.n_features = n_features
+        self.base_margin = base_margin
+        self.features = features
+
+        self.n_internal = 2 ** depth - 1
+        self.n_trees = len(leaf_value) // (self.n_internal + 1)
+
+        # Nodes are tracked by their global slot g = tree_base + local index;
+        # children of g are 2g + 1 - tree_base (+1 for the right child)
+        internal_base = np.arange(self.n_trees, dtype=np.intp) * self.n_internal
+        leaf_base = np.arange(self.n_trees, dtype=np.intp) * (self.n_internal + 1)
+        self._root_slots = internal_base
+        self._child_offset = 1 - internal_base
+        self._leaf_offset = leaf_base - self.n_internal - internal_base
+
+    @classmethod
+    def from_model(cls, model, scaler=None,
+                   features: Optional[List[str]] = None) -> "CompiledTreeEnsemble":
+        """
+        Compile a trained XGBoost model, optionally folding in its scaler.
+
+        Args:
+            model: XGBClassifier or xgboost Booster with a binary:logistic objective
+            scaler: Fitted StandardScaler applied before the model, or None
+            features: Feature names in column order
+
+        Returns:
+            CompiledTreeEnsemble: Ensemble that scores unscaled feature rows
+
+        Raises:
+            ValueError: If the booster cannot be represented by this layout
+        """
+        booster = model.get_booster() if hasattr(model, "get_booster") else model
+        learner = json.loads(bytearray(booster.save_raw(raw_format="json")))["learner"]
+
+        objective = learner["objective"]["name"]
+        if objective != "binary:logistic":
+            raise ValueError(f"Unsupported objective: {objective}")
+        if learner["gradient_booster"]["name"] != "gbtree":
+            raise ValueError("Only gbtree boosters can be compiled")
+
+        # base_score is stored in probability space ("5E-1" or "[5E-1]")
+        model_param = learner["learner_model_param"]
+        base_score = float(model_param["base_score"].strip("[]"))
+        base_margin = float(np.log(base_score / (1.0 - base_score)))
+        n_features = int(model_param["num_feature"])
+
+        trees = learner["gradient_booster"]["model"]["trees"]
+        for tree in trees:
+            if any(tree["split_type"]):
+                raise ValueError("Categorical splits are not supported")
+        depth = max(_tree_depth(tree["left_children"]) for tree in trees)
+        if depth > MAX_COMPILED_DEPTH:
+            raise ValueError(f"Tree depth {depth} exceeds {MAX_COMPILED_DEPTH}")
+
+        expanded = [_expand_tree(tree, depth) for tree in trees]
+        feature = np.concatenate([e[0] for e in expanded])
+        threshold = np.concatenate([e[1] for e in expanded])
+        default_left = np.concatenate([e[2] for e in expanded])
+        is_split = np.concatenate([e[3] for e in expanded])
+        leaf_value = np.concatenate([e[4] for e in expanded])
+
+        threshold[is_split] = _fold_scaler(feature[is_split], threshold[is_split], scaler)
+        feature = np.where(default_left, feature, feature + n_features).astype(np.intp)
+
+        logger.info(f"Compiled {len(trees)} trees (depth {depth}, {len(threshold)} split slots)")
+
+        return cls(
+            feature=feature,
+            threshold=threshold,
+            leaf_value=leaf_value,
+            depth=depth,
+            n_features=n_features,
+            base_margin=base_margin,
+            features=list(features) if features is not None else None
+        )
+
+    def predict_margin(self, X, chunk_size: int = DEFAULT_CHUNK_SIZE) -> np.ndarray:
+        """
+        Compute the raw (log-odds) score for each row.
+
+        Args:
+            X: Unscaled feature rows, shape (n_rows, n_features) or (n_features,)
+            chunk_size: Rows evaluated together
+
+        Returns:
+            np.ndarray: Margin per row
+        """
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features:
+            raise ValueError(f"Expected {self.n_features} features, got {X.shape[1]}")
+
+        if len(X) <= chunk_size:
+            return self._margin_chunk(X)
+
+        margins = np.empty(len(X))
+        for start in range(0, len(X), chunk_size):
+            margins[start:start + chunk_size] = self._margin_chunk(X[start:start + chunk_size])
+        return margins
+
+    def predict_proba(self, X, chunk_size: int = DEFAULT_CHUNK_SIZE) -> np.ndarray:
+        """
+        Compute the exoplanet (positive class) probability for each row.
+
+        Args:
+            X: Unscaled feature rows, shape (n_rows, n_features) or (n_features,)
+            chunk_size: Rows evaluated together
+
+        Returns:
+            np.ndarray: Probability per row
+        """
+        return 1.0 / (1.0 + np.exp(-self.predict_margin(X, chunk_size)))
+
+    def _margin_chunk(self, X: np.ndarray) -> np.ndarray:
+        """Walk every tree for every row of ``X`` level by level."""
+        n_rows = len(X)
+        missing = np.isnan(X)
+        widened = np.empty((n_rows, 2 * self.n_features))
+        widened[:, :self.n_features] = np.where(missing, -np.inf, X)
+        widened[:, self.n_features:] = np.where(missing, np.inf, X)
+        values = widened.ravel()
+        row_offset = np.arange(n_rows, dtype=np.intp)[:, None] * (2 * self.n_features)
+
+        nodes = np.repeat(self._root_slots[None, :], n_rows, axis=0)
+        for _ in range(self.depth):
+            columns = self.feature.take(nodes)
+            columns += row_offset
+            goes_right = values.take(columns) >= self.threshold.take(nodes)
+            nodes *= 2
+            nodes += self._child_offset
+            nodes += goes_right
+
+        nodes += self._leaf_offset
+        return self.leaf_value.take(nodes).sum(axis=1) + self.base_margin
+
+
+def _tree_depth(left_children: List[int]) -> int:
+    """Number of splits on the longest root-to-leaf path."""
+    left = np.asarray(left_children)
+    depth = np.zeros(len(left), dtype=np.int64)
+    # XGBoost numbers children after their parents
+    for node in np.flatnonzero(left != -1):
+        depth[left[node]] = depth[left[node] + 1] = depth[node] + 1
+    return int(depth.max())
+
+
+def _expand_tree(tree: dict, depth: int):
+    """
+    Pad one XGBoost tree into a heap-ordered perfect tree of ``depth`` levels.
+
+    Leaves above the bottom level become always-left padding nodes whose whole
+    subtree carries the leaf value.
+
+    Returns:
+        Tuple of per-slot (feature, threshold, default_left, is_split) arrays
+        for the internal nodes and the bottom-level leaf values
+    """
+    left = tree["left_children"]
+    right = tree["right_children"]
+    split_indices = tree["split_indices"]
+    conditions = tree["split_conditions"]
+    default_left = tree["default_left"]
+
+    n_internal = 2 ** depth - 1
+    feature = np.zeros(n_internal, dtype=np.intp)
+    threshold = np.full(n_internal, np.inf)
+    node_default_left = np.ones(n_internal, dtype=bool)
+    is_split = np.zeros(n_internal, dtype=bool)
+    leaf_value = np.zeros(n_internal + 1)
+
+    stack = [(0, 0)]
+    while stack:
+        node, slot = stack.pop()
+        if slot >= n_internal:
+            leaf_value[slot - n_internal] = conditions[node]
+            continue
+        if left[node] == -1:
+            stack.append((node, 2 * slot + 1))
+            stack.append((node, 2 * slot + 2))
+            continue
+        feature[slot] = split_indices[node]
+        threshold[slot] = np.float32(conditions[node])
+        node_default_left[slot] = bool(default_left[node])
+        is_split[slot] = True
+        stack.append((left[node], 2 * slot + 1))
+        stack.append((right[node], 2 * slot + 2))
+
+    return feature, threshold, node_default_left, is_split, leaf_value
+
+
+def _fold_scaler(feature: np.ndarray, threshold: np.ndarray, scaler) -> np.ndarray:
+    """
+    Move split thresholds from scaled into raw feature units.
+
+    XGBoost goes left when ``float32((x - mean) / scale) < threshold``. That
+    predicate is monotone in ``x``, so for every split there is a smallest raw
+    value that goes right; it is located exactly by bisection in float64 so
+    the compiled model takes the same branch as the stock scaler + booster.
+
+    Args:
+        feature: Feature index per split
+        threshold: Split threshold per split, in scaled units
+        scaler: Fitted StandardScaler, or None for unscaled models
+
+    Returns:
+        np.ndarray: Thresholds in raw units
+    """
+    n_features = int(feature.max()) + 1 if len(feature) else 0
+    mean = np.zeros(n_features)
+    scale = np.ones(n_features)
+    if scaler is not None:
+        if getattr(scaler, "mean_", None) is not None:
+            mean = np.asarray(scaler.mean_, dtype=np.float64)
+        if getattr(scaler, "scale_", None) is not None:
+            scale = np.asarray(scaler.scale_, dtype=np.float64)
+
+    m = mean[feature]
+    s = scale[feature]
+    t = threshold.astype(np.float32)
+
+    def goes_left(x):
+        with np.errstate(over="ignore"):
+            return ((x - m) / s).astype(np.float32) < t
+
+    # Bracket the boundary: lo goes left, hi goes right
+    estimate = t.astype(np.float64) * s + m
+    width = np.abs(s) * (np.abs(t.astype(np.float64)) + 1.0) * 1e-6 + 1e-300
+    lo = estimate - width
+    hi = estimate + width
+    for _ in range(64):
+        bad_lo = ~goes_left(lo)
+        bad_hi = goes_left(hi)
+        if not (bad_lo.any() or bad_hi.any()):
+            break
+        width = width * 2
+        lo = np.where(bad_lo, estimate - width, lo)
+        hi = np.where(bad_hi, estimate + width, hi)
+
+    for _ in range(128):
+        mid = lo + (hi - lo) / 2
+        converged = (mid == lo) | (mid == hi)
+        if converged.all():
+            break
+        left_mask = goes_left(mid)
+        lo = np.where(left_mask & ~converged, mid, lo)
+        hi = np.where(~left_mask & ~converged, mid, hi)
+
+    return hi
@@ -0,0 +1,54 @@
+"""
+Shared test fixtures
+====================
+
+Catalog samples and detectors built from the shipped model files, shared by
+the test modules of the backend directory.
+"""
+
+from pathlib import Path
+
+import pytest
+
+from exoplanet_detector_model import ExoplanetDetector
+
+BACKEND_DIR = Path(__file__).parent
+CATALOG = BACKEND_DIR / "cumulative_2025.10.04_14.14.53.csv"
+
+# Catalog rows in catalog_sample unless parametrized
+DEFAULT_SAMPLE_ROWS = 200
+
+
+@pytest.fixture(scope="session")
+def model_files():
+    """Paths of the shipped model, scaler and feature pickles."""
+    return {
+        "model_path": str(BACKEND_DIR / "exoplanet_detector_model.pkl"),
+        "scaler_path": str(BACKEND_DIR / "exoplanet_scaler.pkl"),
+        "features_path": str(BACKEND_DIR / "exoplanet_features.pkl"),
+    }
+
+
+@pytest.fixture(scope="session")
+def make_detector(model_files):
+    """Factory of detectors on the shipped pickles; keyword arguments go to ExoplanetDetector."""
+    def make(**kwargs):
+        return ExoplanetDetector(**model_files, **kwargs)
+    return make
+
+
+@pytest.fixture(scope="module")
+def catalog_sample(request, tmp_path_factory):
+    """
+    First catalog rows, keeping the '#' comment header.
+
+    The row count is the fixture parameter, e.g.
+    ``@pytest.mark.parametrize("catalog_sample", [300], indirect=True)``.
+    """
+    rows = getattr(request, "param", DEFAULT_SAMPLE_ROWS)
+    lines = CATALOG.read_text().splitlines(keepends=True)
+    comments = [line for line in lines if line.startswith("#")]
+    data = [line for line in lines if not line.startswith("#")]
+    path = tmp_path_factory.mktemp("catalog") / "sample.csv"
+    path.write_text("".join(comments + data[:rows + 1]))
+    return path
@@ -0,0 +1,249 @@
+"""
+Dataset Cache
+=============
+
+Preprocessed, memory-mapped cache of the cumulative KOI catalog.
+
+Loading the catalog the way the notebook does (``read_csv`` with
+``comment='#'``, normalized column names, ``pd.to_numeric`` on every
+feature, medians, ``is_planet`` labels) costs far more than the work that
+follows in quick evaluations. ``load_dataset`` does it once per catalog and
+stores the results as plain ``.npy`` arrays in a cache directory:
+
+    X.npy            imputed feature matrix (float64; medians, flags 0)
+    raw.npy          coerced feature matrix with missing values kept (NaN)
+    y.npy            is_planet labels (CONFIRMED and CANDIDATE are 1)
+    groups.npy       kepid of each row
+    kepoi_names.npy  KOI name of each row
+    medians.npy      per-feature medians used for the imputation
+    meta.json        feature order, row count, source hash and version
+
+The cache directory is named after the SHA-256 of the catalog and
+``PREPROCESSING_VERSION``, so editing the catalog or the preprocessing
+creates a new entry instead of serving stale arrays. Arrays are opened
+lazily with ``mmap_mode='r'``: an entry loads in milliseconds and processes
+reading the same entry share its pages.
+
+Author: Felipe Coutinho
+NASA Space Apps Challenge 2025
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the preprocessing below changes its output
+PREPROCESSING_VERSION = 1
+
+# Candidate features of the notebook, in model column order
+CANDIDATE_FEATURES = [
+    'koi_period', 'koi_time0bk', 'koi_duration', 'koi_depth', 'koi_prad',
+    'koi_srad', 'koi_steff', 'koi_slogg', 'koi_kepmag', 'koi_score',
+    'koi_fpflag_nt', 'koi_fpflag_ss', 'koi_fpflag_co', 'koi_fpflag_ec',
+    'koi_model_snr'
+]
+
+# Features missing in more than this fraction of rows are dropped
+MAX_MISSING_FRACTION = 0.5
+
+ARRAYS = ("X", "raw", "y", "groups", "kepoi_names", "medians")
+
+
+def file_sha256(path: str) -> str:
+    """SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def default_cache_dir(source: str) -> str:
+    """EXOPLANET_DATASET_CACHE, or ``.dataset_cache`` next to the catalog."""
+    return os.environ.get("EXOPLANET_DATASET_CACHE") or str(Path(source).resolve().parent / ".dataset_cache")
+
+
+def preprocess_catalog(path: str) -> Dict:
+    """
+    Load and clean the cumulative KOI catalog as the notebook does.
+
+    Args:
+        path: Catalog CSV (may start with '#' comment lines)
+
+    Returns:
+        Dict: The arrays of ``ARRAYS`` and the ``features`` list
+    """
+    import pandas as pd
+
+    df = pd.read_csv(path, sep=',', encoding='utf-8', comment='#')
+    df.columns = (
+        df.columns.str.strip().str.lower().str.replace(' ', '_').str.replace('(', '')
+    )
+
+    disposition = df['koi_disposition'].astype(str).str.strip().str.upper()
+    y = disposition.isin(['CANDIDATE', 'CONFIRMED']).to_numpy(dtype=np.int64)
+
+    features = [feature for feature in CANDIDATE_FEATURES if feature in df.columns]
+    values = df[features].apply(pd.to_numeric, errors='coerce')
+    missing = values.isnull().mean()
+    features = [feature for feature in features if missing[feature] <= MAX_MISSING_FRACTION]
+    values = values[features].astype(np.float64)
+
+    medians = values.median()
+    imputed = values.fillna(medians)
+    flags = [feature for feature in features if feature.startswith('koi_fpflag_')]
+    imputed[flags] = imputed[flags].fillna(0).astype(int)
+
+    kepoi_names = df['kepoi_name'].fillna('').astype(str) if 'kepoi_name' in df.columns else pd.Series([''] * len(df))
+    return {
+        "X": imputed.to_numpy(dtype=np.float64),
+        "raw": values.to_numpy(dtype=np.float64),
+        "y": y,
+        "groups": pd.to_numeric(df['kepid'], errors='coerce').fillna(0).to_numpy(dtype=np.int64),
+        "kepoi_names": kepoi_names.to_numpy(dtype=str),
+        "medians": medians.to_numpy(dtype=np.float64),
+        "features": features
+    }
+
+
+class KOIDataset:
+    """
+    Read-only view of a cached, preprocessed catalog.
+
+    Arrays are memory-mapped on first access.
+    """
+
+    def __init__(self, directory: str):
+        """
+        Open a cache entry.
+
+        Args:
+            directory: Cache entry written by ``load_dataset``
+        """
+        self.directory = directory
+        with open(os.path.join(directory, "meta.json")) as f:
+            self.meta = json.load(f)
+        self.features: List[str] = self.meta["features"]
+        self.rows: int = self.meta["rows"]
+        self.source_sha256: str = self.meta["source_sha256"]
+        self._arrays: Dict[str, np.ndarray] = {}
+
+    def array(self, name: str) -> np.ndarray:
+        """
+        Return a cached array, memory-mapping it on first use.
+
+        Args:
+            name: One of ``ARRAYS``
+
+        Returns:
+            np.ndarray: Read-only array backed by the cache file
+        """
+        if name not in self._arrays:
+            self._arrays[name] = np.load(os.path.join(self.directory, f"{name}.npy"), mmap_mode="r")
+        return self._arrays[name]
+
+    @property
+    def X(self) -> np.ndarray:
+        """Imputed feature matrix in ``features`` order."""
+        return self.array("X")
+
+    @property
+    def raw(self) -> np.ndarray:
+        """Coerced feature matrix with missing values as NaN."""
+        return self.array("raw")
+
+    @property
+    def y(self) -> np.ndarray:
+        """is_planet labels."""
+        return self.array("y")
+
+    @property
+    def groups(self) -> np.ndarray:
+        """kepid of each row."""
+        return self.array("groups")
+
+    @property
+    def kepoi_names(self) -> np.ndarray:
+        """KOI name of each row."""
+        return self.array("kepoi_names")
+
+    @property
+    def medians(self) -> np.ndarray:
+        """Per-feature medians used for the imputation."""
+        return self.array("medians")
+
+    def medians_for(self, features: List[str]) -> np.ndarray:
+        """
+        Medians in another feature order.
+
+        Args:
+            features: Feature names, e.g. a model's
+
+        Returns:
+            np.ndarray: Median per feature (NaN for features not cached)
+        """
+        positions = {feature: position for position, feature in enumerate(self.features)}
+        medians = self.medians
+        return np.array([medians[positions[f]] if f in positions else np.nan for f in features])
+
+
+def load_dataset(path: str, cache_dir: Optional[str] = None, refresh: bool = False) -> KOIDataset:
+    """
+    Return the preprocessed catalog, building its cache entry if needed.
+
+    Args:
+        path: Catalog CSV
+        cache_dir: Cache root (default: ``default_cache_dir(path)``)
+        refresh: Rebuild the entry even if it exists
+
+    Returns:
+        KOIDataset: Lazily memory-mapped dataset
+    """
+    cache_dir = cache_dir or default_cache_dir(path)
+    sha256 = file_sha256(path)
+    entry = os.path.join(cache_dir, f"koi-{sha256[:16]}-v{PREPROCESSING_VERSION}")
+
+    if os.path.exists(os.path.join(entry, "meta.json")) and not refresh:
+        return KOIDataset(entry)
+
+    start = time.perf_counter()
+    dataset = preprocess_catalog(path)
+    os.makedirs(cache_dir, exist_ok=True)
+    # Build next to the final location and rename, so readers never see a
+    # partial entry
+    staging = tempfile.mkdtemp(prefix=".koi-", dir=cache_dir)
+    try:
+        for name in ARRAYS:
+            np.save(os.path.join(staging, f"{name}.npy"), dataset[name])
+        with open(os.path.join(staging, "meta.json"), "w") as f:
+            json.dump({
+                "features": dataset["features"],
+                "rows": int(len(dataset["y"])),
+                "source": str(path),
+                "source_sha256": sha256,
+                "preprocessing_version": PREPROCESSING_VERSION
+            }, f, indent=2)
+        if os.path.exists(entry):
+            shutil.rmtree(entry)
+        os.replace(staging, entry)
+    except OSError:
+        shutil.rmtree(staging, ignore_errors=True)
+        if not os.path.exists(os.path.join(entry, "meta.json")):
+            raise
+        # Another process finished the same entry first
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    logger.info(f"Cached preprocessed catalog {path} in {entry} ({time.perf_counter() - start:.2f}s)")
+    return KOIDataset(entry)
@@ -0,0 +1,392 @@
+"""
+Model Evaluation
+================
+
+Evaluation and decision-threshold tuning on labeled catalogs.
+
+A labeled catalog (any KOI table with ``koi_disposition``) is scored with one
+``predict_batch`` call; every metric is then derived from the probabilities.
+``threshold_curve`` sorts the scores once and accumulates true and false
+positives at each distinct score, which yields the whole ROC and
+precision-recall curves, ROC AUC and average precision in O(n log n),
+instead of re-thresholding the catalog once per candidate cut.
+
+Three thresholds are recommended:
+
+    min_precision  highest recall with precision >= ``min_precision`` (the
+                   notebook's rule, 0.75 by default); falls back to max_f1
+                   when no cut reaches that precision
+    max_f1         highest F1
+    youden         highest TPR - FPR
+
+The detector classifies a candidate as an exoplanet when its probability is
+strictly above ``decision_threshold``, so a cut that keeps every score >= s
+is stored as the midpoint between s and the next lower score.
+
+The threshold is stored with the model in its bundle (see ``model_bundle``):
+    python evaluation.py cumulative_2025.10.04_14.14.53.csv --write-bundle exoplanet_model.bundle
+
+Author: Felipe Coutinho
+NASA Space Apps Challenge 2025
+"""
+
+import argparse
+import json
+import logging
+import time
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from exoplanet_detector_model import ExoplanetDetector
+
+logger = logging.getLogger(__name__)
+
+# Dispositions of the cumulative KOI table; anything else is not a label
+POSITIVE_DISPOSITIONS = ("CONFIRMED", "CANDIDATE")
+NEGATIVE_DISPOSITIONS = ("FALSE POSITIVE",)
+
+DEFAULT_MIN_PRECISION = 0.75
+
+# Points per curve in reports
+CURVE_POINTS = 101
+
+
+def disposition_labels(dispositions) -> np.ndarray:
+    """
+    Map KOI dispositions to labels.
+
+    Args:
+        dispositions: ``koi_disposition`` values
+
+    Returns:
+        np.ndarray: 1 for CONFIRMED/CANDIDATE, 0 for FALSE POSITIVE and -1
+                    for rows without a usable disposition
+    """
+    import pandas as pd
+
+    normalized = pd.Series(dispositions, dtype=object).astype(str).str.strip().str.upper()
+    labels = np.full(len(normalized), -1, dtype=np.int64)
+    labels[normalized.isin(POSITIVE_DISPOSITIONS).to_numpy()] = 1
+    labels[normalized.isin(NEGATIVE_DISPOSITIONS).to_numpy()] = 0
+    return labels
+
+
+def threshold_curve(y_true: np.ndarray, scores: np.ndarray) -> Dict[str, Any]:
+    """
+    Confusion counts at every distinct score, from a single sort.
+
+    Entry i describes the cut that classifies every score >= ``scores[i]``
+    as positive; scores are in decreasing order.
+
+    Args:
+        y_true: Binary labels
+        scores: Predicted probabilities
+
+    Returns:
+        Dict: ``scores``, ``tp``, ``fp``, ``precision``, ``recall`` (TPR)
+              and ``fpr`` arrays, the ``positives``/``negatives`` totals,
+              ``roc_auc`` and ``average_precision``
+
+    Raises:
+        ValueError: If the labels do not contain both classes
+    """
+    y_true = np.asarray(y_true, dtype=np.int64)
+    scores = np.asarray(scores, dtype=np.float64)
+    positives = int(y_true.sum())
+    negatives = len(y_true) - positives
+    if positives == 0 or negatives == 0:
+        raise ValueError("Evaluation needs both positive and negative labels")
+
+    order = np.argsort(scores, kind="stable")[::-1]
+    sorted_scores = scores[order]
+    # Last position of each run of equal scores
+    cut = np.r_[np.flatnonzero(np.diff(sorted_scores)), len(sorted_scores) - 1]
+    tp = np.cumsum(y_true[order])[cut]
+    fp = cut + 1 - tp
+
+    precision = tp / (tp + fp)
+    recall = tp / positives
+    fpr = fp / negatives
+
+    # Trapezoids from (0, 0), summed directly (np.trapezoid needs NumPy 2);
+    # precision-weighted recall steps
+    tpr_points, fpr_points = np.r_[0.0, recall], np.r_[0.0, fpr]
+    roc_auc = float(np.sum(np.diff(fpr_points) * (tpr_points[1:] + tpr_points[:-1]) / 2))
+    average_precision = float(np.sum(np.diff(np.r_[0.0, recall]) * precision))
+
+    return {
+        "scores": sorted_scores[cut],
+        "tp": tp,
+        "fp": fp,
+        "precision": precision,
+        "recall": recall,
+        "fpr": fpr,
+        "positives": positives,
+        "negatives": negatives,
+        "roc_auc": roc_auc,
+        "average_precision": average_precision
+    }
+
+
+def decision_threshold_at(curve: Dict[str, Any], index: int) -> float:
+    """
+    Threshold for ``probability > threshold`` equivalent to curve cut ``index``.
+
+    Args:
+        curve: Result of ``threshold_curve``
+        index: Cut position
+
+    Returns:
+        float: Midpoint between the cut's score and the next lower score
+    """
+    scores = curve["scores"]
+    if index + 1 < len(scores):
+        return float((scores[index] + scores[index + 1]) / 2)
+    return float(np.nextafter(scores[index], -np.inf))
+
+
+def choose_thresholds(curve: Dict[str, Any],
+                      min_precision: float = DEFAULT_MIN_PRECISION) -> Dict[str, Dict[str, Any]]:
+    """
+    Recommend decision thresholds from a threshold curve.
+
+    Args:
+        curve: Result of ``threshold_curve``
+        min_precision: Precision the ``min_precision`` threshold must reach
+
+    Returns:
+        Dict: ``min_precision``, ``max_f1`` and ``youden`` choices, each with
+              the ``threshold`` and its precision, recall, F1 and FPR
+    """
+    precision, recall = curve["precision"], curve["recall"]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        f1 = np.nan_to_num(2 * precision * recall / (precision + recall))
+
+    def choice(index: int, rule: str) -> Dict[str, Any]:
+        return {
+            "rule": rule,
+            "threshold": decision_threshold_at(curve, index),
+            "precision": float(precision[index]),
+            "recall": float(recall[index]),
+            "f1": float(f1[index]),
+            "fpr": float(curve["fpr"][index])
+        }
+
+    best_f1 = int(np.argmax(f1))
+    eligible = np.flatnonzero(precision >= min_precision)
+    if len(eligible):
+        # Recall only grows with the cut; among ties keep the highest precision
+        best_recall = recall[eligible].max()
+        candidates = eligible[recall[eligible] == best_recall]
+        constrained = choice(int(candidates[np.argmax(precision[candidates])]), f"precision >= {min_precision}")
+    else:
+        logger.warning(f"No threshold reaches precision {min_precision}; using the F1-optimal threshold")
+        constrained = choice(best_f1, "max F1 (precision target not reached)")
+
+    return {
+        "min_precision": constrained,
+        "max_f1": choice(best_f1, "max F1"),
+        "youden": choice(int(np.argmax(recall - curve["fpr"])), "max TPR - FPR")
+    }
+
+
+def threshold_metrics(y_true: np.ndarray, scores: np.ndarray, threshold: float) -> Dict[str, Any]:
+    """
+    Classification metrics at a decision threshold.
+
+    Args:
+        y_true: Binary labels
+        scores: Predicted probabilities
+        threshold: Probability above which a row is classified positive
+
+    Returns:
+        Dict: Accuracy, precision, recall, F1 and the confusion matrix
+              ``[[tn, fp], [fn, tp]]``
+    """
+    y_true = np.asarray(y_true, dtype=bool)
+    predicted = np.asarray(scores) > threshold
+    tp = int(np.sum(predicted & y_true))
+    fp = int(np.sum(predicted & ~y_true))
+    fn = int(np.sum(~predicted & y_true))
+    tn = len(y_true) - tp - fp - fn
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    return {
+        "threshold": float(threshold),
+        "accuracy": (tp + tn) / len(y_true),
+        "precision": precision,
+        "recall": recall,
+        "f1": 2 * precision * recall / (precision + recall) if precision + recall else 0.0,
+        "confusion_matrix": [[tn, fp], [fn, tp]]
+    }
+
+
+def _downsample(curve: Dict[str, Any], points: int) -> np.ndarray:
+    """Cut positions spread evenly along a curve, including both ends."""
+    n_cuts = len(curve["scores"])
+    if n_cuts <= points:
+        return np.arange(n_cuts)
+    return np.unique(np.linspace(0, n_cuts - 1, points).round().astype(np.int64))
+
+
+def evaluate_scores(y_true: np.ndarray, scores: np.ndarray,
+                    current_threshold: Optional[float] = None,
+                    min_precision: float = DEFAULT_MIN_PRECISION,
+                    curve_points: int = CURVE_POINTS) -> Dict[str, Any]:
+    """
+    Full evaluation report of predicted probabilities.
+
+    Args:
+        y_true: Binary labels
+        scores: Predicted probabilities
+        current_threshold: Threshold the model currently uses, reported
+                           alongside the recommendations
+        min_precision: Precision target of the recommended threshold
+        curve_points: Maximum points per reported curve
+
+    Returns:
+        Dict: Report with ``rows``, ``positives``, ``negatives``,
+              ``roc_auc``, ``average_precision``, ``thresholds`` (see
+              ``choose_thresholds``), ``recommended_threshold``, metrics
+              ``at_current_threshold`` and ``at_recommended_threshold``,
+              and downsampled ``roc_curve``/``pr_curve``
+    """
+    curve = threshold_curve(y_true, scores)
+    thresholds = choose_thresholds(curve, min_precision)
+    recommended = thresholds["min_precision"]["threshold"]
+    points = _downsample(curve, curve_points)
+
+    report = {
+        "rows": int(len(scores)),
+        "positives": curve["positives"],
+        "negatives": curve["negatives"],
+        "roc_auc": curve["roc_auc"],
+        "average_precision": curve["average_precision"],
+        "min_precision": min_precision,
+        "thresholds": thresholds,
+        "recommended_threshold": recommended,
+        "at_recommended_threshold": threshold_metrics(y_true, scores, recommended),
+        "roc_curve": {
+            "fpr": np.r_[0.0, curve["fpr"][points]].tolist(),
+            "tpr": np.r_[0.0, curve["recall"][points]].tolist(),
+            "score": np.r_[1.0, curve["scores"][points]].tolist()
+        },
+        "pr_curve": {
+            "recall": curve["recall"][points].tolist(),
+            "precision": curve["precision"][points].tolist(),
+            "score": curve["scores"][points].tolist()
+        }
+    }
+    if current_threshold is not None:
+        report["current_threshold"] = float(current_threshold)
+        report["at_current_threshold"] = threshold_metrics(y_true, scores, current_threshold)
+    return report
+
+
+def evaluate_catalog(detector: "ExoplanetDetector", df: "pd.DataFrame",
+                     min_precision: float = DEFAULT_MIN_PRECISION,
+                     curve_points: int = CURVE_POINTS) -> Dict[str, Any]:
+    """
+    Score a labeled catalog in one batch and evaluate the detector on it.
+
+    Args:
+        detector: Loaded detector
+        df: Catalog with ``koi_disposition`` and the model's feature columns
+        min_precision: Precision target of the recommended threshold
+        curve_points: Maximum points per reported curve
+
+    Returns:
+        Dict: ``evaluate_scores`` report, plus the ``unlabeled_rows`` and
+              ``failed_rows`` left out of it
+
+    Raises:
+        ValueError: If the catalog has no ``koi_disposition`` column, cannot
+                    be scored or lacks one of the two classes
+    """
+    if 'koi_disposition' not in df.columns:
+        raise ValueError("Labeled catalog needs a 'koi_disposition' column")
+
+    labels = disposition_labels(df['koi_disposition'])
+    labeled = labels >= 0
+
+    batch = detector.predict_batch(df.loc[labeled, detector.features])
+    if not batch["success"]:
+        raise ValueError(batch["error"])
+    scored = ~batch["error_mask"]
+
+    report = evaluate_scores(
+        labels[labeled][scored], batch["probabilities"][scored],
+        current_threshold=detector.decision_threshold,
+        min_precision=min_precision,
+        curve_points=curve_points
+    )
+    report["unlabeled_rows"] = int((~labeled).sum())
+    report["failed_rows"] = int((~scored).sum())
+    return report
+
+
+def write_threshold_bundle(detector: "ExoplanetDetector", output_path: str,
+                           decision_threshold: float) -> Dict:
+    """
+    Write the detector's model as a bundle carrying a new decision threshold.
+
+    Args:
+        detector: Loaded detector, from pickles or a bundle
+        output_path: Destination bundle file (may be the detector's own)
+        decision_threshold: Threshold to store
+
+    Returns:
+        Dict: Bundle header
+    """
+    from model_bundle import write_bundle
+
+    return write_bundle(
+        output_path, detector.load_booster_model(), detector.scaler, detector.features,
+        imputation_medians=detector.imputation_medians,
+        decision_threshold=decision_threshold
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Evaluate the exoplanet detector on a labeled catalog.")
+    parser.add_argument("catalog", help="Labeled catalog CSV with koi_disposition")
+    parser.add_argument("--bundle", help="Model bundle to evaluate (default: the model pickles)")
+    parser.add_argument("--min-precision", type=float, default=DEFAULT_MIN_PRECISION)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--write-bundle", help="Write the model with the recommended threshold to this bundle")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    import pandas as pd
+
+    from exoplanet_detector_model import ExoplanetDetector
+
+    detector = ExoplanetDetector(bundle_path=args.bundle)
+    if not detector.is_loaded:
+        raise SystemExit("Model could not be loaded")
+
+    df = pd.read_csv(args.catalog, comment='#')
+    start = time.perf_counter()
+    report = evaluate_catalog(detector, df, args.min_precision)
+    logger.info(f"Evaluated {report['rows']} rows in {time.perf_counter() - start:.2f}s")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    for name, choice in report["thresholds"].items():
+        print(f"{name:>13}: threshold {choice['threshold']:.4f}  precision {choice['precision']:.3f}  "
+              f"recall {choice['recall']:.3f}  F1 {choice['f1']:.3f}")
+    print(f"ROC AUC {report['roc_auc']:.4f}, average precision {report['average_precision']:.4f}")
+
+    if args.write_bundle:
+        write_threshold_bundle(detector, args.write_bundle, report["recommended_threshold"])
+        print(f"Wrote {args.write_bundle} with decision threshold {report['recommended_threshold']:.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,17 +14,40 @@ Author: Felipe Coutinho
 NASA Space Apps Challenge 2025
 """
 
-import pandas as pd
 import numpy as np
-import joblib
 import pickle
-from typing import Dict, List, Optional, Union, Tuple
+from typing import TYPE_CHECKING, Dict, List, Optional, Union, Tuple
 import logging
+from datetime import datetime
 from pathlib import Path
+from compiled_model import CompiledTreeEnsemble
+from input_validation import MEDIANS_FILENAME, InputValidator, read_medians
+from metrics import pipeline_metrics
+from prediction_cache import PredictionCache, fingerprint_files
+
+# pandas and joblib (which pulls in the model libraries when unpickling) are
+# imported on first use so that importing this module stays cheap
+if TYPE_CHECKING:
+    import pandas as pd
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Probability above which a candidate is classified as an exoplanet
+# (same cut XGBClassifier.predict applies for binary objectives)
+DECISION_THRESHOLD = 0.5
+
+# Inference engines selectable at construction
+ENGINES = ("xgboost", "compiled")
+
+# Largest batch the compiled engine scores itself. The compiled trees win on
+# per-call overhead, the xgboost runtime on per-row cost; on a single core the
+# two cross at about 256 rows
+COMPILED_MAX_BATCH_ROWS = 256
+
+# Result text for each predicted class
+PREDICTION_TEXTS = {1: "EXOPLANET DETECTED", 0: "NOT AN EXOPLANET"}
+
 
 class ExoplanetDetector:
     """
@@ -36,7 +59,12 @@ class ExoplanetDetector:
     
     def __init__(self, model_path: str = "exoplanet_detector_model.pkl",
                  scaler_path: str = "exoplanet_scaler.pkl",
-                 features_path: str = "exoplanet_features.pkl"):
+                 features_path: str = "exoplanet_features.pkl",
+                 engine: str = "xgboost",
+                 cache: Optional[PredictionCache] = None,
+                 bundle_path: Optional[str] = None,
+                 compiled_max_rows: Optional[int] = COMPILED_MAX_BATCH_ROWS,
+                 medians_path: Optional[str] = None):
         """
         Initialize the exoplanet detector.
         
@@ -44,14 +72,49 @@ class ExoplanetDetector:
             model_path: Path to the trained model file
             scaler_path: Path to the scaler file
             features_path: Path to the features list file
+            engine: Inference engine - "xgboost" runs the scaler and booster
+                    as trained, "compiled" scores raw features with a
+                    CompiledTreeEnsemble (scaler folded into the thresholds),
+                    which avoids the per-call runtime overhead and is much
+                    faster for single candidates and small batches
+            cache: Optional prediction cache; candidates already scored with
+                   the same model are answered from it
+            bundle_path: Optional single-file model bundle (see
+                         ``model_bundle``); when given it is memory-mapped
+                         and used instead of the three pickle files
+            compiled_max_rows: With the compiled engine, batches of more
+                               rows are scored by the xgboost booster, which
+                               is faster per row; None keeps every batch on
+                               the compiled trees
+            medians_path: Training medians used to impute missing cells
+                          (see ``input_validation.write_medians``); defaults
+                          to exoplanet_medians.json next to the model file
         """
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine '{engine}', expected one of {list(ENGINES)}")
+        
         self.model_path = model_path
         self.scaler_path = scaler_path
         self.features_path = features_path
+        self.bundle_path = bundle_path
+        if medians_path is None and model_path is not None:
+            medians_path = str(Path(model_path).with_name(MEDIANS_FILENAME))
+        self.medians_path = medians_path
+        self.engine = engine
+        self.cache = cache
+        self.compiled_max_rows = compiled_max_rows
         
         self.model = None
         self.scaler = None
         self.features = None
+        self.compiled_model = None
+        self.bundle = None
+        self.imputation_medians = None
+        self.validator = None
+        self.decision_threshold = DECISION_THRESHOLD
+        self.base_value = None
+        self._contribution_booster = None
+        self.fingerprint = None
         self.is_loaded = False
         
         # Load components automatically
@@ -65,7 +128,11 @@ class ExoplanetDetector:
             bool: True if loaded successfully, False otherwise
         """
         try:
+            if self.bundle_path is not None:
+                return self._load_bundle()
+            
             logger.info("Loading model components...")
+            import joblib
             
             # Load XGBoost model
             self.model = joblib.load(self.model_path)
@@ -80,6 +147,29 @@ class ExoplanetDetector:
                 self.features = pickle.load(f)
             logger.info(f"Features loaded from: {self.features_path}")
             
+            if self.engine == "compiled":
+                self.compiled_model = CompiledTreeEnsemble.from_model(
+                    self.model, self.scaler, self.features
+                )
+                logger.info("Model compiled for the compiled inference engine")
+            
+            # Load training medians for imputing missing cells
+            artifacts = [self.model_path, self.scaler_path, self.features_path]
+            if self.medians_path is not None and Path(self.medians_path).exists():
+                self.imputation_medians = read_medians(self.medians_path, self.features)
+                artifacts.append(self.medians_path)
+                logger.info(f"Imputation medians loaded from: {self.medians_path}")
+            else:
+                logger.warning(f"No imputation medians at {self.medians_path}; missing cells stay NaN")
+            
+            # Identify the loaded artifacts; cached predictions of any other
+            # model are dropped
+            self.fingerprint = fingerprint_files(artifacts, extra=self.engine)
+            if self.cache is not None:
+                self.cache.bind(self.fingerprint)
+            
+            self.validator = InputValidator(self.features, self.imputation_medians)
+            
             self.is_loaded = True
             logger.info("All components loaded successfully")
             return True
@@ -91,6 +181,33 @@ class ExoplanetDetector:
             logger.error(f"Error loading components: {e}")
             return False
     
+    def _load_bundle(self) -> bool:
+        """Map a single-file model bundle and take every component from it."""
+        from model_bundle import MappedBundle
+        
+        logger.info(f"Mapping model bundle: {self.bundle_path}")
+        self.bundle = MappedBundle(self.bundle_path)
+        self.features = self.bundle.features
+        self.decision_threshold = self.bundle.decision_threshold
+        self.imputation_medians = self.bundle.array("imputation_medians")
+        self.scaler = self.bundle.scaler()
+        
+        if self.engine == "compiled":
+            # The compiled arrays are views of the mapping; nothing is copied
+            self.compiled_model = self.bundle.compiled_model()
+        else:
+            self.model = self.bundle.load_model()
+        
+        self.fingerprint = self.bundle.fingerprint(extra=self.engine)
+        if self.cache is not None:
+            self.cache.bind(self.fingerprint)
+        
+        self.validator = InputValidator(self.features, self.imputation_medians)
+        
+        self.is_loaded = True
+        logger.info("All components loaded from the bundle")
+        return True
+    
     def validate_input(self, data: Dict) -> Tuple[bool, List[str]]:
         """
         Validate if input data contains all required features.
@@ -107,11 +224,33 @@ class ExoplanetDetector:
         if not self.features:
             return False, ["Features not loaded"]
         
-        missing_features = set(self.features) - set(data.keys())
-        if missing_features:
-            return False, [f"Missing features: {list(missing_features)}"]
+        # Key-view comparison; the missing names are only listed on failure
+        if data.keys() >= set(self.features):
+            return True, []
+        missing_features = [feature for feature in self.features if feature not in data]
+        return False, [f"Missing features: {missing_features}"]
+    
+    def clean_record(self, data: Dict) -> Tuple[np.ndarray, Optional[str]]:
+        """
+        Coerce, check and impute one candidate with ``self.validator``.
+        
+        Args:
+            data: Dictionary with all required features
+            
+        Returns:
+            Tuple[np.ndarray, Optional[str]]: (1 x n_features raw feature
+            matrix with missing values imputed, error message or None)
+        """
+        import pandas as pd
         
-        return True, []
+        row = [data[feature] for feature in self.features]
+        try:
+            values = np.asarray([row], dtype=np.float64)
+        except (TypeError, ValueError):
+            # Some cell is not a number; the frame path names it
+            values = pd.DataFrame([row], columns=self.features)
+        result = self.validator.validate(values)
+        return result["X"], result["errors"][0]
     
     def preprocess_data(self, data: Dict) -> np.ndarray:
         """
@@ -122,25 +261,30 @@ class ExoplanetDetector:
             
         Returns:
             np.ndarray: Preprocessed and normalized data
+            
+        Raises:
+            ValueError: If a feature is missing, not a number or out of range
         """
-        # Convert to DataFrame
-        df = pd.DataFrame([data])
-        
-        # Select only required features
-        X = df[self.features].copy()
-        
-        # Handle missing values
-        for column in X.columns:
-            if X[column].isnull().any():
-                median_value = X[column].median()
-                X[column] = X[column].fillna(median_value)
-                logger.warning(f"Missing value filled in {column}: {median_value}")
+        with pipeline_metrics.stage("predict", "preprocess"):
+            is_valid, errors = self.validate_input(data)
+            if not is_valid:
+                raise ValueError("; ".join(errors))
+            X, error = self.clean_record(data)
+            if error is not None:
+                raise ValueError(error)
         
         # Normalize data
-        X_normalized = self.scaler.transform(X)
+        with pipeline_metrics.stage("predict", "scale"):
+            X_normalized = self.scaler.transform(self._feature_frame(X))
         
         return X_normalized
     
+    def _feature_frame(self, X: np.ndarray) -> "pd.DataFrame":
+        """Wrap a raw feature matrix with the column names the scaler was fitted with."""
+        import pandas as pd
+        
+        return pd.DataFrame(X, columns=self.features, copy=False)
+    
     def predict(self, data: Dict) -> Dict:
         """
         MAIN FUNCTION: Classify exoplanet candidate.
@@ -177,9 +321,15 @@ class ExoplanetDetector:
                 "prediction": None
             }
         
-        # Validate input
-        is_valid, errors = self.validate_input(data)
+        # Validate input once; the cleaned row feeds every engine below
+        with pipeline_metrics.stage("predict", "validate"):
+            is_valid, errors = self.validate_input(data)
+            if is_valid:
+                X_raw, error = self.clean_record(data)
+                if error is not None:
+                    is_valid, errors = False, [error]
         if not is_valid:
+            pipeline_metrics.add_rows("predict", 1, failed=1)
             return {
                 "success": False,
                 "error": "; ".join(errors),
@@ -187,42 +337,445 @@ class ExoplanetDetector:
             }
         
         try:
-            # Preprocess data
-            X_processed = self.preprocess_data(data)
+            cache_keys = None
+            cached_probability = None
+            if self.cache is not None:
+                with pipeline_metrics.stage("predict", "cache_lookup"):
+                    cache_keys = self.cache.make_keys(X_raw)
+                    cached_probability = self.cache.get_many(cache_keys)[0]
             
-            # Make prediction
-            prediction = self.model.predict(X_processed)[0]
-            probabilities = self.model.predict_proba(X_processed)[0]
+            if cached_probability is not None:
+                probability_exoplanet = cached_probability
+                prediction = int(probability_exoplanet > self.decision_threshold)
+            elif self.compiled_model is not None:
+                # Raw features go straight to the compiled trees
+                with pipeline_metrics.stage("predict", "model"):
+                    probability_exoplanet = float(self.compiled_model.predict_proba(X_raw)[0])
+                prediction = int(probability_exoplanet > self.decision_threshold)
+            else:
+                # Normalize data
+                with pipeline_metrics.stage("predict", "scale"):
+                    X_processed = self.scaler.transform(self._feature_frame(X_raw))
+                
+                # Make prediction
+                with pipeline_metrics.stage("predict", "model"):
+                    probability_exoplanet = float(self.model.predict_proba(X_processed)[0][1])
+                prediction = int(probability_exoplanet > self.decision_threshold)
             
-            # Calculate confidence
-            confidence = max(probabilities) * 100
+            if cache_keys is not None and cached_probability is None:
+                self.cache.put_many(cache_keys, [probability_exoplanet])
             
-            # Interpret result
-            if prediction == 1:
-                result_text = "EXOPLANET DETECTED"
-                explanation = f"Candidate classified as exoplanet with {confidence:.1f}% confidence"
-            else:
-                result_text = "NOT AN EXOPLANET"
-                explanation = f"Candidate classified as false positive with {confidence:.1f}% confidence"
+            with pipeline_metrics.stage("predict", "interpret"):
+                result = {"success": True}
+                result.update(self.interpret_prediction(int(prediction), probability_exoplanet))
+                result["features_used"] = self.features
+            pipeline_metrics.add_rows("predict", 1)
+            return result
             
+        except Exception as e:
+            pipeline_metrics.add_rows("predict", 1, failed=1)
+            logger.error(f"Error during prediction: {e}")
             return {
-                "success": True,
-                "prediction": int(prediction),
-                "prediction_text": result_text,
-                "probability_exoplanet": float(probabilities[1]),
-                "probability_false_positive": float(probabilities[0]),
-                "confidence": float(confidence),
-                "explanation": explanation,
-                "features_used": self.features
+                "success": False,
+                "error": str(e),
+                "prediction": None
             }
+    
+    def interpret_prediction(self, prediction: int, probability_exoplanet: float) -> Dict:
+        """
+        Build the human-readable fields for a single classification.
+        
+        Args:
+            prediction: Predicted class (1 = exoplanet, 0 = false positive)
+            probability_exoplanet: Probability of the exoplanet class
+            
+        Returns:
+            Dict: Prediction, texts, probabilities and confidence
+        """
+        probability_false_positive = 1.0 - probability_exoplanet
+        
+        # Calculate confidence
+        confidence = max(probability_exoplanet, probability_false_positive) * 100
+        
+        # Interpret result
+        result_text = PREDICTION_TEXTS[int(prediction == 1)]
+        if prediction == 1:
+            explanation = f"Candidate classified as exoplanet with {confidence:.1f}% confidence"
+        else:
+            explanation = f"Candidate classified as false positive with {confidence:.1f}% confidence"
+        
+        return {
+            "prediction": int(prediction),
+            "prediction_text": result_text,
+            "probability_exoplanet": float(probability_exoplanet),
+            "probability_false_positive": float(probability_false_positive),
+            "confidence": float(confidence),
+            "explanation": explanation
+        }
+    
+    def _prepare_batch(self, data: Union["pd.DataFrame", np.ndarray, List[Dict]]
+                       ) -> Tuple["pd.DataFrame", List[Optional[str]], np.ndarray]:
+        """
+        Turn batch input into a validated feature frame in model column order.
+        
+        Cells are coerced, range-checked and imputed column-wise by
+        ``self.validator``; rows with invalid cells are reported, not raised.
+        
+        Args:
+            data: DataFrame with the feature columns, 2-D array whose columns
+                  follow ``self.features``, or list of candidate dictionaries
+            
+        Returns:
+            Tuple[pd.DataFrame, List[Optional[str]], np.ndarray]: (features,
+            per-row errors, per-row mask of rows with imputed cells)
+            
+        Raises:
+            ValueError: If the batch as a whole cannot be interpreted
+        """
+        import pandas as pd
+        
+        record_errors: Optional[List[Optional[str]]] = None
+        if isinstance(data, pd.DataFrame):
+            missing_features = [f for f in self.features if f not in data.columns]
+            if missing_features:
+                raise ValueError(f"Missing features: {missing_features}")
+            frame = data[self.features]
+        elif isinstance(data, np.ndarray):
+            if data.ndim != 2 or data.shape[1] != len(self.features):
+                raise ValueError(
+                    f"Array input must have shape (n_rows, {len(self.features)})"
+                )
+            # Numeric matrices skip the per-column coercion
+            frame = data if np.issubdtype(data.dtype, np.number) else pd.DataFrame(data, columns=self.features)
+        else:
+            records = list(data)
+            record_errors = []
+            for record in records:
+                is_valid, errors = self.validate_input(record)
+                record_errors.append(None if is_valid else "; ".join(errors))
+            frame = pd.DataFrame.from_records(
+                [record if isinstance(record, dict) else {} for record in records],
+                columns=self.features
+            )
+        
+        result = self.validator.validate(frame)
+        errors = result["errors"]
+        if record_errors is not None:
+            # A missing key explains the row better than the resulting NaN
+            errors = [record_error or error for record_error, error in zip(record_errors, errors)]
+        X = pd.DataFrame(result["X"], columns=self.features, copy=False)
+        return X, errors, result["imputed_mask"]
+    
+    def _predict_proba_frame(self, X: "pd.DataFrame", pipeline: str = "predict_batch") -> np.ndarray:
+        """Exoplanet probability for raw feature rows with the configured engine."""
+        if self.compiled_model is not None and (self.compiled_max_rows is None
+                                                or len(X) <= self.compiled_max_rows):
+            with pipeline_metrics.stage(pipeline, "model"):
+                return self.compiled_model.predict_proba(X.to_numpy())
+        model = self.load_booster_model()
+        with pipeline_metrics.stage(pipeline, "scale"):
+            X_normalized = self.scaler.transform(X)
+        with pipeline_metrics.stage(pipeline, "model"):
+            return model.predict_proba(X_normalized)[:, 1]
+    
+    def load_booster_model(self):
+        """
+        Return the XGBoost classifier, loading it from the bundle on first
+        use (compiled-engine bundles only map the tree arrays).
+        
+        Returns:
+            XGBClassifier: The trained classifier
+        """
+        if self.model is None:
+            self.model = self.bundle.load_model()
+        return self.model
+    
+    def _score_frame(self, X: "pd.DataFrame") -> np.ndarray:
+        """Exoplanet probability for raw feature rows, scoring only cache misses."""
+        if self.cache is None:
+            return self._predict_proba_frame(X)
+        
+        with pipeline_metrics.stage("predict_batch", "cache_lookup"):
+            cache_keys = self.cache.make_keys(X.to_numpy())
+            cached = self.cache.get_many(cache_keys)
+        misses = np.fromiter((value is None for value in cached), dtype=bool, count=len(cached))
+        
+        probabilities = np.array([np.nan if value is None else value for value in cached])
+        if misses.any():
+            probabilities[misses] = self._predict_proba_frame(X[misses])
+            self.cache.put_many(
+                [key for key, miss in zip(cache_keys, misses) if miss],
+                probabilities[misses]
+            )
+        return probabilities
+    
+    def predict_batch(self, data: Union["pd.DataFrame", np.ndarray, List[Dict]]) -> Dict:
+        """
+        Classify many candidates with a single scaler and model pass.
+        
+        Args:
+            data: DataFrame containing the required feature columns, 2-D array
+                  with columns ordered as ``self.features``, or list of
+                  candidate dictionaries
             
+        Returns:
+            Dict: Batch result with per-row arrays:
+                  - predictions: Predicted class per row (-1 for failed rows)
+                  - probabilities: Exoplanet probability per row (NaN for failed rows)
+                  - error_mask: True for rows that could not be classified
+                  - errors: Error message per row (None for classified rows)
+                  - imputed_mask: True for rows whose missing cells were
+                    filled with training medians
+        """
+        if not self.is_loaded:
+            return {
+                "success": False,
+                "error": "Model not loaded",
+                "predictions": None
+            }
+        
+        try:
+            with pipeline_metrics.stage("predict_batch", "prepare"):
+                X, errors, imputed_mask = self._prepare_batch(data)
+        except (ValueError, TypeError) as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "predictions": None
+            }
+        
+        n_rows = len(X)
+        error_mask = np.fromiter((e is not None for e in errors), dtype=bool, count=n_rows)
+        predictions = np.full(n_rows, -1, dtype=np.int64)
+        probabilities = np.full(n_rows, np.nan)
+        pipeline_metrics.add_rows("predict_batch", n_rows, failed=int(error_mask.sum()))
+        
+        valid = ~error_mask
+        if valid.any():
+            try:
+                probability_exoplanet = self._score_frame(X[valid])
+            except Exception as e:
+                logger.error(f"Error during batch prediction: {e}")
+                return {
+                    "success": False,
+                    "error": str(e),
+                    "predictions": None
+                }
+            probabilities[valid] = probability_exoplanet
+            predictions[valid] = (probability_exoplanet > self.decision_threshold).astype(np.int64)
+        
+        return {
+            "success": True,
+            "predictions": predictions,
+            "probabilities": probabilities,
+            "error_mask": error_mask,
+            "errors": errors,
+            "imputed_mask": imputed_mask,
+            "features_used": self.features
+        }
+    
+    def explain_batch(self, data: Union["pd.DataFrame", np.ndarray, List[Dict]],
+                      top_k: Optional[int] = None) -> Dict:
+        """
+        Classify many candidates and attribute each score to its features.
+        
+        Contributions are exact TreeSHAP values from the booster's built-in
+        contribution mode (``pred_contribs``), computed for the whole batch
+        in one call. They are in log-odds units and, with ``base_value``, sum
+        to the candidate's margin. Rows whose explanations are already in the
+        prediction cache are not recomputed.
+        
+        Args:
+            data: Same input as ``predict_batch``
+            top_k: Contributions kept per row, largest magnitude first
+                   (default: all features)
+            
+        Returns:
+            Dict: ``predict_batch`` result plus:
+                  - top_features: Feature index per row and rank, shape
+                    (n_rows, k); -1 for failed rows
+                  - top_contributions: Matching contributions (NaN for failed rows)
+                  - base_value: Expected margin, shared by every row
+        """
+        if not self.is_loaded:
+            return {
+                "success": False,
+                "error": "Model not loaded",
+                "predictions": None
+            }
+        
+        try:
+            X, errors, _ = self._prepare_batch(data)
+        except (ValueError, TypeError) as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "predictions": None
+            }
+        
+        n_rows = len(X)
+        n_features = len(self.features)
+        k = n_features if top_k is None else max(1, min(int(top_k), n_features))
+        error_mask = np.fromiter((e is not None for e in errors), dtype=bool, count=n_rows)
+        predictions = np.full(n_rows, -1, dtype=np.int64)
+        probabilities = np.full(n_rows, np.nan)
+        top_features = np.full((n_rows, k), -1, dtype=np.int64)
+        top_contributions = np.full((n_rows, k), np.nan)
+        
+        valid = ~error_mask
+        try:
+            self._load_contribution_booster()
+            if valid.any():
+                probability_exoplanet, features, contributions = self._explain_frame(X[valid], k)
+                probabilities[valid] = probability_exoplanet
+                predictions[valid] = (probability_exoplanet > self.decision_threshold).astype(np.int64)
+                top_features[valid] = features
+                top_contributions[valid] = contributions
         except Exception as e:
-            logger.error(f"Error during prediction: {e}")
+            logger.error(f"Error during batch explanation: {e}")
             return {
                 "success": False,
                 "error": str(e),
+                "predictions": None
+            }
+        
+        return {
+            "success": True,
+            "predictions": predictions,
+            "probabilities": probabilities,
+            "error_mask": error_mask,
+            "errors": errors,
+            "top_features": top_features,
+            "top_contributions": top_contributions,
+            "base_value": self.base_value,
+            "features_used": self.features
+        }
+    
+    def explain(self, data: Dict, top_k: Optional[int] = None) -> Dict:
+        """
+        Classify one candidate and attribute its score to its features.
+        
+        Args:
+            data: Dictionary with candidate data (see ``predict``)
+            top_k: Contributions returned, largest magnitude first
+                   (default: all features)
+            
+        Returns:
+            Dict: ``predict`` result plus ``base_value`` and ``contributions``,
+                  a list of feature, value and contribution entries
+        """
+        is_valid, errors = self.validate_input(data)
+        if not is_valid:
+            return {
+                "success": False,
+                "error": "; ".join(errors),
                 "prediction": None
             }
+        
+        batch = self.explain_batch([data], top_k)
+        if not batch["success"] or batch["error_mask"][0]:
+            return {
+                "success": False,
+                "error": batch["error"] if not batch["success"] else batch["errors"][0],
+                "prediction": None
+            }
+        
+        result = {"success": True}
+        result.update(self.interpret_prediction(int(batch["predictions"][0]), float(batch["probabilities"][0])))
+        result["base_value"] = batch["base_value"]
+        result["contributions"] = [
+            {
+                "feature": self.features[index],
+                "value": data[self.features[index]],
+                "contribution": contribution
+            }
+            for index, contribution in zip(batch["top_features"][0].tolist(), batch["top_contributions"][0].tolist())
+        ]
+        result["features_used"] = self.features
+        return result
+    
+    def _explain_frame(self, X: "pd.DataFrame", k: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Probabilities and top-k contributions for raw feature rows, computing only cache misses."""
+        cache_keys = None
+        cached = [None] * len(X)
+        if self.cache is not None:
+            cache_keys = self.cache.make_keys(X.to_numpy())
+            cached = self.cache.get_explanations(cache_keys, k)
+        misses = np.fromiter((value is None for value in cached), dtype=bool, count=len(cached))
+        
+        probabilities = np.empty(len(X))
+        features = np.empty((len(X), k), dtype=np.int64)
+        contributions = np.empty((len(X), k))
+        for position in np.flatnonzero(~misses):
+            probabilities[position], features[position], contributions[position] = cached[position]
+        
+        if misses.any():
+            X_missed = X[misses]
+            probabilities[misses] = self._predict_proba_frame(X_missed, pipeline="explain")
+            with pipeline_metrics.stage("explain", "contributions"):
+                feature_contributions = self._feature_contributions(X_missed)
+            # Full ranking per row; the cache keeps all of it so any top_k is served
+            order = np.argsort(-np.abs(feature_contributions), axis=1, kind="stable")
+            ranked = np.take_along_axis(feature_contributions, order, axis=1)
+            features[misses] = order[:, :k]
+            contributions[misses] = ranked[:, :k]
+            if self.cache is not None:
+                self.cache.put_many(
+                    [key for key, miss in zip(cache_keys, misses) if miss],
+                    probabilities[misses],
+                    [(tuple(row_order), tuple(row_values))
+                     for row_order, row_values in zip(order.tolist(), ranked.tolist())]
+                )
+        return probabilities, features, contributions
+    
+    def _load_contribution_booster(self):
+        """Booster used for contributions; the compiled engine loads it on first use."""
+        if self._contribution_booster is None:
+            import xgboost as xgb
+            
+            booster = self.load_booster_model().get_booster()
+            # The bias column is the same for every row
+            row = xgb.DMatrix(self.scaler.transform(self._feature_frame(np.asarray(self.scaler.mean_)[None, :])))
+            self.base_value = float(booster.predict(row, pred_contribs=True, validate_features=False)[0, -1])
+            self._contribution_booster = booster
+        return self._contribution_booster
+    
+    def _feature_contributions(self, X: "pd.DataFrame") -> np.ndarray:
+        """TreeSHAP values (log-odds) per feature for raw feature rows."""
+        import xgboost as xgb
+        
+        booster = self._load_contribution_booster()
+        contributions = booster.predict(
+            xgb.DMatrix(self.scaler.transform(X)), pred_contribs=True, validate_features=False
+        )
+        return contributions[:, :-1].astype(np.float64)
+    
+    def warm_up(self, n_rows: int = 64) -> None:
+        """
+        Score a synthetic batch and a single synthetic row once.
+        
+        The first calls into pandas, the scaler and the booster pay for lazy
+        imports and internal setup; running them here keeps that cost off
+        the first real request. The rows are drawn around the scaler's
+        training means and bypass the prediction cache.
+        
+        Args:
+            n_rows: Rows in the synthetic batch
+        """
+        if not self.is_loaded:
+            raise RuntimeError("Model not loaded")
+        
+        rng = np.random.default_rng(0)
+        synthetic = self.scaler.mean_ + rng.standard_normal((n_rows, len(self.features))) * self.scaler.scale_
+        synthetic = self.validator.clip(synthetic)
+        X, _, _ = self._prepare_batch(synthetic)
+        self._predict_proba_frame(X)
+        self._predict_proba_frame(X.iloc[:1])
+        if self.compiled_model is not None and self.compiled_max_rows is not None:
+            # Large batches of the compiled engine run on the booster
+            model = self.load_booster_model()
+            model.predict_proba(self.scaler.transform(X))
+        self.preprocess_data(dict(zip(self.features, synthetic[0])))
     
     def get_model_info(self) -> Dict:
         """
@@ -237,11 +790,16 @@ class ExoplanetDetector:
         return {
             "loaded": True,
             "model_type": "XGBoost",
+            "engine": self.engine,
+            "fingerprint": self.fingerprint,
             "features_count": len(self.features),
             "features": self.features,
+            "decision_threshold": self.decision_threshold,
+            "bundle_path": self.bundle_path,
             "model_path": self.model_path,
             "scaler_path": self.scaler_path,
-            "features_path": self.features_path
+            "features_path": self.features_path,
+            "medians_path": self.medians_path if self.bundle is None and self.imputation_medians is not None else None
         }
 
 
@@ -284,6 +842,45 @@ class ExoplanetAPI:
         # Make prediction
         result = self.detector.predict(candidate_data)
         
+        return self.format_response(result)
+    
+    def process_explain_request(self, request_data: Dict, top_k: Optional[int] = None) -> Dict:
+        """
+        Process a classification request with feature contributions.
+        
+        Args:
+            request_data: HTTP request data
+            top_k: Contributions returned (default: all features)
+            
+        Returns:
+            Dict: Formatted API response; ``data`` also holds ``base_value``
+                  and ``contributions``
+        """
+        if "candidate_data" not in request_data:
+            return {
+                "status": "error",
+                "message": "Field 'candidate_data' is required",
+                "data": None
+            }
+        
+        result = self.detector.explain(request_data["candidate_data"], top_k)
+        response = self.format_response(result)
+        if result["success"]:
+            response["data"]["base_value"] = result["base_value"]
+            response["data"]["contributions"] = result["contributions"]
+        return response
+    
+    @staticmethod
+    def format_response(result: Dict) -> Dict:
+        """
+        Format a detector result as an API response.
+        
+        Args:
+            result: Result of ``ExoplanetDetector.predict``
+            
+        Returns:
+            Dict: Formatted API response
+        """
         if result["success"]:
             return {
                 "status": "success",
@@ -310,6 +907,9 @@ class ExoplanetAPI:
         """
         Check if the system is working.
         
+        Liveness (the process answers) is reported separately from
+        readiness (a loaded model can serve predictions).
+        
         Returns:
             Dict: System status
         """
@@ -317,8 +917,10 @@ class ExoplanetAPI:
         
         return {
             "status": "healthy" if model_info["loaded"] else "unhealthy",
+            "live": True,
+            "ready": model_info["loaded"],
             "model_loaded": model_info["loaded"],
-            "timestamp": pd.Timestamp.now().isoformat()
+            "timestamp": datetime.now().isoformat()
         }
 
 
@@ -0,0 +1,206 @@
+"""
+Inference Executor
+==================
+
+Bounded worker pool for the CPU-bound parts of the API (CSV parsing,
+validation and model scoring), so they run off the asyncio event loop.
+
+Requests beyond the pool's workers wait in a queue of fixed depth; once that
+is full new work is rejected with ExecutorSaturatedError, which the API turns
+into HTTP 503 with a Retry-After header. Light endpoints such as /health
+never enter the pool and stay responsive while heavy uploads are scored.
+
+Author: Felipe Coutinho
+NASA Space Apps Challenge 2025
+"""
+
+import asyncio
+import functools
+import logging
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import HTTPException
+
+from metrics import pipeline_metrics
+
+logger = logging.getLogger(__name__)
+
+EXECUTOR_KINDS = ("thread", "process")
+
+
+class ExecutorSaturatedError(Exception):
+    """Raised when the executor queue is full."""
+
+    def __init__(self, queue_length: int, retry_after: int):
+        super().__init__(f"Inference queue is full ({queue_length} pending requests)")
+        self.queue_length = queue_length
+        self.retry_after = retry_after
+
+
+class _RemoteHTTPError(Exception):
+    """Picklable carrier for an HTTPException raised inside a worker process."""
+
+    def __init__(self, status_code: int, detail: Any, metrics: Optional[Dict] = None):
+        super().__init__(status_code, detail, metrics)
+        self.status_code = status_code
+        self.detail = detail
+        self.metrics = metrics
+
+
+def _init_worker() -> None:
+    """Discard stage metrics a forked worker inherited from the server process."""
+    pipeline_metrics.drain()
+
+
+def _call_in_process(func: Callable, *args) -> Any:
+    """
+    Run ``func`` in a worker process, keeping HTTP errors picklable.
+
+    Returns the result together with the stage metrics the task recorded in
+    the worker, which the parent merges into its own counters.
+    """
+    try:
+        result = func(*args)
+    except HTTPException as e:
+        raise _RemoteHTTPError(e.status_code, e.detail, pipeline_metrics.drain())
+    return result, pipeline_metrics.drain()
+
+
+class InferenceExecutor:
+    """
+    Thread or process pool with a bounded number of pending tasks.
+
+    In process mode, submitted callables and their arguments must be
+    picklable (module-level functions); each worker uses its own copy of any
+    module state, such as the detector, inherited from or re-imported by the
+    parent.
+    """
+
+    def __init__(self, kind: str = "thread", max_workers: int = 4,
+                 max_queue: int = 16, retry_after: int = 1):
+        """
+        Initialize the executor. The pool itself is created on first use.
+
+        Args:
+            kind: "thread" or "process"
+            max_workers: Tasks executed concurrently
+            max_queue: Tasks allowed to wait for a free worker
+            retry_after: Seconds suggested to rejected clients
+        """
+        if kind not in EXECUTOR_KINDS:
+            raise ValueError(f"Unknown executor kind '{kind}', expected one of {list(EXECUTOR_KINDS)}")
+        if max_workers < 1 or max_queue < 0:
+            raise ValueError("max_workers must be >= 1 and max_queue >= 0")
+
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+
+        self._pool: Optional[Executor] = None
+        # Counters are only touched from the event loop thread
+        self._pending = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+
+    @property
+    def pending(self) -> int:
+        """Tasks running or waiting."""
+        return self._pending
+
+    @property
+    def queue_length(self) -> int:
+        """Tasks waiting for a free worker."""
+        return max(0, self._pending - self.max_workers)
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            if self.kind == "process":
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker)
+            else:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="inference"
+                )
+            logger.info(f"Started {self.kind} inference pool with {self.max_workers} workers")
+        return self._pool
+
+    def ensure_capacity(self) -> None:
+        """
+        Reject new work when every worker and queue slot is taken.
+
+        Raises:
+            ExecutorSaturatedError: If the queue is full
+        """
+        if self._pending >= self.max_workers + self.max_queue:
+            self._rejected += 1
+            raise ExecutorSaturatedError(self.queue_length, self.retry_after)
+
+    async def run(self, func: Callable, *args, admit: bool = True) -> Any:
+        """
+        Run ``func(*args)`` on the pool and wait for its result.
+
+        Args:
+            func: Callable to execute
+            *args: Positional arguments for ``func``
+            admit: Apply the queue limit; pass False for follow-up work of a
+                   request that was already admitted (e.g. later batches of
+                   a stream)
+
+        Returns:
+            Any: The callable's return value
+
+        Raises:
+            ExecutorSaturatedError: If ``admit`` is set and the queue is full
+        """
+        if admit:
+            self.ensure_capacity()
+
+        loop = asyncio.get_running_loop()
+        if self.kind == "process":
+            call = functools.partial(_call_in_process, func, *args)
+        else:
+            call = functools.partial(func, *args)
+
+        self._pending += 1
+        try:
+            result = await loop.run_in_executor(self._get_pool(), call)
+            if self.kind == "process":
+                result, worker_metrics = result
+                pipeline_metrics.merge(worker_metrics)
+            self._completed += 1
+            return result
+        except _RemoteHTTPError as e:
+            self._failed += 1
+            pipeline_metrics.merge(e.metrics)
+            raise HTTPException(status_code=e.status_code, detail=e.detail)
+        except Exception:
+            self._failed += 1
+            raise
+        finally:
+            self._pending -= 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return the current load of the executor.
+
+        Returns:
+            Dict: Pool configuration, queue length and task counters
+        """
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "active": min(self._pending, self.max_workers),
+            "queue_length": self.queue_length,
+            "completed": self._completed,
+            "failed": self._failed,
+            "rejected": self._rejected
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker pool."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait)
+            self._pool = None
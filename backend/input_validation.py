@@ -0,0 +1,236 @@
+"""
+Input Validation
+================
+
+Column-wise validation, coercion and imputation of candidate features.
+
+``InputValidator`` checks a whole batch at once instead of one dictionary at
+a time. Cells are coerced to float in one pass per column and compared with
+``FEATURE_RULES`` as boolean masks:
+
+    non_numeric   present, but not a number
+    out_of_range  infinite, outside the feature's bounds, or not one of its
+                  allowed values (e.g. a ``koi_fpflag_*`` other than 0 or 1)
+    missing       null/NaN cells
+
+Rows with non-numeric or out-of-range cells are reported as errors. Missing
+cells are filled from the training medians stored with the model: inside a
+bundle (see ``model_bundle``) or, for the pickled artifacts, in
+``exoplanet_medians.json`` next to them (``write_medians``). Features without
+a stored median stay NaN and are left to the model's learned missing-value
+branches.
+
+Author: Felipe Coutinho
+NASA Space Apps Challenge 2025
+"""
+
+import json
+import logging
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Union
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Training medians stored next to the pickled model artifacts
+MEDIANS_FILENAME = "exoplanet_medians.json"
+
+# Valid domain of the KOI features. "min"/"max" are inclusive bounds unless
+# "exclusive" is set; "allowed" lists the only valid values. Features without
+# a rule only need to be finite.
+FEATURE_RULES: Dict[str, Dict[str, Any]] = {
+    'koi_score': {"min": 0.0, "max": 1.0},
+    'koi_fpflag_nt': {"allowed": (0.0, 1.0)},
+    'koi_fpflag_ss': {"allowed": (0.0, 1.0)},
+    'koi_fpflag_co': {"allowed": (0.0, 1.0)},
+    'koi_fpflag_ec': {"allowed": (0.0, 1.0)},
+    'koi_period': {"min": 0.0, "exclusive": True},
+    'koi_duration': {"min": 0.0, "exclusive": True},
+    'koi_depth': {"min": 0.0},
+    'koi_prad': {"min": 0.0, "exclusive": True},
+    'koi_srad': {"min": 0.0, "exclusive": True},
+    'koi_steff': {"min": 0.0, "exclusive": True},
+    'koi_model_snr': {"min": 0.0}
+}
+
+
+class InputValidator:
+    """
+    Validates and imputes feature matrices against ``FEATURE_RULES``.
+    """
+
+    def __init__(self, features: List[str], medians: Optional[np.ndarray] = None,
+                 rules: Optional[Dict[str, Dict[str, Any]]] = None):
+        """
+        Compile the rules of a model's features into per-column arrays.
+
+        Args:
+            features: Feature names in model column order
+            medians: Training-set median per feature (NaN where unknown)
+            rules: Feature rules (default: ``FEATURE_RULES``)
+        """
+        rules = FEATURE_RULES if rules is None else rules
+        self.features = list(features)
+        self.medians = (np.full(len(self.features), np.nan) if medians is None
+                        else np.asarray(medians, dtype=np.float64))
+        if self.medians.shape != (len(self.features),):
+            raise ValueError(f"Expected {len(self.features)} medians, got {self.medians.shape}")
+
+        self.lower = np.full(len(self.features), -np.inf)
+        self.upper = np.full(len(self.features), np.inf)
+        self.lower_exclusive = np.zeros(len(self.features), dtype=bool)
+        self.allowed: Dict[int, np.ndarray] = {}
+        for position, feature in enumerate(self.features):
+            rule = rules.get(feature, {})
+            self.lower[position] = rule.get("min", -np.inf)
+            self.upper[position] = rule.get("max", np.inf)
+            self.lower_exclusive[position] = rule.get("exclusive", False)
+            if "allowed" in rule:
+                self.allowed[position] = np.asarray(rule["allowed"], dtype=np.float64)
+
+        # Columns sharing a set of allowed values are checked together
+        groups: Dict[tuple, List[int]] = {}
+        for position, allowed in self.allowed.items():
+            groups.setdefault(tuple(allowed), []).append(position)
+        self._allowed_groups = [(np.array(positions), np.array(allowed)) for allowed, positions in groups.items()]
+
+    def coerce(self, frame: "pd.DataFrame") -> Dict[str, np.ndarray]:
+        """
+        Coerce a frame with the feature columns to a float matrix.
+
+        Args:
+            frame: Feature columns in model order, of any dtype
+
+        Returns:
+            Dict: ``values`` (float64, NaN where not a number) and the
+                  ``non_numeric`` mask of cells that held something else
+        """
+        import pandas as pd
+
+        if all(pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+               for dtype in frame.dtypes):
+            values = frame.to_numpy(dtype=np.float64, na_value=np.nan)
+            return {"values": values, "non_numeric": np.zeros(values.shape, dtype=bool)}
+
+        coerced = frame.apply(pd.to_numeric, errors='coerce')
+        values = coerced.to_numpy(dtype=np.float64, na_value=np.nan)
+        return {"values": values, "non_numeric": np.isnan(values) & frame.notna().to_numpy()}
+
+    def validate(self, data: Union["pd.DataFrame", np.ndarray]) -> Dict[str, Any]:
+        """
+        Validate a batch and impute its missing cells.
+
+        Args:
+            data: Frame with the feature columns in model order, or a 2-D
+                  numeric array whose columns follow ``features``
+
+        Returns:
+            Dict: Validation result:
+                  - X: Float matrix with missing cells imputed
+                  - error_mask: True for rows with invalid cells
+                  - errors: Error message per row (None for valid rows)
+                  - imputed_mask: True for rows with imputed cells
+                  - masks: Cell masks ``missing``, ``non_numeric`` and
+                    ``out_of_range``
+        """
+        if isinstance(data, np.ndarray) and np.issubdtype(data.dtype, np.number):
+            values = np.array(data, dtype=np.float64)
+            non_numeric = np.zeros(values.shape, dtype=bool)
+        else:
+            coerced = self.coerce(data)
+            values, non_numeric = coerced["values"], coerced["non_numeric"]
+
+        nan = np.isnan(values)
+        missing = nan & ~non_numeric
+        with np.errstate(invalid="ignore"):
+            out_of_range = (
+                np.isinf(values)
+                | (values < self.lower)
+                | ((values == self.lower) & self.lower_exclusive)
+                | (values > self.upper)
+            )
+        for positions, allowed in self._allowed_groups:
+            columns = values[:, positions]
+            out_of_range[:, positions] |= ~(columns[..., None] == allowed).any(axis=-1) & ~nan[:, positions]
+
+        invalid = non_numeric | out_of_range
+        error_mask = invalid.any(axis=1)
+        errors: List[Optional[str]] = [None] * len(values)
+        for row in np.flatnonzero(error_mask):
+            messages = []
+            if non_numeric[row].any():
+                messages.append(f"Non-numeric values in: {[self.features[i] for i in np.flatnonzero(non_numeric[row])]}")
+            if out_of_range[row].any():
+                messages.append(f"Out of range values in: {[self.features[i] for i in np.flatnonzero(out_of_range[row])]}")
+            errors[row] = "; ".join(messages)
+
+        imputable = missing & np.isfinite(self.medians)
+        imputed_mask = imputable.any(axis=1)
+        if imputed_mask.any():
+            values = np.where(imputable, self.medians, values)
+
+        return {
+            "X": values,
+            "error_mask": error_mask,
+            "errors": errors,
+            "imputed_mask": imputed_mask,
+            "masks": {
+                "missing": missing,
+                "non_numeric": non_numeric,
+                "out_of_range": out_of_range
+            }
+        }
+
+    def clip(self, values: np.ndarray) -> np.ndarray:
+        """
+        Move numeric rows into the valid domain (e.g. for synthetic rows).
+
+        Args:
+            values: 2-D float array with columns in ``features`` order
+
+        Returns:
+            np.ndarray: Copy with every cell inside its feature's bounds and
+                        allowed-value columns snapped to the nearest value
+        """
+        lower = np.where(self.lower_exclusive, np.nextafter(self.lower, np.inf), self.lower)
+        clipped = np.clip(values, lower, self.upper)
+        for position, allowed in self.allowed.items():
+            nearest = np.abs(clipped[:, position, None] - allowed[None, :]).argmin(axis=1)
+            clipped[:, position] = allowed[nearest]
+        return clipped
+
+
+def write_medians(path: str, features: List[str], medians: np.ndarray) -> None:
+    """
+    Store training medians as a JSON object of feature -> median.
+
+    Args:
+        path: Destination file
+        features: Feature names
+        medians: Median per feature (NaN where unknown; stored as null)
+    """
+    payload = {feature: (None if np.isnan(median) else float(median))
+               for feature, median in zip(features, np.asarray(medians, dtype=np.float64))}
+    with open(path, "w") as f:
+        json.dump(payload, f, indent=2)
+        f.write("\n")
+
+
+def read_medians(path: str, features: List[str]) -> np.ndarray:
+    """
+    Read training medians written by ``write_medians``.
+
+    Args:
+        path: Medians file
+        features: Feature names in model column order
+
+    Returns:
+        np.ndarray: Median per feature, NaN for features the file lacks
+    """
+    with open(path) as f:
+        stored = json.load(f)
+    return np.array([np.nan if stored.get(feature) is None else float(stored[feature])
+                     for feature in features])
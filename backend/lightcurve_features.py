@@ -0,0 +1,659 @@
+#!/usr/bin/env python3
+"""
+Light-Curve Features
+====================
+
+Derives the transit features ``ExoplanetDetector`` expects from local
+Kepler/TESS light-curve FITS files, instead of relying on precomputed
+``koi_period``, ``koi_duration`` and ``koi_depth`` catalog columns.
+
+For every target (all files of one KIC/TIC id) the pipeline:
+    1. Reads the PDCSAP flux of each file, keeps good-quality cadences and
+       normalizes every file (quarter/sector) by its median
+    2. Detrends with a running median per continuous segment (the notebook
+       used lightkurve's ``flatten(window_length=401)``), clips upward
+       outliers and bins short cadences to ``bin_minutes``
+    3. Runs a Box Least Squares search over a geometric period grid. Trial
+       periods are folded in chunks with one ``bincount`` per chunk and
+       every box duration is scored with cumulative sums, so the search is
+       vectorized over periods, phases and durations.
+    4. Measures period, epoch, duration, depth and SNR of the best box and
+       adds the stellar parameters from the FITS header
+
+Targets are processed in parallel by a process pool. Each finished target
+is cached as JSON under a key made from its files (name, size, mtime) and
+the search settings, so reruns only process new or changed targets. The
+output table has every model feature column and can be scored directly
+(``--score``) or with ``score_catalog.py``. ``koi_score`` and the
+``koi_fpflag_*`` vetting flags cannot be derived from a light curve and are
+left empty.
+
+Usage:
+    python lightcurve_features.py lightcurves/ lightcurve_features.csv
+    python lightcurve_features.py lightcurves/ features.parquet --workers 8 --score
+
+Reading FITS files needs astropy (installed with lightkurve).
+
+Author: Felipe Coutinho
+NASA Space Apps Challenge 2025
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Add the backend directory to Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+logger = logging.getLogger("lightcurve_features")
+
+# Bump whenever the extraction below changes its output
+PIPELINE_VERSION = 1
+
+DEFAULT_SEARCH: Dict[str, Any] = {
+    "min_period": 0.5,             # days
+    "max_period": 100.0,           # days; also capped at half the baseline
+    "durations": [1.0, 1.5, 2.0, 3.0, 4.5, 6.0, 9.0, 12.0],  # hours
+    "oversample": 2.0,             # period grid steps per shortest duration drift
+    "window_days": 8.0,            # running median window (401 Kepler long cadences)
+    "bin_minutes": 30.0,           # shorter cadences are binned to this
+    "clip_sigma": 4.0,             # upward outliers removed above this
+    "min_points_in_transit": 3
+}
+
+# Time systems: Kepler TIME is BKJD (BJD - 2454833), TESS TIME is BTJD
+# (BJD - 2457000); features use BKJD like the KOI catalog
+BTJD_TO_BKJD = 2457000.0 - 2454833.0
+SOLAR_TO_EARTH_RADII = 109.076
+
+# Cadences folded per chunk of trial periods; small chunks keep the
+# working buffers in cache and are several times faster than large ones
+_CHUNK_CELLS = 1 << 16
+
+_TARGET_PATTERNS = [
+    ("Kepler", re.compile(r"kplr(\d{9})")),
+    ("TESS", re.compile(r"tess\d+-s\d+-(\d{16})-")),
+]
+
+FITS_SUFFIXES = (".fits", ".fits.gz", ".fit")
+
+
+def target_of(path: Path) -> Tuple[str, str]:
+    """
+    Mission and target id from a light-curve file name.
+
+    Args:
+        path: MAST light-curve file, e.g. ``kplr010797460-2009166043257_llc.fits``
+
+    Returns:
+        Tuple[str, str]: Mission ("Kepler", "TESS" or "unknown") and target id
+    """
+    for mission, pattern in _TARGET_PATTERNS:
+        match = pattern.search(path.name)
+        if match:
+            return mission, str(int(match.group(1)))
+    return "unknown", path.name.split(".")[0]
+
+
+def group_targets(input_dir: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Group the FITS files of a directory tree by target.
+
+    Args:
+        input_dir: Directory searched recursively
+
+    Returns:
+        Dict: ``{"<mission>-<id>": {"mission", "id", "files"}}``
+    """
+    targets: Dict[str, Dict[str, Any]] = {}
+    for path in sorted(Path(input_dir).rglob("*")):
+        if not path.is_file() or not path.name.lower().endswith(FITS_SUFFIXES):
+            continue
+        mission, target_id = target_of(path)
+        target = targets.setdefault(
+            f"{mission.lower()}-{target_id}", {"mission": mission, "id": target_id, "files": []}
+        )
+        target["files"].append(str(path))
+    return targets
+
+
+def cache_key(files: List[str], search: Dict[str, Any]) -> str:
+    """Identifies a target's inputs and settings without reading the files."""
+    digest = hashlib.sha256(json.dumps({"version": PIPELINE_VERSION, "search": search}, sort_keys=True).encode())
+    for name in sorted(files):
+        stat = os.stat(name)
+        digest.update(f"{os.path.basename(name)}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return digest.hexdigest()
+
+
+def read_light_curve(path: str) -> Dict[str, Any]:
+    """
+    Read the good-quality PDCSAP cadences of one light-curve file.
+
+    Args:
+        path: Kepler or TESS light-curve FITS file
+
+    Returns:
+        Dict: ``time`` (BKJD), median-normalized ``flux``, ``mission`` and
+              the stellar parameters of the primary header
+    """
+    from astropy.io import fits
+
+    with fits.open(path, memmap=True) as hdul:
+        header = hdul[0].header
+        data = hdul[1].data
+        time_values = np.array(data["TIME"], dtype=np.float64)
+        flux = np.array(data["PDCSAP_FLUX"], dtype=np.float64)
+        quality = np.array(data["QUALITY"]) if "QUALITY" in data.columns.names else np.zeros(len(flux), dtype=int)
+
+    mission = str(header.get("TELESCOP", "Kepler")).strip()
+    good = np.isfinite(time_values) & np.isfinite(flux) & (quality == 0)
+    time_values, flux = time_values[good], flux[good]
+    if mission.upper() == "TESS":
+        time_values = time_values + BTJD_TO_BKJD
+    if len(flux):
+        flux = flux / np.median(flux)
+
+    def header_value(key: str) -> float:
+        value = header.get(key)
+        return float(value) if isinstance(value, (int, float)) else np.nan
+
+    return {
+        "time": time_values,
+        "flux": flux,
+        "mission": mission,
+        "stellar": {
+            "koi_srad": header_value("RADIUS"),
+            "koi_steff": header_value("TEFF"),
+            "koi_slogg": header_value("LOGG"),
+            "koi_kepmag": header_value("KEPMAG")
+        }
+    }
+
+
+def detrend(time_values: np.ndarray, flux: np.ndarray, window_days: float,
+            gap_days: float = 0.5, files: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Divide out a running median, separately for each continuous segment.
+
+    Args:
+        time_values: Sorted cadence times in days
+        flux: Normalized flux
+        window_days: Running median window
+        gap_days: Gaps longer than this start a new segment
+        files: Source file index of each cadence; every file (normalized on
+               its own) also starts a new segment
+
+    Returns:
+        np.ndarray: Flattened flux around 1
+    """
+    from scipy.ndimage import median_filter
+
+    if len(flux) < 3:
+        return flux.copy()
+    cadence = float(np.median(np.diff(time_values)))
+    window = max(3, int(window_days / cadence) | 1)
+    trend = np.empty_like(flux)
+    boundaries = np.diff(time_values) > gap_days
+    if files is not None:
+        boundaries |= np.diff(files) != 0
+    breaks = np.flatnonzero(boundaries) + 1
+    for segment in np.split(np.arange(len(flux)), breaks):
+        trend[segment] = median_filter(flux[segment], size=min(window, len(segment) | 1), mode="nearest")
+    return flux / trend
+
+
+def bin_light_curve(time_values: np.ndarray, flux: np.ndarray,
+                    bin_days: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Average cadences into bins of ``bin_days``; coarser light curves are returned as they are."""
+    if len(time_values) < 2 or np.median(np.diff(time_values)) >= 0.9 * bin_days:
+        return time_values, flux
+    index = np.floor((time_values - time_values[0]) / bin_days).astype(np.int64)
+    counts = np.bincount(index)
+    occupied = counts > 0
+    binned_time = np.bincount(index, weights=time_values)[occupied] / counts[occupied]
+    binned_flux = np.bincount(index, weights=flux)[occupied] / counts[occupied]
+    return binned_time, binned_flux
+
+
+def period_grid(baseline: float, min_period: float, max_period: float,
+                min_duration: float, oversample: float) -> np.ndarray:
+    """
+    Geometric grid of trial periods.
+
+    Consecutive periods differ by the drift that moves a transit of the
+    shortest duration by ``1 / oversample`` of its length over the baseline.
+
+    Args:
+        baseline: Time span of the light curve in days
+        min_period: Shortest period in days
+        max_period: Longest period in days, capped at half the baseline
+        min_duration: Shortest trial duration in days
+        oversample: Grid density factor
+
+    Returns:
+        np.ndarray: Increasing trial periods
+    """
+    max_period = min(max_period, baseline / 2)
+    if max_period <= min_period:
+        raise ValueError(f"Light curve spans {baseline:.2f} days, too short for periods from {min_period} days")
+    ratio = 1.0 + min_duration / (oversample * baseline)
+    steps = int(math.ceil(math.log(max_period / min_period) / math.log(ratio)))
+    return min_period * ratio ** np.arange(steps + 1)
+
+
+def bls_search(time_values: np.ndarray, flux: np.ndarray, periods: np.ndarray,
+               durations: np.ndarray, min_points: int = 3) -> Dict[str, np.ndarray]:
+    """
+    Box Least Squares search, vectorized over chunks of trial periods.
+
+    Phases are binned to a third of the shortest duration. For a chunk of
+    neighbouring periods the folded light curves are accumulated with one
+    ``bincount`` into a (periods x phase bins) matrix; wrapped cumulative
+    sums then give every box of every duration in O(bins).
+
+    Args:
+        time_values: Cadence times in days
+        flux: Detrended flux around 1
+        periods: Trial periods in days, increasing
+        durations: Trial durations in days
+        min_points: Fewest in-transit points a box may have
+
+    Returns:
+        Dict: Per trial period ``power`` (signal residue, 0 when no box
+              qualifies), ``depth``, ``duration`` and ``phase`` (box center
+              as a fraction of the period after ``time_values[0]``)
+    """
+    y = flux - flux.mean()
+    t = time_values - time_values[0]
+    n = len(y)
+    bin_width = float(np.min(durations)) / 3.0
+    box_bins = np.unique(np.maximum(1, np.round(durations / bin_width).astype(np.int64)))
+
+    result = {name: np.zeros(len(periods)) for name in ("power", "depth", "duration", "phase")}
+    chunk = max(1, _CHUNK_CELLS // max(n, 1))
+    weights = np.tile(y, chunk)
+    # Folding buffers reused by every chunk
+    cycles = np.empty((chunk, n))
+    whole = np.empty((chunk, n))
+    phase_bins = np.empty((chunk, n), dtype=np.int64)
+    row_offsets = np.arange(chunk, dtype=np.int64)[:, None]
+    for start in range(0, len(periods), chunk):
+        trial = periods[start:start + chunk]
+        rows = len(trial)
+        n_bins = int(math.ceil(trial[-1] / bin_width))
+        cells = rows * n_bins
+
+        folded = cycles[:rows]
+        np.multiply.outer(1.0 / trial, t, out=folded)
+        np.floor(folded, out=whole[:rows])
+        folded -= whole[:rows]
+        folded *= n_bins
+        index = phase_bins[:rows]
+        np.copyto(index, folded, casting="unsafe")
+        np.minimum(index, n_bins - 1, out=index)
+        index += row_offsets[:rows] * n_bins
+        counts = np.bincount(index.ravel(), minlength=cells).reshape(rows, n_bins)
+        sums = np.bincount(index.ravel(), weights=weights[:rows * n], minlength=cells).reshape(rows, n_bins)
+
+        # Wrap the first bins around so boxes can straddle phase 0
+        wrap = min(int(box_bins[-1]), n_bins)
+        cumulative_counts = np.zeros((rows, n_bins + wrap + 1))
+        cumulative_sums = np.zeros((rows, n_bins + wrap + 1))
+        np.cumsum(np.concatenate([counts, counts[:, :wrap]], axis=1), axis=1, out=cumulative_counts[:, 1:])
+        np.cumsum(np.concatenate([sums, sums[:, :wrap]], axis=1), axis=1, out=cumulative_sums[:, 1:])
+
+        best_power = np.zeros(rows)
+        best_depth = np.zeros(rows)
+        best_bins = np.zeros(rows)
+        best_phase = np.zeros(rows)
+        for k in box_bins[box_bins <= n_bins]:
+            n_in = cumulative_counts[:, k:k + n_bins] - cumulative_counts[:, :n_bins]
+            s_in = cumulative_sums[:, k:k + n_bins] - cumulative_sums[:, :n_bins]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                power = np.where(
+                    (n_in >= min_points) & (n_in < n) & (s_in < 0),
+                    s_in * s_in / (n_in * (1.0 - n_in / n)),
+                    0.0
+                )
+            position = power.argmax(axis=1)
+            candidate = power[np.arange(rows), position]
+            better = candidate > best_power
+            if better.any():
+                n_best = n_in[better, position[better]]
+                best_power[better] = candidate[better]
+                best_depth[better] = -s_in[better, position[better]] / n_best / (1.0 - n_best / n)
+                best_bins[better] = k
+                best_phase[better] = (position[better] + k / 2.0) / n_bins
+
+        window = slice(start, start + rows)
+        result["power"][window] = best_power
+        result["depth"][window] = best_depth
+        result["duration"][window] = best_bins * trial / n_bins
+        result["phase"][window] = best_phase % 1.0
+    return result
+
+
+def transit_features(time_values: np.ndarray, flux: np.ndarray, period: float, t0: float,
+                     duration: float) -> Dict[str, float]:
+    """
+    Depth, SNR and transit count of a box model on the unbinned light curve.
+
+    Args:
+        time_values: Cadence times in days
+        flux: Detrended flux around 1
+        period: Orbital period in days
+        t0: Mid-transit time in days
+        duration: Transit duration in days
+
+    Returns:
+        Dict: ``depth`` (relative), ``snr``, ``n_transits`` and ``n_in_transit``
+    """
+    offset = (time_values - t0 + 0.5 * period) % period - 0.5 * period
+    in_transit = np.abs(offset) < 0.5 * duration
+    if in_transit.sum() < 1 or in_transit.all():
+        return {"depth": np.nan, "snr": np.nan, "n_transits": 0, "n_in_transit": int(in_transit.sum())}
+    out_flux = flux[~in_transit]
+    depth = float(np.median(out_flux) - flux[in_transit].mean())
+    sigma = 1.4826 * float(np.median(np.abs(out_flux - np.median(out_flux))))
+    epochs = np.unique(np.round((time_values[in_transit] - t0) / period))
+    return {
+        "depth": depth,
+        "snr": depth / sigma * math.sqrt(in_transit.sum()) if sigma > 0 else np.nan,
+        "n_transits": int(len(epochs)),
+        "n_in_transit": int(in_transit.sum())
+    }
+
+
+def extract_features(time_values: np.ndarray, flux: np.ndarray,
+                     search: Optional[Dict[str, Any]] = None,
+                     stellar: Optional[Dict[str, float]] = None,
+                     files: Optional[np.ndarray] = None) -> Dict[str, Any]:
+    """
+    Detrend a normalized light curve, search it and return catalog features.
+
+    Args:
+        time_values: Cadence times in BKJD
+        flux: Median-normalized flux
+        search: Overrides of ``DEFAULT_SEARCH``
+        stellar: ``koi_srad``, ``koi_steff``, ``koi_slogg`` and ``koi_kepmag``
+        files: Source file index of each cadence, for detrending files apart
+
+    Returns:
+        Dict: The model's ``koi_*`` features in catalog units (period in
+              days, duration in hours, depth in ppm) plus search diagnostics
+    """
+    settings = {**DEFAULT_SEARCH, **(search or {})}
+    order = np.argsort(time_values)
+    time_values, flux = time_values[order], flux[order]
+    if files is not None:
+        files = np.asarray(files)[order]
+
+    flat = detrend(time_values, flux, settings["window_days"], files=files)
+    deviation = 1.4826 * np.median(np.abs(flat - np.median(flat)))
+    keep = np.isfinite(flat) & (flat < np.median(flat) + settings["clip_sigma"] * deviation)
+    time_values, flat = time_values[keep], flat[keep]
+
+    binned_time, binned_flux = bin_light_curve(time_values, flat, settings["bin_minutes"] / 1440.0)
+    durations = np.asarray(settings["durations"], dtype=np.float64) / 24.0
+    periods = period_grid(
+        float(binned_time[-1] - binned_time[0]), settings["min_period"], settings["max_period"],
+        float(durations.min()), settings["oversample"]
+    )
+    spectrum = bls_search(binned_time, binned_flux, periods, durations, settings["min_points_in_transit"])
+
+    best = int(np.argmax(spectrum["power"]))
+    period = float(periods[best])
+    duration = float(spectrum["duration"][best])
+    t0 = float(binned_time[0] + spectrum["phase"][best] * period)
+    measured = transit_features(time_values, flat, period, t0, duration)
+
+    stellar = stellar or {}
+    srad = stellar.get("koi_srad", np.nan)
+    depth = measured["depth"]
+    return {
+        "koi_period": period,
+        "koi_time0bk": t0,
+        "koi_duration": duration * 24.0,
+        "koi_depth": depth * 1e6,
+        "koi_prad": math.sqrt(depth) * srad * SOLAR_TO_EARTH_RADII if depth > 0 else np.nan,
+        "koi_srad": srad,
+        "koi_steff": stellar.get("koi_steff", np.nan),
+        "koi_slogg": stellar.get("koi_slogg", np.nan),
+        "koi_kepmag": stellar.get("koi_kepmag", np.nan),
+        "koi_score": np.nan,
+        "koi_fpflag_nt": np.nan,
+        "koi_fpflag_ss": np.nan,
+        "koi_fpflag_co": np.nan,
+        "koi_fpflag_ec": np.nan,
+        "koi_model_snr": measured["snr"],
+        "n_transits": measured["n_transits"],
+        "n_points": int(len(time_values)),
+        "n_periods": int(len(periods))
+    }
+
+
+def process_target(name: str, target: Dict[str, Any], search: Dict[str, Any],
+                   cache_path: Optional[str]) -> Dict[str, Any]:
+    """
+    Extract the features of one target and cache them.
+
+    Runs in a worker process. Errors are returned in the row instead of
+    raised, so one unreadable target does not stop a large run.
+
+    Args:
+        name: Target key from ``group_targets``
+        target: Mission, id and files of the target
+        search: Search settings
+        cache_path: JSON file the row is cached in, if caching is enabled
+
+    Returns:
+        Dict: Feature row with ``target``, ``mission``, ``kepid``,
+              ``files``, ``seconds`` and ``error``
+    """
+    start = time.perf_counter()
+    row: Dict[str, Any] = {
+        "target": name,
+        "mission": target["mission"],
+        "kepid": int(target["id"]) if target["mission"] == "Kepler" else None,
+        "files": len(target["files"])
+    }
+    try:
+        curves = [read_light_curve(path) for path in target["files"]]
+        curves = [curve for curve in curves if len(curve["flux"])]
+        if not curves:
+            raise ValueError("No good-quality cadences")
+        stellar = {
+            key: next((c["stellar"][key] for c in curves if np.isfinite(c["stellar"][key])), np.nan)
+            for key in curves[0]["stellar"]
+        }
+        row.update(extract_features(
+            np.concatenate([curve["time"] for curve in curves]),
+            np.concatenate([curve["flux"] for curve in curves]),
+            search,
+            stellar,
+            np.repeat(np.arange(len(curves)), [len(curve["flux"]) for curve in curves])
+        ))
+        row["error"] = None
+    except Exception as e:
+        logger.warning(f"Target {name} failed: {e}")
+        row["error"] = str(e)
+        return {**row, "seconds": time.perf_counter() - start}
+
+    row["seconds"] = time.perf_counter() - start
+    if cache_path is not None:
+        temporary = f"{cache_path}.{os.getpid()}.tmp"
+        with open(temporary, "w") as f:
+            json.dump(row, f)
+        os.replace(temporary, cache_path)
+    return row
+
+
+def score_features(frame, model_path: str, scaler_path: str, features_path: str,
+                   bundle_path: Optional[str] = None):
+    """Add ``prediction`` and ``probability_exoplanet`` columns with one batch pass."""
+    from exoplanet_detector_model import ExoplanetDetector
+
+    detector = ExoplanetDetector(
+        model_path=model_path,
+        scaler_path=scaler_path,
+        features_path=features_path,
+        bundle_path=bundle_path
+    )
+    valid = frame["error"].isna().to_numpy()
+    frame["prediction"] = -1
+    frame["probability_exoplanet"] = np.nan
+    if valid.any():
+        batch = detector.predict_batch(frame.loc[valid, detector.features])
+        if not batch["success"]:
+            raise ValueError(batch["error"])
+        frame.loc[valid, "prediction"] = batch["predictions"]
+        frame.loc[valid, "probability_exoplanet"] = batch["probabilities"]
+    return frame
+
+
+def extract_directory(input_dir: str, output_path: str, workers: Optional[int] = None,
+                      search: Optional[Dict[str, Any]] = None, cache_dir: Optional[str] = None,
+                      score: bool = False,
+                      model_path: str = "exoplanet_detector_model.pkl",
+                      scaler_path: str = "exoplanet_scaler.pkl",
+                      features_path: str = "exoplanet_features.pkl",
+                      bundle_path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Extract transit features for every target of a light-curve directory.
+
+    Args:
+        input_dir: Directory of Kepler/TESS light-curve FITS files
+        output_path: Feature table, Parquet if it ends in ``.parquet``,
+                     CSV otherwise
+        workers: Worker processes (default: one per CPU)
+        search: Overrides of ``DEFAULT_SEARCH``
+        cache_dir: Per-target cache (default: ``.lightcurve_cache`` next
+                   to the output); an empty string disables caching
+        score: Score the table with ``ExoplanetDetector``
+        model_path: Path to the trained model file
+        scaler_path: Path to the scaler file
+        features_path: Path to the features list file
+        bundle_path: Single-file model bundle to score with instead
+
+    Returns:
+        Dict: Target counts, timing and throughput
+    """
+    import pandas as pd
+
+    settings = {**DEFAULT_SEARCH, **(search or {})}
+    targets = group_targets(input_dir)
+    if not targets:
+        raise ValueError(f"No light-curve FITS files found in {input_dir}")
+    if cache_dir is None:
+        cache_dir = str(Path(output_path).resolve().parent / ".lightcurve_cache")
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+
+    rows: List[Dict[str, Any]] = []
+    pending = []
+    for name, target in targets.items():
+        cache_path = None
+        if cache_dir:
+            cache_path = os.path.join(cache_dir, f"{name}-{cache_key(target['files'], settings)[:16]}.json")
+            if os.path.exists(cache_path):
+                with open(cache_path) as f:
+                    rows.append(json.load(f))
+                continue
+        pending.append((name, target, cache_path))
+    workers = workers or os.cpu_count() or 1
+    logger.info(f"{len(targets)} targets, {len(rows)} cached, {len(pending)} to process with {workers} workers")
+
+    start = time.perf_counter()
+    if pending:
+        with ProcessPoolExecutor(max_workers=min(workers, len(pending))) as pool:
+            futures = [pool.submit(process_target, name, target, settings, cache_path)
+                       for name, target, cache_path in pending]
+            for done, future in enumerate(as_completed(futures), start=1):
+                row = future.result()
+                rows.append(row)
+                logger.info(f"Target {row['target']} in {row['seconds']:.2f}s ({done}/{len(pending)})")
+    elapsed = time.perf_counter() - start
+
+    frame = pd.DataFrame(rows).sort_values("target", ignore_index=True)
+    if score:
+        frame = score_features(frame, model_path, scaler_path, features_path, bundle_path)
+    if output_path.endswith(".parquet"):
+        frame.to_parquet(output_path, index=False)
+    else:
+        frame.to_csv(output_path, index=False)
+
+    return {
+        "targets": len(targets),
+        "processed": len(pending),
+        "cached": len(targets) - len(pending),
+        "failed": int(frame["error"].notna().sum()),
+        "exoplanets_detected": int((frame["prediction"] == 1).sum()) if score else None,
+        "seconds": elapsed,
+        "targets_per_hour": len(pending) / elapsed * 3600 if pending and elapsed else None
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Extract transit features from local Kepler/TESS light curves.")
+    parser.add_argument("input_dir", help="Directory of light-curve FITS files")
+    parser.add_argument("output", help="Feature table (.csv or .parquet)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--min-period", type=float, default=DEFAULT_SEARCH["min_period"], help="Days")
+    parser.add_argument("--max-period", type=float, default=DEFAULT_SEARCH["max_period"], help="Days")
+    parser.add_argument("--durations", default=",".join(str(d) for d in DEFAULT_SEARCH["durations"]),
+                        help="Comma-separated trial durations in hours")
+    parser.add_argument("--oversample", type=float, default=DEFAULT_SEARCH["oversample"])
+    parser.add_argument("--window-days", type=float, default=DEFAULT_SEARCH["window_days"])
+    parser.add_argument("--cache-dir", help="Per-target cache (default: .lightcurve_cache next to the output)")
+    parser.add_argument("--no-cache", action="store_true", help="Process every target again")
+    parser.add_argument("--score", action="store_true", help="Score the targets with the exoplanet detector")
+    parser.add_argument("--model-path", default=str(backend_dir / "exoplanet_detector_model.pkl"))
+    parser.add_argument("--scaler-path", default=str(backend_dir / "exoplanet_scaler.pkl"))
+    parser.add_argument("--features-path", default=str(backend_dir / "exoplanet_features.pkl"))
+    parser.add_argument("--bundle", help="Single-file model bundle to use instead of the pickles")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+
+    summary = extract_directory(
+        args.input_dir,
+        args.output,
+        workers=args.workers,
+        search={
+            "min_period": args.min_period,
+            "max_period": args.max_period,
+            "durations": [float(d) for d in args.durations.split(",")],
+            "oversample": args.oversample,
+            "window_days": args.window_days
+        },
+        cache_dir="" if args.no_cache else args.cache_dir,
+        score=args.score,
+        model_path=args.model_path,
+        scaler_path=args.scaler_path,
+        features_path=args.features_path,
+        bundle_path=args.bundle
+    )
+
+    print("-" * 50)
+    print(f"Targets:            {summary['targets']} ({summary['cached']} cached, {summary['failed']} failed)")
+    if summary["exoplanets_detected"] is not None:
+        print(f"Exoplanets found:   {summary['exoplanets_detected']}")
+    if summary["targets_per_hour"]:
+        print(f"Throughput:         {summary['targets_per_hour']:.0f} targets/hour in {summary['seconds']:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
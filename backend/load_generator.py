@@ -0,0 +1,418 @@
+"""
+Load Generator
+==============
+
+Closed-loop load test of the exoplanet detection API for capacity planning.
+
+Requests are built from real rows of the Kepler cumulative catalog, sampled
+with a fixed seed, and sent by ``concurrency`` workers that each issue
+their next request as soon as the previous one finished. Each worker picks
+the request type from a weighted mix:
+
+    predict        POST /predict with one candidate
+    predict-json   POST /predict-json with ``--batch-size`` candidates
+    predict-csv    POST /predict-csv with a ``--csv-rows`` row upload
+    catalog        GET /catalog/{kepoi_name} (precomputed scores)
+
+Bodies are encoded before the run, so the generator spends its time waiting
+on the server rather than serializing. The target is a running server
+(``--url``) or the app imported in this process (``--in-process``, through
+an ASGI transport; client and server then share the CPU).
+
+For each concurrency level the report gives throughput (requests and rows
+per second), p50/p90/p99/max latency and error rates, overall and per
+request type; 503 responses (executor saturated) count as errors. With
+several levels (``--concurrency 1 2 4 8 16``) the saturation point is the
+first level at which throughput grows by less than ``--min-gain`` over the
+previous level, the error rate exceeds ``--max-error-rate`` or p99 exceeds
+``--max-p99-ms``; the level before it is the recommended capacity.
+
+Usage:
+    python load_generator.py --url http://localhost:8000 --duration 30 --concurrency 1 2 4 8 16 32
+    python load_generator.py --in-process --mix predict=1 --duration 5
+    python load_generator.py --mix predict=6,predict-json=2,predict-csv=1,catalog=1 --batch-size 50
+
+Author: Felipe Coutinho
+NASA Space Apps Challenge 2025
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from benchmark import CATALOG, json_records
+from dataset_cache import CANDIDATE_FEATURES
+
+logger = logging.getLogger(__name__)
+
+backend_dir = Path(__file__).resolve().parent
+
+REQUEST_TYPES = ["predict", "predict-json", "predict-csv", "catalog"]
+
+DEFAULT_MIX = "predict=8,predict-json=1,predict-csv=1"
+
+# Distinct pre-encoded bodies per request type
+POOL_SIZE = 64
+
+ID_COLUMNS = ["kepid", "kepoi_name", "kepler_name"]
+
+# (method, path, httpx request arguments, rows in the request)
+Request = Tuple[str, str, Dict[str, Any], int]
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """
+    Parse a request mix such as ``predict=8,predict-json=1``.
+
+    Args:
+        text: Comma-separated ``type=weight`` pairs
+
+    Returns:
+        Dict[str, float]: Weight per request type
+
+    Raises:
+        ValueError: On unknown types or non-positive total weight
+    """
+    mix = {}
+    for item in text.split(","):
+        name, _, weight = item.strip().partition("=")
+        if name not in REQUEST_TYPES:
+            raise ValueError(f"Unknown request type '{name}', expected one of {REQUEST_TYPES}")
+        mix[name] = float(weight or 1)
+    if sum(mix.values()) <= 0:
+        raise ValueError("The request mix needs a positive weight")
+    return {name: weight for name, weight in mix.items() if weight > 0}
+
+
+def sample_rows(n_rows: int, seed: int = 0, catalog_path: Path = CATALOG) -> pd.DataFrame:
+    """
+    Sample real catalog rows with the columns the API requires.
+
+    Args:
+        n_rows: Rows to draw (with replacement)
+        seed: Random seed
+        catalog_path: Source catalog
+
+    Returns:
+        pd.DataFrame: Identifier and feature columns
+    """
+    source = pd.read_csv(catalog_path, comment="#", low_memory=False)
+    columns = [column for column in ID_COLUMNS + CANDIDATE_FEATURES if column in source.columns]
+    rng = np.random.default_rng(seed)
+    return source.iloc[rng.integers(0, len(source), n_rows)][columns].reset_index(drop=True)
+
+
+def build_requests(rows: pd.DataFrame, mix: Dict[str, float], batch_size: int = 100,
+                   csv_rows: int = 1000, pool_size: int = POOL_SIZE) -> Dict[str, List[Request]]:
+    """
+    Pre-encode a pool of requests per request type in the mix.
+
+    Args:
+        rows: Sampled catalog rows
+        mix: Request weights
+        batch_size: Candidates per /predict-json request
+        csv_rows: Rows per /predict-csv upload
+        pool_size: Requests per type
+
+    Returns:
+        Dict[str, List[Request]]: Requests per type
+    """
+    json_headers = {"content-type": "application/json"}
+
+    def encode(payload: Any) -> Dict[str, Any]:
+        return {"content": json.dumps(payload).encode("utf-8"), "headers": json_headers}
+
+    def window(start: int, size: int) -> pd.DataFrame:
+        return rows.take(np.arange(start, start + size) % len(rows))
+
+    records = json_records(rows)
+    pools: Dict[str, List[Request]] = {}
+    for name in mix:
+        pool = []
+        for i in range(pool_size):
+            if name == "predict":
+                pool.append(("POST", "/predict", encode({"candidate_data": records[i % len(records)]}), 1))
+            elif name == "predict-json":
+                batch = json_records(window(i * batch_size, batch_size))
+                pool.append(("POST", "/predict-json", encode({"data": batch}), batch_size))
+            elif name == "predict-csv":
+                content = window(i * csv_rows, csv_rows).to_csv(index=False).encode("utf-8")
+                pool.append(("POST", "/predict-csv", {"files": {"file": ("load.csv", content, "text/csv")}}, csv_rows))
+            else:
+                pool.append(("GET", f"/catalog/{records[i % len(records)]['kepoi_name']}", {}, 1))
+        pools[name] = pool
+    return pools
+
+
+async def run_level(client, pools: Dict[str, List[Request]], mix: Dict[str, float],
+                    concurrency: int, duration: float, seed: int = 0) -> Dict[str, Any]:
+    """
+    Run ``concurrency`` closed-loop workers for ``duration`` seconds.
+
+    Args:
+        client: httpx.AsyncClient bound to the target
+        pools: Pre-encoded requests per type
+        mix: Request weights
+        concurrency: Concurrent workers
+        duration: Seconds to run
+        seed: Seed of the workers' request choices
+
+    Returns:
+        Dict: Level summary (see ``summarize_level``)
+    """
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    samples: List[Tuple[str, float, int, int]] = []
+
+    async def worker(number: int) -> None:
+        rng = random.Random(seed * 1_000_003 + number)
+        while time.perf_counter() < deadline:
+            name = rng.choices(names, weights)[0]
+            method, path, arguments, n_rows = rng.choice(pools[name])
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path, **arguments)
+                status = response.status_code
+            except Exception as e:
+                logger.debug(f"{method} {path} failed: {e}")
+                status = 0
+            samples.append((name, time.perf_counter() - start, status, n_rows))
+
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(*(worker(number) for number in range(concurrency)))
+    return summarize_level(samples, time.perf_counter() - started, concurrency)
+
+
+def summarize_samples(samples: List[Tuple[str, float, int, int]], elapsed: float) -> Dict[str, Any]:
+    """
+    Throughput, latency percentiles and errors of a set of requests.
+
+    Args:
+        samples: (type, seconds, status, rows) per request; status 0 for
+                 requests that got no response
+        elapsed: Wall-clock seconds of the run
+
+    Returns:
+        Dict: Requests, rows, throughput, latency percentiles (ms), error
+              count and rate, and responses per status code
+    """
+    latencies = np.array([sample[1] for sample in samples]) * 1000
+    statuses = [sample[2] for sample in samples]
+    ok = sum(1 for status in statuses if 200 <= status < 300)
+    status_counts: Dict[str, int] = {}
+    for status in statuses:
+        key = str(status) if status else "no_response"
+        status_counts[key] = status_counts.get(key, 0) + 1
+
+    summary = {
+        "requests": len(samples),
+        "rows": sum(sample[3] for sample in samples),
+        "throughput_rps": len(samples) / elapsed if elapsed else 0.0,
+        "throughput_rows_per_s": sum(sample[3] for sample in samples) / elapsed if elapsed else 0.0,
+        "errors": len(samples) - ok,
+        "error_rate": (len(samples) - ok) / len(samples) if samples else 0.0,
+        "status_codes": status_counts
+    }
+    if len(latencies):
+        summary.update({
+            "p50_ms": float(np.percentile(latencies, 50)),
+            "p90_ms": float(np.percentile(latencies, 90)),
+            "p99_ms": float(np.percentile(latencies, 99)),
+            "max_ms": float(latencies.max()),
+            "mean_ms": float(latencies.mean())
+        })
+    return summary
+
+
+def summarize_level(samples: List[Tuple[str, float, int, int]], elapsed: float,
+                    concurrency: int) -> Dict[str, Any]:
+    """Overall and per-type summaries of one concurrency level."""
+    by_type: Dict[str, List[Tuple[str, float, int, int]]] = {}
+    for sample in samples:
+        by_type.setdefault(sample[0], []).append(sample)
+    return dict(
+        {"concurrency": concurrency, "seconds": elapsed},
+        **summarize_samples(samples, elapsed),
+        by_type={name: summarize_samples(group, elapsed) for name, group in by_type.items()}
+    )
+
+
+def find_saturation(levels: List[Dict[str, Any]], min_gain: float = 0.1,
+                    max_error_rate: float = 0.01, max_p99_ms: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Find the first concurrency level past the server's capacity.
+
+    Args:
+        levels: Level summaries in increasing concurrency
+        min_gain: Relative throughput gain over the previous level below
+                  which the server counts as saturated
+        max_error_rate: Highest acceptable error rate
+        max_p99_ms: Highest acceptable p99 latency (no limit if None)
+
+    Returns:
+        Dict: ``saturated``; the saturating ``concurrency`` and ``reason``
+              if found; ``capacity`` with the concurrency, throughput and
+              p99 of the last level within limits (None if none was)
+    """
+    capacity = None
+    for level in levels:
+        reason = None
+        if level["error_rate"] > max_error_rate:
+            reason = f"error rate {level['error_rate']:.1%} above {max_error_rate:.1%}"
+        elif max_p99_ms is not None and level.get("p99_ms", 0.0) > max_p99_ms:
+            reason = f"p99 {level['p99_ms']:.1f} ms above {max_p99_ms:.1f} ms"
+        elif capacity is not None and level["throughput_rps"] < capacity["throughput_rps"] * (1 + min_gain):
+            reason = f"throughput grew less than {min_gain:.0%} over concurrency {capacity['concurrency']}"
+        if reason is not None:
+            return {"saturated": True, "concurrency": level["concurrency"], "reason": reason, "capacity": capacity}
+        capacity = {key: level.get(key) for key in ("concurrency", "throughput_rps", "throughput_rows_per_s", "p99_ms")}
+    return {"saturated": False, "capacity": capacity}
+
+
+async def run_load(url: Optional[str], mix: Dict[str, float], concurrencies: List[int],
+                   duration: float, warmup: float = 1.0, batch_size: int = 100,
+                   csv_rows: int = 1000, seed: int = 0, timeout: float = 60.0) -> Dict[str, Any]:
+    """
+    Run the load test at every concurrency level.
+
+    Args:
+        url: Base URL of a running server; None runs the app in process
+        mix: Request weights
+        concurrencies: Concurrency levels, run in increasing order
+        duration: Seconds per level
+        warmup: Seconds of unrecorded load before the first level
+        batch_size: Candidates per /predict-json request
+        csv_rows: Rows per /predict-csv upload
+        seed: Seed of the sampled rows and request choices
+        timeout: Per-request timeout in seconds
+
+    Returns:
+        Dict: Run settings, a summary per level and the saturation analysis
+    """
+    import httpx
+
+    concurrencies = sorted(set(concurrencies))
+    rows = sample_rows(max(POOL_SIZE * max(batch_size, csv_rows if "predict-csv" in mix else 1), POOL_SIZE), seed)
+    pools = build_requests(rows, mix, batch_size, csv_rows)
+    limits = httpx.Limits(max_connections=max(concurrencies), max_keepalive_connections=max(concurrencies))
+
+    async def run_all(client) -> List[Dict[str, Any]]:
+        if warmup > 0:
+            await run_level(client, pools, mix, concurrencies[0], warmup, seed)
+        levels = []
+        for concurrency in concurrencies:
+            level = await run_level(client, pools, mix, concurrency, duration, seed)
+            logger.info(f"concurrency {concurrency}: {format_level(level)}")
+            levels.append(level)
+        return levels
+
+    if url is not None:
+        async with httpx.AsyncClient(base_url=url, timeout=timeout, limits=limits) as client:
+            levels = await run_all(client)
+    else:
+        import main
+
+        transport = httpx.ASGITransport(app=main.app)
+        async with main.app.router.lifespan_context(main.app):
+            async with httpx.AsyncClient(transport=transport, base_url="http://load", timeout=timeout) as client:
+                levels = await run_all(client)
+
+    return {
+        "meta": {
+            "created_at": datetime.now().isoformat(),
+            "target": url or "in-process",
+            "mix": mix,
+            "batch_size": batch_size,
+            "csv_rows": csv_rows,
+            "duration": duration,
+            "seed": seed,
+            "cpu_count": os.cpu_count()
+        },
+        "levels": levels
+    }
+
+
+def format_level(level: Dict[str, Any]) -> str:
+    """One-line description of a level summary."""
+    return (
+        f"{level['throughput_rps']:,.1f} req/s, {level['throughput_rows_per_s']:,.0f} rows/s, "
+        f"p50 {level.get('p50_ms', 0.0):.1f} ms, p99 {level.get('p99_ms', 0.0):.1f} ms, "
+        f"errors {level['error_rate']:.1%}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load test the exoplanet detection API.")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--url", default="http://localhost:8000", help="Base URL of a running server")
+    target.add_argument("--in-process", action="store_true", help="Load the app imported in this process")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Request weights (default: {DEFAULT_MIX})")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16],
+                        help="Concurrency levels; several levels search for the saturation point")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per level")
+    parser.add_argument("--warmup", type=float, default=1.0, help="Unrecorded seconds before the first level")
+    parser.add_argument("--batch-size", type=int, default=100, help="Candidates per /predict-json request")
+    parser.add_argument("--csv-rows", type=int, default=1000, help="Rows per /predict-csv upload")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-request timeout in seconds")
+    parser.add_argument("--min-gain", type=float, default=0.1,
+                        help="Throughput gain per level below which the server counts as saturated")
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--max-p99-ms", type=float, help="p99 latency budget")
+    parser.add_argument("--output", help="Write the report to this JSON file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    if args.in_process:
+        # The API resolves its model files relative to the working directory
+        os.chdir(backend_dir)
+
+    report = asyncio.run(run_load(
+        None if args.in_process else args.url,
+        parse_mix(args.mix),
+        args.concurrency,
+        args.duration,
+        warmup=args.warmup,
+        batch_size=args.batch_size,
+        csv_rows=args.csv_rows,
+        seed=args.seed,
+        timeout=args.timeout
+    ))
+    report["saturation"] = find_saturation(report["levels"], args.min_gain, args.max_error_rate, args.max_p99_ms)
+
+    print("-" * 50)
+    for level in report["levels"]:
+        print(f"concurrency {level['concurrency']:>4}: {format_level(level)}")
+        for name in [name for name in REQUEST_TYPES if name in level["by_type"]]:
+            summary = level["by_type"][name]
+            print(f"    {name:13s} {format_level(summary)}")
+
+    saturation = report["saturation"]
+    capacity = saturation["capacity"]
+    print("-" * 50)
+    if saturation["saturated"]:
+        print(f"Saturated at concurrency {saturation['concurrency']}: {saturation['reason']}")
+    else:
+        print("Not saturated at the highest concurrency tested")
+    if capacity is not None:
+        print(f"Capacity: {capacity['throughput_rps']:,.1f} req/s at concurrency {capacity['concurrency']}")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+        print(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
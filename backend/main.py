@@ -9,25 +9,83 @@ Author: Felipe Coutinho
 NASA Space Apps Challenge 2025
 """
 
-import pandas as pd
+import time
+
+# Cold-start timings on /health are measured from here
+IMPORT_STARTED_AT = time.perf_counter()
+
 import numpy as np
-from fastapi import FastAPI, HTTPException, UploadFile, File
+from fastapi import FastAPI, HTTPException, UploadFile, File, Header, Query
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from typing import List, Dict, Any
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import TYPE_CHECKING, List, Dict, Any, AsyncIterator, Callable, Iterator, Optional, Tuple
+import asyncio
+import importlib.util
 import io
+import json
 import logging
-from exoplanet_detector_model import ExoplanetDetector, ExoplanetAPI
+import os
+from batch_jobs import BatchJobManager, UnknownJobError
+from catalog_index import CatalogIndex, CatalogIndexManager
+from evaluation import DEFAULT_MIN_PRECISION, evaluate_catalog
+from exoplanet_detector_model import ExoplanetDetector, ExoplanetAPI, PREDICTION_TEXTS
+from inference_executor import InferenceExecutor, ExecutorSaturatedError
+from metrics import pipeline_metrics
+from micro_batcher import MicroBatcher
+from model_registry import ModelBundle, ModelLoadError, ModelRegistry, UnknownModelError
+from prediction_cache import PredictionCache
+import prefork
+from profiling import RequestProfiler, run_profiled
+from response_formats import FORMAT_DEPENDENCIES, MEDIA_TYPES, encode_columnar, negotiate_format
+from startup import StartupState
+
+# pandas is imported by the functions that parse uploads, keeping it (and the
+# model libraries) out of the import path of the server
+if TYPE_CHECKING:
+    import pandas as pd
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Warm-up of the default model at startup (EXOPLANET_WARMUP=0 loads models on
+# first use and reports the process ready immediately)
+startup = StartupState(IMPORT_STARTED_AT, warmup=os.environ.get("EXOPLANET_WARMUP", "1") == "1")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Warm up the default model in the background so the server accepts
+    connections right away, resume unfinished batch jobs, and release the
+    inference pool and job workers when it stops.
+    """
+    warmup = None
+    # Pre-fork workers inherit the model the parent already warmed up
+    if startup.warmup and not startup.ready:
+        warmup = asyncio.ensure_future(run_in_threadpool(startup.run_warmup, registry.get))
+    # Sibling workers may hold claims on running jobs; the pre-fork parent
+    # releases stale ones
+    await run_in_threadpool(job_manager.resume, not prefork.active())
+    catalog_build = None
+    if catalog_index is not None and catalog_index.current() is None:
+        catalog_build = asyncio.ensure_future(build_catalog_index(warmup))
+    yield
+    if catalog_build is not None and not catalog_build.done():
+        catalog_build.cancel()
+    if warmup is not None and not warmup.done():
+        logger.warning("Server stopped before the warm-up finished")
+    executor.shutdown(wait=False)
+    await run_in_threadpool(job_manager.shutdown)
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Exoplanet Detection API",
     description="NASA Space Apps Challenge 2025 - Exoplanet Classification System",
-    version="2.0.1"
+    version="2.0.1",
+    lifespan=lifespan
 )
 
 # CORS middleware for frontend integration
@@ -39,9 +97,84 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize detector and API
-detector = ExoplanetDetector()
-api = ExoplanetAPI(detector)
+# Per-worker request counts of the pre-fork server (no-op otherwise)
+app.add_middleware(prefork.RequestCounter)
+
+# Cache of already scored feature vectors, one per loaded model
+# (EXOPLANET_CACHE_SIZE=0 disables it)
+cache_size = int(os.environ.get("EXOPLANET_CACHE_SIZE", "100000"))
+cache_ttl = os.environ.get("EXOPLANET_CACHE_TTL")
+
+def create_prediction_cache() -> PredictionCache:
+    """Prediction cache for a newly loaded model."""
+    return PredictionCache(
+        max_entries=cache_size,
+        ttl_seconds=float(cache_ttl) if cache_ttl else None
+    )
+
+# Per-mission models, each loaded on first use. EXOPLANET_MODEL_REGISTRY names
+# a JSON manifest of model bundles; by default only the Kepler model is served,
+# from the single-file bundle EXOPLANET_MODEL_BUNDLE when that is set.
+memory_budget_mb = os.environ.get("EXOPLANET_MODEL_MEMORY_MB")
+registry_options = {
+    "max_resident": int(os.environ.get("EXOPLANET_MAX_RESIDENT_MODELS", "2")),
+    "memory_budget_bytes": int(float(memory_budget_mb) * 1024 * 1024) if memory_budget_mb else None,
+    "cache_factory": create_prediction_cache if cache_size > 0 else None
+}
+if os.environ.get("EXOPLANET_MODEL_REGISTRY"):
+    registry = ModelRegistry.from_manifest(os.environ["EXOPLANET_MODEL_REGISTRY"], **registry_options)
+else:
+    registry = ModelRegistry(default="kepler", **registry_options)
+    registry.register(ModelBundle(
+        "kepler",
+        mission="Kepler",
+        model_path="exoplanet_detector_model.pkl",
+        scaler_path="exoplanet_scaler.pkl",
+        features_path="exoplanet_features.pkl",
+        bundle_path=os.environ.get("EXOPLANET_MODEL_BUNDLE")
+    ))
+
+# Bounded pool for CPU-bound parsing and scoring, configured via environment
+executor = InferenceExecutor(
+    kind=os.environ.get("EXOPLANET_EXECUTOR", "thread"),
+    max_workers=int(os.environ.get("EXOPLANET_WORKERS", "4")),
+    max_queue=int(os.environ.get("EXOPLANET_MAX_QUEUE", "16")),
+    retry_after=int(os.environ.get("EXOPLANET_RETRY_AFTER", "1"))
+)
+
+async def score_micro_batch(items: List[Tuple[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Score (mission, candidate) pairs gathered by the micro-batcher, one
+    matrix per model.
+    """
+    groups: Dict[str, List[int]] = {}
+    for position, (mission, _) in enumerate(items):
+        groups.setdefault(mission, []).append(position)
+    
+    # Requests were admitted individually before joining the batch
+    group_results = await asyncio.gather(*[
+        run_task(predict_records, [items[position][1] for position in positions], mission, admit=False)
+        for mission, positions in groups.items()
+    ])
+    
+    results = [None] * len(items)
+    for positions, scored in zip(groups.values(), group_results):
+        for position, result in zip(positions, scored):
+            results[position] = result
+    return results
+
+# Optional micro-batching of concurrent /predict calls
+micro_batcher = None
+if os.environ.get("EXOPLANET_MICROBATCH", "0") == "1":
+    micro_batcher = MicroBatcher(
+        score_micro_batch,
+        max_batch_size=int(os.environ.get("EXOPLANET_MICROBATCH_MAX_SIZE", "32")),
+        max_wait_ms=float(os.environ.get("EXOPLANET_MICROBATCH_WAIT_MS", "2"))
+    )
+
+# Opt-in profiling of single requests (EXOPLANET_PROFILE_TOKEN enables
+# ?profile=true, EXOPLANET_PROFILE_SAMPLE_RATE profiles a random fraction)
+profiler = RequestProfiler.from_env()
 
 # Required features for the model
 REQUIRED_FEATURES = [
@@ -50,6 +183,76 @@ REQUIRED_FEATURES = [
     'koi_prad', 'koi_srad', 'koi_steff', 'koi_slogg', 'koi_kepmag', 'koi_model_snr'
 ]
 
+def required_features(model: ExoplanetDetector) -> List[str]:
+    """Columns a request must provide for ``model``: kepid plus its features."""
+    known = [feature for feature in REQUIRED_FEATURES if feature == 'kepid' or feature in model.features]
+    return known + [feature for feature in model.features if feature not in known]
+
+def resolve_mission(mission: Optional[str]) -> str:
+    """Registered model name for a request's ``mission`` parameter."""
+    try:
+        return registry.resolve(mission)
+    except UnknownModelError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+def get_model(mission: Optional[str] = None) -> ExoplanetDetector:
+    """Detector serving ``mission`` (the default model if None), loaded on first use."""
+    try:
+        return registry.get(mission)
+    except UnknownModelError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ModelLoadError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+def saturated_error(error: ExecutorSaturatedError) -> HTTPException:
+    """503 response telling the client when to retry."""
+    return HTTPException(
+        status_code=503,
+        detail=str(error),
+        headers={"Retry-After": str(error.retry_after)}
+    )
+
+def profile_mode(profile: bool, token: Optional[str]) -> Optional[str]:
+    """
+    Decide whether a request is profiled.
+    
+    Returns "requested" when the client asked with a valid X-Profile-Token
+    (the report is returned with the response), "sampled" when the request
+    was picked by the sampling rate (the report only goes to the profile
+    directory or the log), or None.
+    """
+    if profile:
+        if not profiler.authorize(token):
+            raise HTTPException(
+                status_code=403,
+                detail="Profiling is disabled or the X-Profile-Token header is invalid"
+            )
+        return "requested"
+    return "sampled" if profiler.sample() else None
+
+async def run_task(func: Callable, *args, admit: bool = True, profile: Optional[str] = None) -> Any:
+    """
+    Run CPU-bound work on the inference executor.
+    
+    With ``profile`` (see ``profile_mode``) the task runs under the request
+    profiler; a requested report is added to dict results as ``profile``.
+    """
+    if profile is not None:
+        args = (func, profiler.top_n, profiler.directory) + args
+        func = run_profiled
+    try:
+        result = await executor.run(func, *args, admit=admit)
+    except ExecutorSaturatedError as e:
+        raise saturated_error(e)
+    if profile is not None:
+        result, report = result
+        if profile == "requested" and isinstance(result, dict):
+            result["profile"] = report
+        elif profiler.directory is None:
+            logger.info(f"Sampled profile of {report['task']}: {json.dumps(report.get('top_functions', [])[:5])}")
+    startup.mark_first_prediction()
+    return result
+
 @app.get("/")
 async def root():
     """Root endpoint with API information."""
@@ -61,9 +264,16 @@ async def root():
             "health": "/health",
             "predict_single": "/predict",
             "predict_csv": "/predict-csv",
+            "predict_parquet": "/predict-parquet",
+            "predict_arrow": "/predict-arrow",
+            "explain": "/explain",
+            "explain_csv": "/explain-csv",
+            "jobs": "/jobs",
             "model_info": "/model-info",
+            "metrics": "/metrics",
             "test_csv": "/test-csv"
-        }
+        },
+        "missions": list(registry.bundles)
     }
 
 @app.post("/test-csv")
@@ -95,25 +305,112 @@ async def test_csv(file: UploadFile = File(...)):
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint."""
-    health_status = api.health_check()
+    """
+    Health check endpoint.
+    
+    ``live`` is true whenever the process answers. ``ready`` turns true once
+    the startup warm-up of the default model has finished (immediately when
+    warm-up is disabled). Never loads a model itself.
+    """
+    model = registry.resident()
+    if model is not None:
+        health_status = ExoplanetAPI(model).health_check()
+    else:
+        # Not loaded yet: the first request that needs it will load it
+        health_status = {
+            "status": "healthy",
+            "live": True,
+            "ready": True,
+            "model_loaded": False,
+            "timestamp": datetime.now().isoformat()
+        }
+    
+    health_status["ready"] = health_status["ready"] and startup.ready
+    if startup.error is not None:
+        health_status["status"] = "unhealthy"
+    elif not health_status["ready"]:
+        health_status["status"] = "starting"
+    health_status["startup"] = startup.get_stats()
+    health_status["executor"] = executor.get_stats()
+    if micro_batcher is not None:
+        health_status["micro_batcher"] = micro_batcher.get_stats()
+    if cache_size > 0:
+        health_status["prediction_cache"] = registry.cache_stats()
+    health_status["pipelines"] = pipeline_metrics.get_stats()
+    health_status["profiling"] = profiler.get_stats()
+    health_status["batch_jobs"] = job_manager.get_stats()
+    if catalog_index is not None:
+        health_status["catalog_index"] = catalog_index.get_stats()
+    server_stats = prefork.get_stats()
+    if server_stats is not None:
+        health_status["server"] = server_stats
     return health_status
 
+@app.get("/health/live")
+async def liveness_check():
+    """Liveness probe: the process is up and serving requests."""
+    return {"live": True}
+
+@app.get("/health/ready")
+async def readiness_check():
+    """Readiness probe: 200 once the process should receive traffic, 503 before."""
+    ready = startup.ready
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"ready": ready, "startup": startup.get_stats()}
+    )
+
+@app.get("/metrics")
+async def metrics():
+    """
+    Per-stage latency histograms, row counters and error counters of the
+    prediction pipelines in the Prometheus text format.
+    
+    Pipelines are ``csv``, ``json`` and ``single`` (the endpoints, with
+    ``total`` covering a whole request), ``explain_csv`` (upload parsing of
+    /explain-csv) and ``predict`` / ``predict_batch`` / ``explain`` (the
+    detector's preprocessing, scaling and model stages).
+    """
+    return PlainTextResponse(pipeline_metrics.render_prometheus(), media_type="text/plain; version=0.0.4")
+
 @app.get("/model-info")
-async def model_info():
-    """Get model information and required features."""
-    model_info = detector.get_model_info()
+async def model_info(mission: Optional[str] = None):
+    """
+    Get model information and required features.
+    
+    Describes the model serving ``mission`` (the default model if omitted)
+    and, under ``registry``, every registered model with its residency,
+    load time and estimated memory.
+    """
+    model = await run_in_threadpool(get_model, mission)
+    features = required_features(model)
     return {
-        "model_info": model_info,
-        "required_features": REQUIRED_FEATURES,
-        "feature_count": len(REQUIRED_FEATURES)
+        "mission": resolve_mission(mission),
+        "model_info": model.get_model_info(),
+        "required_features": features,
+        "feature_count": len(features),
+        "registry": registry.get_stats()
     }
 
+def process_single_request(request_data: Dict[str, Any], mission: Optional[str] = None) -> Dict[str, Any]:
+    """Executor task for /predict."""
+    with pipeline_metrics.stage("single", "score"):
+        return ExoplanetAPI(get_model(mission)).process_request(request_data)
+
 @app.post("/predict")
-async def predict_single(request_data: Dict[str, Any]):
+async def predict_single(request_data: Dict[str, Any], mission: Optional[str] = None,
+                         profile: bool = False, x_profile_token: Optional[str] = Header(None)):
     """
     Predict exoplanet classification for a single candidate.
     
+    ``?mission=`` selects the registered model (default: kepler), and
+    ``?profile=true`` with a valid X-Profile-Token header returns a profile
+    report of the request under ``profile`` (see ``profiling``).
+    
+    When micro-batching is enabled (EXOPLANET_MICROBATCH=1), concurrent calls
+    are gathered for up to EXOPLANET_MICROBATCH_WAIT_MS milliseconds or
+    EXOPLANET_MICROBATCH_MAX_SIZE candidates and scored as one matrix.
+    
     Expected format:
     {
         "candidate_data": {
@@ -137,22 +434,195 @@ async def predict_single(request_data: Dict[str, Any]):
     }
     """
     try:
-        result = api.process_request(request_data)
+        with pipeline_metrics.stage("single", "total"):
+            mission = resolve_mission(mission)
+            profiling = profile_mode(profile, x_profile_token)
+            if micro_batcher is not None and profiling is None and "candidate_data" in request_data:
+                try:
+                    executor.ensure_capacity()
+                except ExecutorSaturatedError as e:
+                    raise saturated_error(e)
+                result = ExoplanetAPI.format_response(
+                    await micro_batcher.submit((mission, request_data["candidate_data"]))
+                )
+            else:
+                result = await run_task(process_single_request, request_data, mission, profile=profiling)
+        pipeline_metrics.add_rows("single", 1, failed=int(result.get("status") != "success"))
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error in predict_single: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/predict-csv")
-async def predict_csv(file: UploadFile = File(...)):
+# Rows parsed and scored per batch by the streaming CSV mode
+CSV_STREAM_BATCH_ROWS = 5000
+
+# read_csv options shared by the full and streaming CSV parsers
+CSV_READ_OPTIONS = {
+    "comment": "#",  # Exoplanet Archive exports start with '#' metadata lines
+    "on_bad_lines": "skip",  # Skip problematic lines
+    "skip_blank_lines": True
+}
+
+# Columns echoed back with each CSV result for display in the frontend
+ORIGINAL_DATA_COLUMNS = [
+    'koi_period', 'koi_prad', 'koi_srad', 'koi_steff',
+    'koi_depth', 'koi_duration', 'koi_time0bk'
+]
+
+def batch_row_result(model: ExoplanetDetector, batch: Dict[str, Any], position: int) -> Dict[str, Any]:
+    """Format one row of a ``predict_batch`` result like ``ExoplanetDetector.predict``."""
+    if batch["error_mask"][position]:
+        return {
+            "success": False,
+            "prediction": None,
+            "prediction_text": None,
+            "confidence": None,
+            "probability_exoplanet": None,
+            "probability_false_positive": None,
+            "explanation": None,
+            "error": batch["errors"][position]
+        }
+    
+    result = {"success": True}
+    result.update(model.interpret_prediction(
+        int(batch["predictions"][position]),
+        float(batch["probabilities"][position])
+    ))
+    result["error"] = None
+    return result
+
+def predict_records(records: List[Any], mission: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Executor task: score candidate dicts together, one ``predict``-style result each."""
+    model = get_model(mission)
+    batch = model.predict_batch(records)
+    if not batch["success"]:
+        return [{"success": False, "error": batch["error"], "prediction": None}] * len(records)
+    return [batch_row_result(model, batch, position) for position in range(len(records))]
+
+def batch_counts(predictions: np.ndarray, error_mask: np.ndarray) -> Dict[str, int]:
+    """Result counts for one scored batch; counts of several batches add up."""
+    return {
+        "total": int(len(error_mask)),
+        "successful": int((~error_mask).sum()),
+        "exoplanets": int((predictions == 1).sum()),
+        "false_positives": int((predictions == 0).sum())
+    }
+
+def batch_summary(counts: Dict[str, int], total_key: str) -> Dict[str, Any]:
+    """Summary statistics shared by the bulk prediction endpoints."""
+    total = counts["total"]
+    successful_predictions = counts["successful"]
+    return {
+        total_key: total,
+        "successful_predictions": successful_predictions,
+        "failed_predictions": total - successful_predictions,
+        "exoplanets_detected": counts["exoplanets"],
+        "false_positives": counts["false_positives"],
+        "success_rate": f"{(successful_predictions/total)*100:.1f}%" if total > 0 else "0%"
+    }
+
+def csv_batch_results(model: ExoplanetDetector, df: "pd.DataFrame",
+                      batch: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Per-row results for CSV rows scored by ``predict_batch``."""
+    import pandas as pd
+    
+    # Per-row identifiers and display data, extracted column-wise
+    kepids = pd.to_numeric(df['kepid'], errors='coerce').fillna(0).astype(np.int64).tolist()
+    kepoi_names = df['kepoi_name'].map(str).tolist() if 'kepoi_name' in df.columns else [''] * len(df)
+    kepler_names = df['kepler_name'].map(str).tolist() if 'kepler_name' in df.columns else [''] * len(df)
+    original = df[ORIGINAL_DATA_COLUMNS].apply(pd.to_numeric, errors='coerce')
+    original_data = original.astype(object).where(original.notna(), None).to_dict('records')
+    
+    results = []
+    for position, index in enumerate(df.index):
+        result = {
+            "row_index": int(index),
+            "kepid": kepids[position],
+            "kepoi_name": kepoi_names[position],
+            "kepler_name": kepler_names[position]
+        }
+        result.update(batch_row_result(model, batch, position))
+        # Include original data for display
+        result["original_data"] = original_data[position]
+        results.append(result)
+    
+    return results
+
+def identifier_columns(df: "pd.DataFrame") -> Dict[str, Any]:
+    """Candidate identifiers of bulk rows as columns: kepid, plus KOI names when present."""
+    import pandas as pd
+    
+    columns = {"kepid": pd.to_numeric(df['kepid'], errors='coerce').fillna(0).astype(np.int64).to_numpy()}
+    for column in ['kepoi_name', 'kepler_name']:
+        if column in df.columns:
+            columns[column] = df[column].astype(object).where(df[column].notna(), None).tolist()
+    return columns
+
+def encode_bulk_results(response_format: str, model: ExoplanetDetector, message: str,
+                        summary: Dict[str, Any], identifiers: Dict[str, Any],
+                        predictions: np.ndarray, probabilities: np.ndarray,
+                        errors: List[Optional[str]]) -> bytes:
     """
-    Process CSV file and return classification results for each row.
+    Encode bulk results in a columnar response format.
     
-    Expected CSV format with columns: kepid, koi_score, koi_fpflag_nt, etc.
+    The feature list and prediction texts are emitted once; identifiers,
+    predictions and probabilities are arrays, and only failed rows carry an
+    error message.
     """
+    metadata = {
+        "status": "success",
+        "message": message,
+        "summary": summary,
+        "features_used": model.features,
+        "prediction_texts": {str(prediction): text for prediction, text in PREDICTION_TEXTS.items()}
+    }
+    columns = {
+        "row_index": np.arange(len(predictions)),
+        **identifiers,
+        "prediction": predictions,
+        "probability_exoplanet": probabilities
+    }
+    row_errors = {position: error for position, error in enumerate(errors) if error is not None}
+    return encode_columnar(response_format, metadata, columns, row_errors)
+
+def negotiate_response(requested: Optional[str], accept: Optional[str]) -> str:
+    """Response format of a bulk request: the ``format`` query parameter, then Accept."""
     try:
-        # Read CSV file
-        contents = await file.read()
+        response_format = negotiate_format(requested, accept)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    dependency = FORMAT_DEPENDENCIES.get(response_format)
+    if dependency is not None and importlib.util.find_spec(dependency) is None:
+        raise HTTPException(
+            status_code=501,
+            detail=f"{dependency} is required for the '{response_format}' response format"
+        )
+    return response_format
+
+def bulk_response(result: Any, response_format: str) -> Any:
+    """Return a bulk result, wrapping encoded bodies with their media type."""
+    if response_format == "json":
+        return result
+    
+    headers = {}
+    if response_format in ("arrow", "parquet"):
+        from columnar import FILE_EXTENSIONS
+        headers["Content-Disposition"] = f'attachment; filename="predictions.{FILE_EXTENSIONS[response_format]}"'
+    return Response(content=result, media_type=MEDIA_TYPES[response_format], headers=headers)
+
+def parse_csv(contents: bytes, pipeline: str = "csv") -> "pd.DataFrame":
+    """
+    Parse an uploaded CSV, falling back to column-count filtering when the
+    regular parser cannot read the file.
+    
+    Decoding and parsing are timed as stages of ``pipeline``.
+    """
+    import pandas as pd
+    
+    with pipeline_metrics.stage(pipeline, "decode"):
         csv_content = contents.decode('utf-8')
         
         # Clean up any potential issues with the CSV
@@ -160,151 +630,544 @@ async def predict_csv(file: UploadFile = File(...)):
         # Remove any empty lines
         lines = [line for line in lines if line.strip()]
         csv_content = '\n'.join(lines)
-        
-        # Log CSV info for debugging
-        logger.info(f"Processing CSV file: {file.filename}")
-        logger.info(f"CSV content length: {len(csv_content)} characters")
-        logger.info(f"Number of lines: {len(lines)}")
-        
+    
+    # Log CSV info for debugging
+    logger.info(f"CSV content length: {len(csv_content)} characters")
+    logger.info(f"Number of lines: {len(lines)}")
+    
+    try:
         # Read CSV with more robust parameters - ignore bad lines completely
-        df = pd.read_csv(
-            io.StringIO(csv_content),
-            encoding='utf-8',
-            on_bad_lines='skip',  # Skip problematic lines
-            skip_blank_lines=True,
-            engine='python',  # Use Python engine for better error handling
-            error_bad_lines=False,  # Don't raise error on bad lines
-            warn_bad_lines=False    # Don't warn about bad lines
+        with pipeline_metrics.stage(pipeline, "parse"):
+            return pd.read_csv(
+                io.StringIO(csv_content),
+                engine='python',  # Use Python engine for better error handling
+                **CSV_READ_OPTIONS
+            )
+    except Exception as e:
+        logger.error(f"Error parsing CSV file: {e}")
+        logger.info("Attempting alternative CSV parsing...")
+    
+    # More aggressive cleaning, dropping the comment lines so the header comes first
+    lines = [line.strip() for line in lines if not line.lstrip().startswith(CSV_READ_OPTIONS["comment"])]
+    if not lines:
+        raise ValueError("CSV file is empty")
+    
+    # Count columns in header to ensure consistency
+    header_cols = len(lines[0].split(','))
+    logger.info(f"Header has {header_cols} columns")
+    
+    # Filter lines to match header column count
+    filtered_lines = [lines[0]]  # Keep header
+    for i, line in enumerate(lines[1:], 1):
+        if len(line.split(',')) == header_cols:
+            filtered_lines.append(line)
+        else:
+            logger.warning(f"Skipping line {i+1}: column count mismatch")
+    
+    with pipeline_metrics.stage(pipeline, "parse"):
+        df = pd.read_csv(io.StringIO('\n'.join(filtered_lines)), engine='python',
+                         comment=CSV_READ_OPTIONS["comment"])
+    logger.info(f"Alternative parsing successful: {len(df)} rows loaded")
+    return df
+
+def iter_csv_batches(source, batch_rows: int = CSV_STREAM_BATCH_ROWS) -> Iterator["pd.DataFrame"]:
+    """
+    Parse a CSV file object incrementally with the C engine.
+    
+    Only one batch of ``batch_rows`` rows is held in memory at a time.
+    """
+    import pandas as pd
+    
+    reader = pd.read_csv(
+        source,
+        chunksize=batch_rows,
+        encoding='utf-8',
+        **CSV_READ_OPTIONS
+    )
+    try:
+        for chunk in reader:
+            yield chunk
+    finally:
+        try:
+            reader.close()
+        except ValueError:
+            # The upload was already closed under an abandoned reader
+            pass
+
+def score_csv_batch(df: "pd.DataFrame", mission: Optional[str] = None) -> Tuple[str, Dict[str, int]]:
+    """Executor task for one streamed CSV batch: NDJSON lines and counts."""
+    model = get_model(mission)
+    batch = model.predict_batch(df)
+    if not batch["success"]:
+        raise ValueError(batch["error"])
+    
+    lines = "".join(json.dumps(result) + "\n" for result in csv_batch_results(model, df, batch))
+    return lines, batch_counts(batch["predictions"], batch["error_mask"])
+
+async def stream_csv_predictions(first_batch: "pd.DataFrame", batches: Iterator["pd.DataFrame"],
+                                 filename: str, mission: Optional[str] = None) -> AsyncIterator[str]:
+    """
+    Score CSV batches one at a time and emit NDJSON lines.
+    
+    Every row result is one line; the last line carries the summary. Each
+    batch is written in a single chunk.
+    """
+    counts = {"total": 0, "successful": 0, "exoplanets": 0, "false_positives": 0}
+    
+    try:
+        df = first_batch
+        while df is not None:
+            # The request was admitted when the stream started
+            lines, batch_result_counts = await run_task(score_csv_batch, df, mission, admit=False)
+            for key, value in batch_result_counts.items():
+                counts[key] += value
+            yield lines
+            df = await run_in_threadpool(next, batches, None)
+    except Exception as e:
+        logger.error(f"Error streaming CSV file {filename}: {e}")
+        yield json.dumps({
+            "status": "error",
+            "message": f"Processing stopped after {counts['total']} rows: {e}",
+            "summary": batch_summary(counts, "total_rows")
+        }) + "\n"
+        return
+    finally:
+        # Release the reader while the upload is still open
+        try:
+            batches.close()
+        except ValueError:
+            # A cancelled read is still advancing it on the threadpool
+            pass
+    
+    yield json.dumps({
+        "status": "success",
+        "message": f"Processed {counts['total']} rows from {filename}",
+        "summary": batch_summary(counts, "total_rows")
+    }) + "\n"
+
+class ClosingStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse that closes its body generator when the stream ends.
+    
+    Starlette leaves the generator suspended when the client disconnects;
+    it would then be finalized by the garbage collector, after the upload
+    it reads from has been closed.
+    """
+    
+    async def stream_response(self, send) -> None:
+        try:
+            await super().stream_response(send)
+        finally:
+            await self.body_iterator.aclose()
+
+def read_csv_upload(contents: bytes, model: ExoplanetDetector, pipeline: str = "csv") -> "pd.DataFrame":
+    """Parse an uploaded CSV and check that it has the model's required columns."""
+    try:
+        df = parse_csv(contents, pipeline)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, 
+            detail=f"CSV parsing failed: {str(e)}. Please ensure your CSV file is properly formatted."
         )
-        
-        logger.info(f"Successfully loaded CSV with {len(df)} rows and {len(df.columns)} columns")
-        
-        # Validate required columns
-        missing_columns = set(REQUIRED_FEATURES) - set(df.columns)
+    
+    logger.info(f"Successfully loaded CSV with {len(df)} rows and {len(df.columns)} columns")
+    
+    # Validate required columns
+    with pipeline_metrics.stage(pipeline, "validate"):
+        missing_columns = set(required_features(model)) - set(df.columns)
         if missing_columns:
             raise HTTPException(
                 status_code=400, 
                 detail=f"Missing required columns: {list(missing_columns)}"
             )
+    return df
+
+def score_csv_upload(contents: bytes, filename: str, mission: Optional[str] = None,
+                     response_format: str = "json") -> Any:
+    """
+    Executor task for /predict-csv: parse, validate and score a whole upload.
+    
+    Returns the JSON response, or the encoded body for other response formats.
+    """
+    logger.info(f"Processing CSV file: {filename}")
+    model = get_model(mission)
+    df = read_csv_upload(contents, model)
+    
+    # Score every row in one pass
+    with pipeline_metrics.stage("csv", "score"):
+        batch = model.predict_batch(df)
+        if not batch["success"]:
+            raise HTTPException(status_code=500, detail=batch["error"])
+    
+    summary = batch_summary(batch_counts(batch["predictions"], batch["error_mask"]), "total_rows")
+    message = f"Processed {summary['total_rows']} rows from {filename}"
+    pipeline_metrics.add_rows("csv", summary["total_rows"], failed=summary["failed_predictions"])
+    
+    with pipeline_metrics.stage("csv", "build_response"):
+        if response_format != "json":
+            return encode_bulk_results(
+                response_format, model, message, summary, identifier_columns(df),
+                batch["predictions"], batch["probabilities"], batch["errors"]
+            )
+        
+        return {
+            "status": "success",
+            "message": message,
+            "summary": summary,
+            "results": csv_batch_results(model, df, batch)
+        }
+
+@app.post("/predict-csv")
+async def predict_csv(file: UploadFile = File(...), stream: bool = False,
+                      mission: Optional[str] = None,
+                      response_format: Optional[str] = Query(None, alias="format"),
+                      accept: Optional[str] = Header(None),
+                      profile: bool = False, x_profile_token: Optional[str] = Header(None)):
+    """
+    Process CSV file and return classification results for each row.
+    
+    All rows are scored together with ``ExoplanetDetector.predict_batch``.
+    With ``?stream=true`` the upload is parsed and scored in fixed-size row
+    batches and results are streamed back as NDJSON (one result per line,
+    followed by a final summary line), keeping memory bounded.
+    ``?mission=`` selects the registered model (default: kepler).
+    
+    Without streaming, ``?format=`` or the Accept header selects a compact
+    columnar response (compact JSON, MessagePack, Arrow or Parquet) instead
+    of one JSON object per row; see ``response_formats``. ``?profile=true``
+    with a valid X-Profile-Token header profiles the parse-and-score task and
+    adds the report to JSON responses (other formats: profile directory).
+    
+    Expected CSV format with columns: kepid, koi_score, koi_fpflag_nt, etc.
+    """
+    mission = resolve_mission(mission)
+    if stream:
+        return await start_csv_stream(file, mission)
+    response_format = negotiate_response(response_format, accept)
+    profiling = profile_mode(profile, x_profile_token)
+    
+    try:
+        with pipeline_metrics.stage("csv", "total"):
+            # Read CSV file
+            with pipeline_metrics.stage("csv", "read_upload"):
+                contents = await file.read()
+            result = await run_task(score_csv_upload, contents, file.filename, mission, response_format,
+                                  profile=profiling)
+            return bulk_response(result, response_format)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error processing CSV file: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Asynchronous batch jobs for large catalogs, stored under EXOPLANET_JOB_DIR
+job_manager = BatchJobManager(
+    os.environ.get("EXOPLANET_JOB_DIR", "batch_jobs"),
+    get_model=get_model,
+    required_columns=required_features,
+    read_batches=iter_csv_batches,
+    format_results=csv_batch_results,
+    workers=int(os.environ.get("EXOPLANET_JOB_WORKERS", "1")),
+    chunk_rows=int(os.environ.get("EXOPLANET_JOB_CHUNK_ROWS", str(CSV_STREAM_BATCH_ROWS)))
+)
+
+def job_response(job: Dict[str, Any], deduplicated: Optional[bool] = None) -> Dict[str, Any]:
+    """API representation of a batch job with its progress and summary."""
+    counts = {key: job[key] for key in ("total", "successful", "exoplanets", "false_positives")}
+    response = {
+        "job_id": job["job_id"],
+        "status": job["status"],
+        "mission": job["mission"],
+        "filename": job["filename"],
+        "created_at": job["created_at"],
+        "started_at": job["started_at"],
+        "finished_at": job["finished_at"],
+        "error": job["error"],
+        "progress": {
+            "processed_rows": job["total"],
+            "chunks": job["chunks"],
+            "upload_bytes": job["upload_bytes"]
+        },
+        "summary": batch_summary(counts, "total_rows"),
+        "results_url": f"/jobs/{job['job_id']}/results"
+    }
+    if deduplicated is not None:
+        response["deduplicated"] = deduplicated
+    return response
+
+@app.post("/jobs", status_code=202)
+async def submit_job(file: UploadFile = File(...), mission: Optional[str] = None):
+    """
+    Submit a CSV catalog for asynchronous scoring.
+    
+    Returns the job right away; poll ``GET /jobs/{job_id}`` for progress and
+    page through ``GET /jobs/{job_id}/results``, which serves the rows of
+    finished chunks while the job is still running. Resubmitting the same
+    file for the same model returns the existing job (``deduplicated``).
+    """
+    mission = resolve_mission(mission)
+    try:
+        job, deduplicated = await run_in_threadpool(job_manager.submit, file.file, file.filename, mission)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return job_response(job, deduplicated)
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Status, progress and running summary of a batch job."""
+    try:
+        job = await run_in_threadpool(job_manager.get_job, job_id)
+    except UnknownJobError:
+        raise HTTPException(status_code=404, detail=f"Unknown job '{job_id}'")
+    return job_response(job)
+
+@app.get("/jobs/{job_id}/results")
+async def get_job_results(job_id: str, offset: int = Query(0, ge=0),
+                          limit: int = Query(1000, ge=1, le=10000)):
+    """
+    A page of a batch job's per-row results, in row order.
+    
+    Rows have the same shape as /predict-csv results. ``next_offset`` is
+    null once the job has finished and no further rows remain.
+    """
+    try:
+        job = await run_in_threadpool(job_manager.get_job, job_id)
+        results = await run_in_threadpool(job_manager.get_results, job_id, offset, limit)
+    except UnknownJobError:
+        raise HTTPException(status_code=404, detail=f"Unknown job '{job_id}'")
+    
+    finished = job["status"] in ("completed", "failed")
+    exhausted = offset + len(results) >= job["total"]
+    return {
+        "job_id": job_id,
+        "status": job["status"],
+        "offset": offset,
+        "count": len(results),
+        "next_offset": None if finished and exhausted else offset + len(results),
+        "results": results
+    }
+
+async def start_csv_stream(file: UploadFile, mission: Optional[str] = None) -> StreamingResponse:
+    """
+    Validate the header batch of an upload and return its NDJSON stream.
+    
+    The first batch is parsed up front so that a full executor queue,
+    unreadable files and missing columns are still reported with a proper
+    HTTP status code. Batches are parsed on the server threadpool because
+    the incremental reader is tied to this process.
+    """
+    try:
+        executor.ensure_capacity()
+    except ExecutorSaturatedError as e:
+        raise saturated_error(e)
+    
+    logger.info(f"Streaming CSV file: {file.filename}")
+    model = await run_in_threadpool(get_model, mission)
+    file.file.seek(0)
+    
+    try:
+        batches = iter_csv_batches(file.file, CSV_STREAM_BATCH_ROWS)
+        first_batch = await run_in_threadpool(next, batches, None)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, 
+            detail=f"CSV parsing failed: {str(e)}. Please ensure your CSV file is properly formatted."
+        )
+    
+    if first_batch is None:
+        raise HTTPException(status_code=400, detail="CSV file contains no rows")
+    
+    # Validate required columns
+    missing_columns = set(required_features(model)) - set(first_batch.columns)
+    if missing_columns:
+        batches.close()
+        raise HTTPException(
+            status_code=400, 
+            detail=f"Missing required columns: {list(missing_columns)}"
+        )
+    
+    return ClosingStreamingResponse(
+        stream_csv_predictions(first_batch, batches, file.filename, mission),
+        media_type="application/x-ndjson"
+    )
+
+def score_columnar_upload(contents: bytes, filename: str, fmt: str, mission: Optional[str] = None,
+                          response_format: str = "json") -> Any:
+    """
+    Executor task for /predict-parquet and /predict-arrow.
+    
+    Only the required feature columns (plus the KOI names) are decoded, and
+    the features reach the model as one float matrix. Returns the JSON
+    response, or the encoded body for other response formats.
+    """
+    if importlib.util.find_spec("pyarrow") is None:
+        raise HTTPException(status_code=501, detail="pyarrow is required for Parquet and Arrow uploads")
+    from columnar import feature_matrix, read_table
+    
+    logger.info(f"Processing {fmt} file: {filename}")
+    model = get_model(mission)
+    features = required_features(model)
+    
+    try:
+        table = read_table(contents, fmt, features + ['kepoi_name', 'kepler_name'])
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, 
+            detail=f"{fmt.capitalize()} parsing failed: {str(e)}. Please ensure your file is properly formatted."
+        )
+    
+    # Validate required columns
+    missing_columns = set(features) - set(table.column_names)
+    if missing_columns:
+        raise HTTPException(
+            status_code=400, 
+            detail=f"Missing required columns: {list(missing_columns)}"
+        )
+    
+    try:
+        X = feature_matrix(table, model.features)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    batch = model.predict_batch(X)
+    if not batch["success"]:
+        raise HTTPException(status_code=500, detail=batch["error"])
+    
+    summary = batch_summary(batch_counts(batch["predictions"], batch["error_mask"]), "total_rows")
+    message = f"Processed {summary['total_rows']} rows from {filename}"
+    
+    identifiers = table.select([c for c in ['kepid', 'kepoi_name', 'kepler_name'] if c in table.column_names])
+    df = identifiers.to_pandas()
+    if response_format != "json":
+        return encode_bulk_results(
+            response_format, model, message, summary, identifier_columns(df),
+            batch["predictions"], batch["probabilities"], batch["errors"]
+        )
+    
+    df = table.to_pandas()
+    return {
+        "status": "success",
+        "message": message,
+        "summary": summary,
+        "results": csv_batch_results(model, df, batch)
+    }
+
+async def predict_columnar(file: UploadFile, fmt: str, mission: Optional[str], columnar: bool,
+                           response_format: Optional[str], accept: Optional[str]):
+    """Shared implementation of the Parquet and Arrow upload endpoints."""
+    mission = resolve_mission(mission)
+    response_format = negotiate_response(fmt if columnar else response_format, accept)
+    
+    try:
+        contents = await file.read()
+        result = await run_task(score_columnar_upload, contents, file.filename, fmt, mission, response_format)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error processing {fmt} file: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    return bulk_response(result, response_format)
+
+@app.post("/predict-parquet")
+async def predict_parquet(file: UploadFile = File(...), mission: Optional[str] = None,
+                          columnar: bool = False,
+                          response_format: Optional[str] = Query(None, alias="format"),
+                          accept: Optional[str] = Header(None)):
+    """
+    Classify every row of a Parquet file.
+    
+    Only the required feature columns are read. The response matches
+    /predict-csv, including ``?format=``/Accept negotiation;
+    ``?columnar=true`` is short for ``?format=parquet``.
+    """
+    return await predict_columnar(file, "parquet", mission, columnar, response_format, accept)
+
+@app.post("/predict-arrow")
+async def predict_arrow(file: UploadFile = File(...), mission: Optional[str] = None,
+                        columnar: bool = False,
+                        response_format: Optional[str] = Query(None, alias="format"),
+                        accept: Optional[str] = Header(None)):
+    """
+    Classify every row of an Arrow IPC stream (or Arrow file).
+    
+    Same behavior as /predict-parquet; ``?columnar=true`` is short for
+    ``?format=arrow``.
+    """
+    return await predict_columnar(file, "arrow", mission, columnar, response_format, accept)
+
+def score_json_records(data_list: List[Any], mission: Optional[str] = None,
+                       response_format: str = "json") -> Any:
+    """
+    Executor task for /predict-json: validate and score all data points.
+    
+    ``predict_batch`` validates the records column-wise in the same pass that
+    scores them; invalid records come back as per-row errors.
+    
+    Returns the JSON response, or the encoded body for other response formats.
+    """
+    model = get_model(mission)
+    
+    with pipeline_metrics.stage("json", "score"):
+        batch = model.predict_batch(data_list)
+        if not batch["success"]:
+            raise HTTPException(status_code=500, detail=batch["error"])
+    
+    summary = batch_summary(batch_counts(batch["predictions"], batch["error_mask"]), "total_items")
+    message = f"Processed {summary['total_items']} data points"
+    pipeline_metrics.add_rows("json", summary["total_items"], failed=summary["failed_predictions"])
+    
+    with pipeline_metrics.stage("json", "build_response"):
+        kepids = [data_point.get('kepid', 0) if isinstance(data_point, dict) else 0
+                  for data_point in data_list]
+        if response_format != "json":
+            import pandas as pd
+            
+            return encode_bulk_results(
+                response_format, model, message, summary,
+                identifier_columns(pd.DataFrame({"kepid": np.array(kepids, dtype=object)})),
+                batch["predictions"], batch["probabilities"], batch["errors"]
+            )
         
-        # Process each row
         results = []
-        for index, row in df.iterrows():
-            try:
-                # Extract required features
-                candidate_data = {feature: row[feature] for feature in REQUIRED_FEATURES}
-                
-                # Make prediction
-                prediction_result = detector.predict(candidate_data)
-                
-                # Format result
-                result = {
-                    "row_index": int(index),
-                    "kepid": int(row.get('kepid', 0)),
-                    "kepoi_name": str(row.get('kepoi_name', '')),
-                    "kepler_name": str(row.get('kepler_name', '')),
-                    "success": prediction_result["success"],
-                    "prediction": prediction_result.get("prediction"),
-                    "prediction_text": prediction_result.get("prediction_text"),
-                    "confidence": prediction_result.get("confidence"),
-                    "probability_exoplanet": prediction_result.get("probability_exoplanet"),
-                    "probability_false_positive": prediction_result.get("probability_false_positive"),
-                    "explanation": prediction_result.get("explanation"),
-                    "error": prediction_result.get("error"),
-                    # Include original data for display
-                    "original_data": {
-                        "koi_period": float(row.get('koi_period', 0)),
-                        "koi_prad": float(row.get('koi_prad', 0)),
-                        "koi_srad": float(row.get('koi_srad', 0)),
-                        "koi_steff": float(row.get('koi_steff', 0)),
-                        "koi_depth": float(row.get('koi_depth', 0)),
-                        "koi_duration": float(row.get('koi_duration', 0)),
-                        "koi_time0bk": float(row.get('koi_time0bk', 0))
-                    }
-                }
-                
-                results.append(result)
-                
-            except Exception as e:
-                logger.error(f"Error processing row {index}: {e}")
+        for index in range(len(data_list)):
+            if batch["error_mask"][index]:
                 results.append({
-                    "row_index": int(index),
-                    "kepid": int(row.get('kepid', 0)),
-                    "kepoi_name": str(row.get('kepoi_name', '')),
-                    "kepler_name": str(row.get('kepler_name', '')),
+                    "row_index": index,
                     "success": False,
-                    "error": str(e)
+                    "error": batch["errors"][index]
                 })
-        
-        # Summary statistics
-        total_rows = len(results)
-        successful_predictions = sum(1 for r in results if r["success"])
-        exoplanet_count = sum(1 for r in results if r.get("prediction") == 1)
-        false_positive_count = sum(1 for r in results if r.get("prediction") == 0)
+                continue
+            
+            result = {
+                "row_index": index,
+                "kepid": kepids[index]
+            }
+            result.update(batch_row_result(model, batch, index))
+            results.append(result)
         
         return {
             "status": "success",
-            "message": f"Processed {total_rows} rows from {file.filename}",
-            "summary": {
-                "total_rows": total_rows,
-                "successful_predictions": successful_predictions,
-                "failed_predictions": total_rows - successful_predictions,
-                "exoplanets_detected": exoplanet_count,
-                "false_positives": false_positive_count,
-                "success_rate": f"{(successful_predictions/total_rows)*100:.1f}%" if total_rows > 0 else "0%"
-            },
+            "message": message,
+            "summary": summary,
             "results": results
         }
-        
-    except Exception as e:
-        logger.error(f"Error processing CSV file: {e}")
-        # Try alternative CSV parsing if the first attempt fails
-        try:
-            logger.info("Attempting alternative CSV parsing...")
-            contents = await file.read()
-            csv_content = contents.decode('utf-8')
-            
-            # More aggressive cleaning
-            lines = csv_content.strip().split('\n')
-            lines = [line.strip() for line in lines if line.strip()]
-            
-            # Count columns in header to ensure consistency
-            if lines:
-                header_cols = len(lines[0].split(','))
-                logger.info(f"Header has {header_cols} columns")
-                
-                # Filter lines to match header column count
-                filtered_lines = [lines[0]]  # Keep header
-                for i, line in enumerate(lines[1:], 1):
-                    if len(line.split(',')) == header_cols:
-                        filtered_lines.append(line)
-                    else:
-                        logger.warning(f"Skipping line {i+1}: column count mismatch")
-                
-                csv_content = '\n'.join(filtered_lines)
-                
-                df = pd.read_csv(
-                    io.StringIO(csv_content),
-                    encoding='utf-8',
-                    engine='python',
-                    error_bad_lines=False,
-                    warn_bad_lines=False
-                )
-                
-                logger.info(f"Alternative parsing successful: {len(df)} rows loaded")
-                
-        except Exception as e2:
-            logger.error(f"Alternative parsing also failed: {e2}")
-            raise HTTPException(
-                status_code=500, 
-                detail=f"CSV parsing failed: {str(e)}. Please ensure your CSV file is properly formatted."
-            )
 
 @app.post("/predict-json")
-async def predict_json(request_data: Dict[str, Any]):
+async def predict_json(request_data: Dict[str, Any], mission: Optional[str] = None,
+                       response_format: Optional[str] = Query(None, alias="format"),
+                       accept: Optional[str] = Header(None),
+                       profile: bool = False, x_profile_token: Optional[str] = Header(None)):
     """
     Process JSON data and return classification results.
     
+    All valid data points are scored together with
+    ``ExoplanetDetector.predict_batch``. ``?mission=`` selects the
+    registered model (default: kepler), ``?format=`` or the Accept header
+    a columnar response format and ``?profile=true`` a profile report (see
+    /predict-csv).
+    
     Expected format:
     {
         "data": [
@@ -325,71 +1188,243 @@ async def predict_json(request_data: Dict[str, Any]):
         if not isinstance(data_list, list):
             raise HTTPException(status_code=400, detail="'data' must be a list")
         
-        # Process each data point
-        results = []
-        for index, data_point in enumerate(data_list):
-            try:
-                # Validate required features
-                missing_features = set(REQUIRED_FEATURES) - set(data_point.keys())
-                if missing_features:
-                    results.append({
-                        "row_index": index,
-                        "success": False,
-                        "error": f"Missing features: {list(missing_features)}"
-                    })
-                    continue
-                
-                # Make prediction
-                prediction_result = detector.predict(data_point)
-                
-                # Format result
-                result = {
-                    "row_index": index,
-                    "kepid": data_point.get('kepid', 0),
-                    "success": prediction_result["success"],
-                    "prediction": prediction_result.get("prediction"),
-                    "prediction_text": prediction_result.get("prediction_text"),
-                    "confidence": prediction_result.get("confidence"),
-                    "probability_exoplanet": prediction_result.get("probability_exoplanet"),
-                    "probability_false_positive": prediction_result.get("probability_false_positive"),
-                    "explanation": prediction_result.get("explanation"),
-                    "error": prediction_result.get("error")
-                }
-                
-                results.append(result)
-                
-            except Exception as e:
-                logger.error(f"Error processing data point {index}: {e}")
-                results.append({
-                    "row_index": index,
-                    "success": False,
-                    "error": str(e)
-                })
-        
-        # Summary statistics
-        total_items = len(results)
-        successful_predictions = sum(1 for r in results if r["success"])
-        exoplanet_count = sum(1 for r in results if r.get("prediction") == 1)
-        false_positive_count = sum(1 for r in results if r.get("prediction") == 0)
-        
-        return {
-            "status": "success",
-            "message": f"Processed {total_items} data points",
-            "summary": {
-                "total_items": total_items,
-                "successful_predictions": successful_predictions,
-                "failed_predictions": total_items - successful_predictions,
-                "exoplanets_detected": exoplanet_count,
-                "false_positives": false_positive_count,
-                "success_rate": f"{(successful_predictions/total_items)*100:.1f}%" if total_items > 0 else "0%"
-            },
-            "results": results
-        }
+        mission = resolve_mission(mission)
+        response_format = negotiate_response(response_format, accept)
+        profiling = profile_mode(profile, x_profile_token)
+        with pipeline_metrics.stage("json", "total"):
+            result = await run_task(score_json_records, data_list, mission, response_format,
+                                    profile=profiling)
+            return bulk_response(result, response_format)
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error processing JSON data: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def explain_single_request(request_data: Dict[str, Any], mission: Optional[str] = None,
+                           top_k: Optional[int] = None) -> Dict[str, Any]:
+    """Executor task for /explain."""
+    return ExoplanetAPI(get_model(mission)).process_explain_request(request_data, top_k)
+
+@app.post("/explain")
+async def explain_single(request_data: Dict[str, Any], mission: Optional[str] = None,
+                         top_k: Optional[int] = Query(None, ge=1)):
+    """
+    Classify a single candidate and return per-feature contributions.
+    
+    The request body matches /predict. ``data.contributions`` lists the
+    features by decreasing contribution magnitude (the ``top_k`` largest,
+    default all) with the candidate's value and its TreeSHAP contribution in
+    log-odds; together with ``data.base_value`` they sum to the model margin.
+    """
+    try:
+        mission = resolve_mission(mission)
+        return await run_task(explain_single_request, request_data, mission, top_k)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in explain_single: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+def explain_csv_upload(contents: bytes, filename: str, mission: Optional[str] = None,
+                       top_k: Optional[int] = None) -> Dict[str, Any]:
+    """Executor task for /explain-csv: parse, validate, score and explain a whole upload."""
+    import pandas as pd
+    
+    logger.info(f"Explaining CSV file: {filename}")
+    model = get_model(mission)
+    df = read_csv_upload(contents, model, "explain_csv")
+    
+    batch = model.explain_batch(df, top_k)
+    if not batch["success"]:
+        raise HTTPException(status_code=500, detail=batch["error"])
+    
+    kepids = pd.to_numeric(df['kepid'], errors='coerce').fillna(0).astype(np.int64).tolist()
+    kepoi_names = df['kepoi_name'].map(str).tolist() if 'kepoi_name' in df.columns else [''] * len(df)
+    names = np.asarray(model.features, dtype=object)[np.maximum(batch["top_features"], 0)].tolist()
+    contributions = batch["top_contributions"].tolist()
+    
+    results = []
+    for position in range(len(df)):
+        result = {
+            "row_index": position,
+            "kepid": kepids[position],
+            "kepoi_name": kepoi_names[position]
+        }
+        if batch["error_mask"][position]:
+            result.update({"success": False, "error": batch["errors"][position]})
+        else:
+            result.update({
+                "success": True,
+                "prediction": int(batch["predictions"][position]),
+                "probability_exoplanet": float(batch["probabilities"][position]),
+                "contributions": dict(zip(names[position], contributions[position]))
+            })
+        results.append(result)
+    
+    summary = batch_summary(batch_counts(batch["predictions"], batch["error_mask"]), "total_rows")
+    return {
+        "status": "success",
+        "message": f"Explained {summary['total_rows']} rows from {filename}",
+        "summary": summary,
+        "base_value": batch["base_value"],
+        "results": results
+    }
+
+@app.post("/explain-csv")
+async def explain_csv(file: UploadFile = File(...), mission: Optional[str] = None,
+                      top_k: Optional[int] = Query(None, ge=1)):
+    """
+    Classify every row of a CSV file and return per-feature contributions.
+    
+    All rows are explained with one call to the booster's contribution mode,
+    and explanations already in the prediction cache are reused. Each result
+    maps the ``top_k`` features with the largest contributions (default
+    all) to their TreeSHAP values in log-odds.
+    """
+    mission = resolve_mission(mission)
+    try:
+        contents = await file.read()
+        return await run_task(explain_csv_upload, contents, file.filename, mission, top_k)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error explaining CSV file: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+def evaluate_csv_upload(contents: bytes, filename: str, mission: Optional[str] = None,
+                        min_precision: float = DEFAULT_MIN_PRECISION) -> Dict:
+    """Executor task for /evaluate: score a labeled upload and evaluate it."""
+    logger.info(f"Evaluating on labeled CSV file: {filename}")
+    model = get_model(mission)
+    # Archive downloads of the KOI table start with '#' comment lines
+    contents = b"\n".join(line for line in contents.splitlines() if not line.startswith(b"#"))
+    df = read_csv_upload(contents, model, "evaluate")
+
+    with pipeline_metrics.stage("evaluate", "score"):
+        try:
+            report = evaluate_catalog(model, df, min_precision)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    pipeline_metrics.add_rows("evaluate", len(df), failed=report["failed_rows"])
+
+    return {
+        "status": "success",
+        "message": f"Evaluated {report['rows']} labeled rows from {filename}",
+        "model_info": {"mission": mission, "decision_threshold": model.decision_threshold},
+        "evaluation": report
+    }
+
+@app.post("/evaluate")
+async def evaluate(file: UploadFile = File(...), mission: Optional[str] = None,
+                   min_precision: float = Query(DEFAULT_MIN_PRECISION, gt=0, le=1)):
+    """
+    Evaluate the model on a labeled catalog and recommend decision thresholds.
+
+    The CSV needs ``koi_disposition`` besides the feature columns. All rows
+    are scored in one batch; ROC and precision-recall curves, confusion
+    matrices and the recommended thresholds come from a single sort of the
+    probabilities. The served threshold is not changed: store a new one in
+    the model bundle with ``evaluation.py --write-bundle``.
+    """
+    mission = resolve_mission(mission)
+    try:
+        contents = await file.read()
+        return await run_task(evaluate_csv_upload, contents, file.filename, mission, min_precision)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error evaluating CSV file: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Precomputed scores of a known catalog, served by /catalog. EXOPLANET_CATALOG
+# names the CSV (default: the bundled cumulative KOI table); empty disables it.
+catalog_path = os.environ.get("EXOPLANET_CATALOG", "cumulative_2025.10.04_14.14.53.csv")
+catalog_index = None
+if catalog_path and os.path.exists(catalog_path):
+    catalog_index = CatalogIndexManager(
+        catalog_path,
+        get_model=get_model,
+        format_results=csv_batch_results,
+        check_interval=float(os.environ.get("EXOPLANET_CATALOG_CHECK_SECONDS", "5"))
+    )
+elif catalog_path:
+    logger.warning(f"Catalog {catalog_path} not found; /catalog is disabled")
+
+async def build_catalog_index(warmup: Optional[asyncio.Future] = None) -> None:
+    """Index the catalog in the background once the warm-up is done."""
+    if warmup is not None:
+        await warmup
+    try:
+        await run_in_threadpool(catalog_index.refresh)
+    except Exception as e:
+        logger.error(f"Catalog index build failed: {e}")
+
+async def current_catalog_index() -> CatalogIndex:
+    """The catalog index, built on the spot if the startup build has not finished."""
+    if catalog_index is None:
+        raise HTTPException(status_code=404, detail="No catalog configured (EXOPLANET_CATALOG)")
+    index = catalog_index.current()
+    if index is None:
+        try:
+            index = await run_in_threadpool(catalog_index.get)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=503, detail=f"Catalog index unavailable: {e}")
+    return index
+
+@app.get("/catalog/top")
+async def catalog_top(k: int = Query(10, ge=1, le=1000),
+                      min_probability: float = Query(0.0, ge=0, le=1),
+                      max_probability: float = Query(1.0, ge=0, le=1),
+                      offset: int = Query(0, ge=0)):
+    """
+    Catalog KOIs by decreasing exoplanet probability.
+    
+    Returns the ``k`` most probable KOIs with a probability in
+    ``[min_probability, max_probability]``, after skipping ``offset`` of
+    them; ``total`` counts every KOI in the range.
+    """
+    index = await current_catalog_index()
+    positions, total = index.top(k, min_probability, max_probability, offset)
+    return Response(content=index.encode(positions, total=total, offset=offset), media_type="application/json")
+
+@app.get("/catalog/{identifier}")
+async def catalog_lookup(identifier: str):
+    """
+    Precomputed result of a catalog KOI, by KOI name (``K00752.01``), or of
+    every KOI of a star, by kepid.
+    """
+    index = await current_catalog_index()
+    positions = index.lookup(identifier)
+    if not positions:
+        raise HTTPException(status_code=404, detail=f"'{identifier}' is not in the catalog")
+    return Response(content=index.encode(positions, query=identifier), media_type="application/json")
+
+def prepare_prefork() -> None:
+    """
+    Pre-fork parent hook: warm up the default model and index the catalog
+    once for all workers, and release job claims left by a previous server.
+    """
+    if startup.warmup:
+        startup.run_warmup(registry.get)
+    if catalog_index is not None:
+        try:
+            catalog_index.refresh()
+        except Exception as e:
+            logger.error(f"Catalog index build failed: {e}")
+    job_manager.release_claims()
+
+def release_worker_jobs(pid: int) -> None:
+    """Pre-fork parent hook: free the jobs of an exited worker for its replacement."""
+    released = job_manager.release_claims(job_manager.owner(pid))
+    if released:
+        logger.info(f"Released {released} batch jobs of worker {pid}")
+
+startup.mark_imported()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,275 @@
+"""
+Metrics
+=======
+
+Lightweight in-process metrics for the exoplanet detection API.
+
+``pipeline_metrics`` collects per-stage latency histograms, row counters and
+error counters for the prediction pipelines (e.g. the "csv" pipeline's
+"parse" stage) and renders them in the Prometheus text format for /metrics.
+Timing a stage costs two ``perf_counter`` calls and one short lock, so the
+hot path is not slowed measurably.
+
+Author: Felipe Coutinho
+NASA Space Apps Challenge 2025
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Upper bounds (seconds) of the stage latency histogram buckets
+STAGE_LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram.
+
+    Each observation increments the first bucket whose upper bound is greater
+    than or equal to the value; values above the last bound are only counted
+    in the implicit +Inf bucket.
+    """
+
+    def __init__(self, buckets: Sequence[float]):
+        """
+        Initialize an empty histogram.
+
+        Args:
+            buckets: Upper bounds of the buckets
+        """
+        self.buckets = tuple(sorted(buckets))
+        self.bucket_counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """Record one value."""
+        self.bucket_counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative_counts(self) -> Dict[str, int]:
+        """Observations less than or equal to each bound, keyed by bound."""
+        counts = {}
+        total = 0
+        for bound, bucket_count in zip(self.buckets, self.bucket_counts):
+            total += bucket_count
+            counts[f"{bound:g}"] = total
+        counts["+Inf"] = self.count
+        return counts
+
+    def to_dict(self) -> Dict:
+        """
+        Return the histogram as a JSON-serializable dictionary.
+
+        Returns:
+            Dict: Cumulative bucket counts, observation count, sum and mean
+        """
+        return {
+            "buckets": self.cumulative_counts(),
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else None
+        }
+
+
+class _StageTimer:
+    """Context manager timing one stage; exceptions count as stage errors."""
+
+    __slots__ = ("metrics", "pipeline", "stage", "start")
+
+    def __init__(self, metrics: "PipelineMetrics", pipeline: str, stage: str):
+        self.metrics = metrics
+        self.pipeline = pipeline
+        self.stage = stage
+
+    def __enter__(self) -> "_StageTimer":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> bool:
+        self.metrics.observe(self.pipeline, self.stage, time.perf_counter() - self.start,
+                             error=exc_type is not None)
+        return False
+
+
+class PipelineMetrics:
+    """
+    Thread-safe per-stage latency histograms and row/error counters.
+
+    Series are keyed by pipeline (e.g. "csv", "predict") and stage (e.g.
+    "parse", "model") and created on first use.
+    """
+
+    def __init__(self, buckets: Sequence[float] = STAGE_LATENCY_BUCKETS):
+        """
+        Initialize empty metrics.
+
+        Args:
+            buckets: Upper bounds (seconds) of the latency buckets
+        """
+        self.buckets = tuple(sorted(buckets))
+        self._durations: Dict[Tuple[str, str], Histogram] = {}
+        self._rows: Dict[str, int] = {}
+        self._failed_rows: Dict[str, int] = {}
+        self._errors: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+
+    def stage(self, pipeline: str, stage: str) -> _StageTimer:
+        """
+        Time a stage with a ``with`` block.
+
+        Args:
+            pipeline: Pipeline name
+            stage: Stage name
+
+        Returns:
+            Context manager recording the block's duration, and an error if
+            it raises
+        """
+        return _StageTimer(self, pipeline, stage)
+
+    def observe(self, pipeline: str, stage: str, seconds: float, error: bool = False) -> None:
+        """
+        Record the duration of one stage run.
+
+        Args:
+            pipeline: Pipeline name
+            stage: Stage name
+            seconds: Duration
+            error: Whether the stage failed
+        """
+        key = (pipeline, stage)
+        with self._lock:
+            histogram = self._durations.get(key)
+            if histogram is None:
+                histogram = self._durations[key] = Histogram(self.buckets)
+            histogram.observe(seconds)
+            if error:
+                self._errors[key] = self._errors.get(key, 0) + 1
+
+    def add_rows(self, pipeline: str, rows: int, failed: int = 0) -> None:
+        """
+        Count processed rows.
+
+        Args:
+            pipeline: Pipeline name
+            rows: Rows processed
+            failed: How many of them could not be classified
+        """
+        with self._lock:
+            self._rows[pipeline] = self._rows.get(pipeline, 0) + rows
+            self._failed_rows[pipeline] = self._failed_rows.get(pipeline, 0) + failed
+
+    def drain(self) -> Dict:
+        """
+        Return the raw samples recorded so far and reset them.
+
+        Worker processes send these back so the server process can ``merge``
+        them.
+
+        Returns:
+            Dict: Picklable bucket counts, sums and counters
+        """
+        with self._lock:
+            snapshot = {
+                "durations": {
+                    key: (list(histogram.bucket_counts), histogram.count, histogram.sum)
+                    for key, histogram in self._durations.items()
+                },
+                "rows": dict(self._rows),
+                "failed_rows": dict(self._failed_rows),
+                "errors": dict(self._errors)
+            }
+            self._durations.clear()
+            self._rows.clear()
+            self._failed_rows.clear()
+            self._errors.clear()
+        return snapshot
+
+    def merge(self, snapshot: Optional[Dict]) -> None:
+        """
+        Add samples drained from another process.
+
+        Args:
+            snapshot: Output of ``drain`` (None is ignored)
+        """
+        if not snapshot:
+            return
+        with self._lock:
+            for key, (bucket_counts, count, total) in snapshot["durations"].items():
+                histogram = self._durations.get(key)
+                if histogram is None:
+                    histogram = self._durations[key] = Histogram(self.buckets)
+                histogram.bucket_counts = [a + b for a, b in zip(histogram.bucket_counts, bucket_counts)]
+                histogram.count += count
+                histogram.sum += total
+            for name in ("rows", "failed_rows", "errors"):
+                counters = getattr(self, f"_{name}")
+                for key, value in snapshot[name].items():
+                    counters[key] = counters.get(key, 0) + value
+
+    def get_stats(self) -> Dict:
+        """
+        Return the metrics as a JSON-serializable dictionary.
+
+        Returns:
+            Dict: Per pipeline, its rows, failed rows and per-stage histograms
+                  with error counts
+        """
+        with self._lock:
+            pipelines: Dict[str, Dict] = {}
+            for (pipeline, stage), histogram in sorted(self._durations.items()):
+                stages = pipelines.setdefault(pipeline, {"stages": {}})["stages"]
+                stages[stage] = histogram.to_dict()
+                stages[stage]["errors"] = self._errors.get((pipeline, stage), 0)
+            for pipeline, rows in self._rows.items():
+                pipelines.setdefault(pipeline, {"stages": {}})["rows"] = rows
+                pipelines[pipeline]["failed_rows"] = self._failed_rows.get(pipeline, 0)
+        return pipelines
+
+    def render_prometheus(self, prefix: str = "exoplanet") -> str:
+        """
+        Render the metrics in the Prometheus text exposition format.
+
+        Args:
+            prefix: Metric name prefix
+
+        Returns:
+            str: Exposition text
+        """
+        lines: List[str] = []
+        with self._lock:
+            name = f"{prefix}_stage_duration_seconds"
+            lines.append(f"# HELP {name} Time spent in each stage of the prediction pipelines.")
+            lines.append(f"# TYPE {name} histogram")
+            for (pipeline, stage), histogram in sorted(self._durations.items()):
+                labels = f'pipeline="{pipeline}",stage="{stage}"'
+                for bound, count in histogram.cumulative_counts().items():
+                    lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f"{name}_sum{{{labels}}} {histogram.sum!r}")
+                lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+
+            for metric, help_text, counters in [
+                ("rows_total", "Rows processed by each pipeline.", self._rows),
+                ("failed_rows_total", "Rows that could not be classified.", self._failed_rows)
+            ]:
+                lines.append(f"# HELP {prefix}_{metric} {help_text}")
+                lines.append(f"# TYPE {prefix}_{metric} counter")
+                for pipeline, value in sorted(counters.items()):
+                    lines.append(f'{prefix}_{metric}{{pipeline="{pipeline}"}} {value}')
+
+            lines.append(f"# HELP {prefix}_stage_errors_total Stage runs that raised an error.")
+            lines.append(f"# TYPE {prefix}_stage_errors_total counter")
+            for (pipeline, stage), value in sorted(self._errors.items()):
+                lines.append(f'{prefix}_stage_errors_total{{pipeline="{pipeline}",stage="{stage}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+
+# Shared by the API and the detector (one instance per process)
+pipeline_metrics = PipelineMetrics()
@@ -0,0 +1,134 @@
+"""
+Micro-Batcher
+=============
+
+Dynamic micro-batching for single-candidate predictions.
+
+Concurrent requests that arrive within a short window (or until a maximum
+batch size is reached) are scored together as one matrix, and each result is
+handed back to the coroutine that submitted it. Scoring one 32-row matrix
+costs little more than scoring a single row, so sustained throughput grows
+with load while the added latency stays bounded by the window.
+
+Author: Felipe Coutinho
+NASA Space Apps Challenge 2025
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+WAIT_TIME_BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2, 5, 10, 25, 50, 100)
+
+
+class MicroBatcher:
+    """
+    Collects submitted items into batches for a batch-scoring coroutine.
+
+    A batch is dispatched when ``max_batch_size`` items are waiting or when
+    the oldest waiting item has waited ``max_wait_ms``. Dispatched batches are
+    scored concurrently with the collection of the next one.
+    """
+
+    def __init__(self, process_batch: Callable[[List[Any]], Awaitable[List[Any]]],
+                 max_batch_size: int = 32, max_wait_ms: float = 2.0):
+        """
+        Initialize the micro-batcher.
+
+        Args:
+            process_batch: Coroutine function that scores a list of items and
+                           returns one result per item, in order
+            max_batch_size: Largest batch dispatched at once
+            max_wait_ms: Longest time an item waits for others to join its batch
+        """
+        if max_batch_size < 1 or max_wait_ms < 0:
+            raise ValueError("max_batch_size must be >= 1 and max_wait_ms >= 0")
+
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+
+        self._waiting: List[Tuple[Any, asyncio.Future, float]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._in_flight = 0
+
+        self.batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+        self.wait_times_ms = Histogram(WAIT_TIME_BUCKETS_MS)
+
+    async def submit(self, item: Any) -> Any:
+        """
+        Add one item to the next batch and wait for its result.
+
+        Args:
+            item: Item to score
+
+        Returns:
+            Any: The result produced for this item by ``process_batch``
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._waiting.append((item, future, loop.time()))
+
+        if len(self._waiting) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_ms / 1000.0, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        """Dispatch waiting items, at most ``max_batch_size`` per batch."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        while self._waiting:
+            batch = self._waiting[:self.max_batch_size]
+            del self._waiting[:self.max_batch_size]
+            self._in_flight += 1
+            asyncio.ensure_future(self._dispatch(batch))
+
+    async def _dispatch(self, batch: List[Tuple[Any, asyncio.Future, float]]) -> None:
+        """Score one batch and resolve the futures of its submitters."""
+        now = asyncio.get_running_loop().time()
+        self.batch_sizes.observe(len(batch))
+        for _, _, enqueued_at in batch:
+            self.wait_times_ms.observe((now - enqueued_at) * 1000.0)
+
+        items = [item for item, _, _ in batch]
+        try:
+            results = await self.process_batch(items)
+        except Exception as e:
+            logger.error(f"Error scoring micro-batch of {len(batch)} items: {e}")
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for (_, future, _), result in zip(batch, results):
+                # Submitters may have been cancelled (client disconnected)
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            self._in_flight -= 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return the batcher configuration and its histograms.
+
+        Returns:
+            Dict: Settings, waiting/in-flight counts and the batch-size and
+                  wait-time (milliseconds) histograms
+        """
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+            "waiting": len(self._waiting),
+            "batches_in_flight": self._in_flight,
+            "batch_size": self.batch_sizes.to_dict(),
+            "wait_time_ms": self.wait_times_ms.to_dict()
+        }
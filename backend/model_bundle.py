@@ -0,0 +1,375 @@
+"""
+Model Bundle
+============
+
+Single-file, memory-mappable packaging of a trained exoplanet model.
+
+The three pickles (model, scaler, feature list) are replaced by one file:
+
+    magic (8 bytes) | format version (uint32) | header length (uint32)
+    JSON header, padded to a 64-byte boundary
+    sections, each starting on a 64-byte boundary
+
+The header holds the feature order, the decision threshold, the compiled
+model parameters and, for every section, its offset, length, dtype, shape
+and SHA-256 checksum. The sections are the booster in XGBoost's native
+UBJSON form and raw little-endian arrays: scaler means and scales,
+training-set imputation medians and the node arrays of the compiled tree
+ensemble.
+
+Bundles are opened with ``mmap``, and the arrays are read-only NumPy views
+of the mapping. Nothing is deserialized for the compiled engine, so loading
+is close to free, and every process that maps the same file shares one
+physical copy through the page cache. Only the "xgboost" engine copies the
+booster into the xgboost runtime.
+
+Convert existing pickles with:
+    python model_bundle.py exoplanet_model.bundle --training-data cumulative_2025.10.04_14.14.53.csv
+
+Author: Felipe Coutinho
+NASA Space Apps Challenge 2025
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import mmap
+import os
+import pickle
+import struct
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from compiled_model import CompiledTreeEnsemble
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"EXOBNDL\0"
+FORMAT_VERSION = 1
+
+# Section offsets are aligned so mapped arrays are aligned for any dtype
+ALIGNMENT = 64
+
+PREAMBLE = struct.Struct("<8sII")
+
+# Compiled ensemble arrays and their stored dtypes
+COMPILED_ARRAYS = {
+    "compiled_feature": "<i8",
+    "compiled_threshold": "<f8",
+    "compiled_leaf_value": "<f8"
+}
+
+
+class BundleFormatError(ValueError):
+    """Raised when a file is not a valid model bundle."""
+
+
+class ArrayScaler:
+    """
+    Standard scaler backed by plain arrays.
+
+    Applies the same ``(X - mean_) / scale_`` transform as the fitted
+    StandardScaler it was exported from, without scikit-learn.
+    """
+
+    def __init__(self, mean: np.ndarray, scale: np.ndarray):
+        """
+        Initialize the scaler.
+
+        Args:
+            mean: Per-feature training means
+            scale: Per-feature training standard deviations
+        """
+        self.mean_ = mean
+        self.scale_ = scale
+        self.n_features_in_ = len(mean)
+
+    def transform(self, X) -> np.ndarray:
+        """
+        Standardize feature rows.
+
+        Args:
+            X: Feature rows, shape (n_rows, n_features)
+
+        Returns:
+            np.ndarray: Standardized rows
+        """
+        return (np.asarray(X, dtype=np.float64) - self.mean_) / self.scale_
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def write_bundle(path: str, model, scaler, features: List[str],
+                 imputation_medians: Optional[np.ndarray] = None,
+                 decision_threshold: float = 0.5) -> Dict:
+    """
+    Write a trained model as a single bundle file.
+
+    Args:
+        path: Destination file; written atomically
+        model: Trained XGBClassifier
+        scaler: Fitted StandardScaler applied before the model
+        features: Feature names in model column order
+        imputation_medians: Training-set median per feature (NaN where
+                            unknown); all NaN when not given
+        decision_threshold: Probability above which a candidate is
+                            classified as an exoplanet
+
+    Returns:
+        Dict: Bundle header
+    """
+    # Native model format, including the scikit-learn wrapper attributes
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        booster_path = os.path.join(tmp_dir, "model.ubj")
+        model.save_model(booster_path)
+        booster = Path(booster_path).read_bytes()
+
+    if imputation_medians is None:
+        imputation_medians = np.full(len(features), np.nan)
+    compiled = CompiledTreeEnsemble.from_model(model, scaler, features)
+
+    payloads = {
+        "booster": (booster, None, None),
+        "scaler_mean": _array_payload(scaler.mean_, "<f8"),
+        "scaler_scale": _array_payload(scaler.scale_, "<f8"),
+        "imputation_medians": _array_payload(imputation_medians, "<f8"),
+        "compiled_feature": _array_payload(compiled.feature, COMPILED_ARRAYS["compiled_feature"]),
+        "compiled_threshold": _array_payload(compiled.threshold, COMPILED_ARRAYS["compiled_threshold"]),
+        "compiled_leaf_value": _array_payload(compiled.leaf_value, COMPILED_ARRAYS["compiled_leaf_value"])
+    }
+
+    sections = {}
+    for name, (data, dtype, shape) in payloads.items():
+        sections[name] = {"length": len(data), "sha256": hashlib.sha256(data).hexdigest()}
+        if dtype is not None:
+            sections[name].update({"dtype": dtype, "shape": shape})
+
+    header = {
+        "format_version": FORMAT_VERSION,
+        "created_at": datetime.now().isoformat(),
+        "model_type": "XGBoost",
+        "booster_format": "ubj",
+        "features": list(features),
+        "decision_threshold": float(decision_threshold),
+        "compiled": {
+            "depth": compiled.depth,
+            "n_features": compiled.n_features,
+            "base_margin": compiled.base_margin
+        },
+        "sections": sections,
+        # Identity of the bundle contents, used as the model fingerprint
+        "checksum": hashlib.sha256(
+            "".join(section["sha256"] for section in sections.values()).encode("utf-8")
+        ).hexdigest()
+    }
+
+    # Reserve header space with widest-possible placeholder offsets
+    for section in sections.values():
+        section["offset"] = 10 ** 12
+    header_length = _align(PREAMBLE.size + len(json.dumps(header))) - PREAMBLE.size
+    offset = PREAMBLE.size + header_length
+    for section in sections.values():
+        section["offset"] = offset
+        offset = _align(offset + section["length"])
+    header_bytes = json.dumps(header).encode("utf-8")
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(PREAMBLE.pack(MAGIC, FORMAT_VERSION, header_length))
+        f.write(header_bytes.ljust(header_length, b" "))
+        for name, (data, _, _) in payloads.items():
+            f.write(b"\0" * (sections[name]["offset"] - f.tell()))
+            f.write(data)
+    os.replace(tmp_path, path)
+
+    logger.info(f"Wrote model bundle {path} ({offset} bytes)")
+    return header
+
+
+def _array_payload(values, dtype: str):
+    array = np.ascontiguousarray(values, dtype=dtype)
+    return array.tobytes(), dtype, list(array.shape)
+
+
+class MappedBundle:
+    """
+    Read-only, memory-mapped view of a model bundle file.
+    """
+
+    def __init__(self, path: str, verify: bool = True):
+        """
+        Map a bundle file.
+
+        Args:
+            path: Bundle file
+            verify: Check the SHA-256 checksum of every section
+
+        Raises:
+            BundleFormatError: If the file is not a valid bundle of a
+                               supported version, or a checksum differs
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._mmap) < PREAMBLE.size:
+            raise BundleFormatError(f"{path} is not a model bundle")
+        magic, version, header_length = PREAMBLE.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise BundleFormatError(f"{path} is not a model bundle")
+        if version != FORMAT_VERSION:
+            raise BundleFormatError(f"Unsupported bundle format version {version} in {path}")
+
+        self.header = json.loads(bytes(self._mmap[PREAMBLE.size:PREAMBLE.size + header_length]))
+        self.features: List[str] = self.header["features"]
+        self.decision_threshold: float = self.header["decision_threshold"]
+        self.checksum: str = self.header["checksum"]
+
+        self._buffer = memoryview(self._mmap)
+        if verify:
+            for name, section in self.header["sections"].items():
+                if hashlib.sha256(self.section(name)).hexdigest() != section["sha256"]:
+                    raise BundleFormatError(f"Checksum mismatch in section '{name}' of {path}")
+
+    def section(self, name: str) -> memoryview:
+        """
+        Return the raw bytes of a section without copying.
+
+        Args:
+            name: Section name
+
+        Returns:
+            memoryview: Section bytes inside the mapping
+        """
+        section = self.header["sections"][name]
+        return self._buffer[section["offset"]:section["offset"] + section["length"]]
+
+    def array(self, name: str) -> np.ndarray:
+        """
+        Return an array section as a read-only view of the mapping.
+
+        Args:
+            name: Section name
+
+        Returns:
+            np.ndarray: Array sharing memory with the mapped file
+        """
+        section = self.header["sections"][name]
+        return np.frombuffer(self.section(name), dtype=section["dtype"]).reshape(section["shape"])
+
+    def scaler(self) -> ArrayScaler:
+        """Scaler backed by the mapped means and scales."""
+        return ArrayScaler(self.array("scaler_mean"), self.array("scaler_scale"))
+
+    def compiled_model(self) -> CompiledTreeEnsemble:
+        """Compiled tree ensemble backed by the mapped node arrays."""
+        compiled = self.header["compiled"]
+        return CompiledTreeEnsemble(
+            feature=self.array("compiled_feature").astype(np.intp, copy=False),
+            threshold=self.array("compiled_threshold"),
+            leaf_value=self.array("compiled_leaf_value"),
+            depth=compiled["depth"],
+            n_features=compiled["n_features"],
+            base_margin=compiled["base_margin"],
+            features=self.features
+        )
+
+    def load_model(self):
+        """
+        Load the booster into the xgboost runtime.
+
+        Returns:
+            XGBClassifier: Classifier equivalent to the exported model
+        """
+        import xgboost as xgb
+
+        model = xgb.XGBClassifier()
+        model.load_model(bytearray(self.section("booster")))
+        return model
+
+    def fingerprint(self, extra: str = "") -> str:
+        """
+        Identify the bundle contents for the prediction cache.
+
+        Args:
+            extra: Additional identifying text (e.g. the inference engine)
+
+        Returns:
+            str: Hex digest over the bundle checksum and ``extra``
+        """
+        return hashlib.sha256((self.checksum + extra).encode("utf-8")).hexdigest()
+
+
+def convert_pickles(output_path: str, model_path: str = "exoplanet_detector_model.pkl",
+                    scaler_path: str = "exoplanet_scaler.pkl",
+                    features_path: str = "exoplanet_features.pkl",
+                    training_data: Optional[str] = None,
+                    decision_threshold: float = 0.5,
+                    dataset_cache: Optional[str] = None) -> Dict:
+    """
+    Convert the three model pickles into a bundle file.
+
+    Args:
+        output_path: Destination bundle file
+        model_path: Path to the trained model file
+        scaler_path: Path to the scaler file
+        features_path: Path to the features list file
+        training_data: Optional CSV of the training catalog; its per-feature
+                       medians are stored for imputing missing values
+        decision_threshold: Probability above which a candidate is
+                            classified as an exoplanet
+        dataset_cache: Preprocessed dataset cache the training catalog is
+                       read through (see ``dataset_cache``)
+
+    Returns:
+        Dict: Bundle header
+    """
+    import joblib
+
+    model = joblib.load(model_path)
+    scaler = joblib.load(scaler_path)
+    with open(features_path, "rb") as f:
+        features = pickle.load(f)
+
+    medians = None
+    if training_data is not None:
+        from dataset_cache import load_dataset
+
+        medians = load_dataset(training_data, dataset_cache).medians_for(features)
+
+    return write_bundle(output_path, model, scaler, features,
+                        imputation_medians=medians, decision_threshold=decision_threshold)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Convert the model pickles into a single bundle file.")
+    parser.add_argument("output", help="Bundle file to write")
+    parser.add_argument("--model-path", default="exoplanet_detector_model.pkl")
+    parser.add_argument("--scaler-path", default="exoplanet_scaler.pkl")
+    parser.add_argument("--features-path", default="exoplanet_features.pkl")
+    parser.add_argument("--training-data", help="Training catalog CSV for the imputation medians")
+    parser.add_argument("--decision-threshold", type=float, default=0.5)
+    parser.add_argument("--dataset-cache", help="Preprocessed dataset cache directory")
+    args = parser.parse_args()
+
+    header = convert_pickles(
+        args.output,
+        model_path=args.model_path,
+        scaler_path=args.scaler_path,
+        features_path=args.features_path,
+        training_data=args.training_data,
+        decision_threshold=args.decision_threshold,
+        dataset_cache=args.dataset_cache
+    )
+    print(f"Wrote {args.output}: {len(header['features'])} features, checksum {header['checksum'][:16]}")
+
+
+if __name__ == "__main__":
+    main()
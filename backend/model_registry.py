@@ -0,0 +1,391 @@
+"""
+Model Registry
+==============
+
+Registry of per-mission model bundles for the exoplanet detection API.
+
+Each bundle (a trained model, its scaler and its feature list) is registered
+under a name such as "kepler" or "tess-v2" and is only loaded the first time
+a request asks for it. At most ``max_resident`` bundles stay in memory,
+optionally also bounded by a memory budget; when a new bundle does not fit,
+the least recently used ones are evicted and reloaded on their next use.
+
+Bundles can be described in a JSON manifest:
+
+    {
+        "default": "kepler",
+        "models": {
+            "kepler": {
+                "mission": "Kepler",
+                "version": "1.0",
+                "model_path": "exoplanet_detector_model.pkl",
+                "scaler_path": "exoplanet_scaler.pkl",
+                "features_path": "exoplanet_features.pkl",
+                "engine": "xgboost"
+            }
+        }
+    }
+
+A model can instead be a single bundle file (see ``model_bundle``), given
+as ``"bundle_path": "kepler.bundle"`` in place of the three pickle paths.
+Pickled models impute missing values with ``"medians_path"`` (default:
+exoplanet_medians.json next to the model file).
+Relative artifact paths are resolved against the manifest's directory.
+
+Author: Felipe Coutinho
+NASA Space Apps Challenge 2025
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from exoplanet_detector_model import ExoplanetDetector
+from prediction_cache import PredictionCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "kepler"
+
+
+class UnknownModelError(KeyError):
+    """Raised when a request names a model that is not registered."""
+
+    def __init__(self, name: str, available: List[str]):
+        super().__init__(name)
+        self.name = name
+        self.available = available
+
+    def __str__(self) -> str:
+        return f"Unknown model '{self.name}', available models: {self.available}"
+
+
+class ModelLoadError(RuntimeError):
+    """Raised when the artifacts of a registered model cannot be loaded."""
+
+
+class ModelBundle:
+    """
+    Artifact paths of one registered model and its residency statistics.
+    """
+
+    def __init__(self, name: str, model_path: Optional[str] = None,
+                 scaler_path: Optional[str] = None, features_path: Optional[str] = None,
+                 mission: Optional[str] = None, version: Optional[str] = None,
+                 engine: str = "xgboost", bundle_path: Optional[str] = None,
+                 medians_path: Optional[str] = None):
+        """
+        Describe a model bundle.
+
+        Args:
+            name: Name requests use to select the bundle
+            model_path: Path to the trained model file
+            scaler_path: Path to the scaler file
+            features_path: Path to the features list file
+            mission: Mission the model was trained on (defaults to ``name``)
+            version: Model version label
+            engine: Inference engine passed to ExoplanetDetector
+            bundle_path: Single-file model bundle, used instead of the
+                         three pickle paths
+            medians_path: Training medians of the pickled model (default:
+                          exoplanet_medians.json next to the model file)
+
+        Raises:
+            ValueError: If neither a bundle nor all three pickle paths are given
+        """
+        if bundle_path is None and None in (model_path, scaler_path, features_path):
+            raise ValueError(f"Model '{name}' needs a bundle_path or model, scaler and features paths")
+
+        self.name = name
+        self.model_path = model_path
+        self.scaler_path = scaler_path
+        self.features_path = features_path
+        self.bundle_path = bundle_path
+        self.medians_path = medians_path
+        self.mission = mission or name
+        self.version = version
+        self.engine = engine
+
+        self.loads = 0
+        self.evictions = 0
+        self.load_time_seconds: Optional[float] = None
+        self.memory_bytes: Optional[int] = None
+        self.loaded_at: Optional[float] = None
+        self.last_used_at: Optional[float] = None
+
+
+def estimate_memory_bytes(detector: ExoplanetDetector) -> int:
+    """
+    Approximate the memory held by a loaded detector.
+
+    Pickled boosters and scalers take about as much memory as their files, so
+    the artifact sizes on disk are used, plus the arrays of a compiled model.
+    A mapped bundle counts its file size once; its arrays live in the mapping.
+
+    Args:
+        detector: Loaded detector
+
+    Returns:
+        int: Estimated size in bytes
+    """
+    if detector.bundle_path is not None:
+        return Path(detector.bundle_path).stat().st_size
+
+    size = sum(Path(path).stat().st_size for path in
+               [detector.model_path, detector.scaler_path, detector.features_path])
+    compiled = detector.compiled_model
+    if compiled is not None:
+        size += sum(value.nbytes for value in vars(compiled).values() if hasattr(value, "nbytes"))
+    return size
+
+
+class ModelRegistry:
+    """
+    Lazily loads registered model bundles and keeps the recently used ones
+    resident.
+
+    ``get`` is thread-safe: concurrent requests for a bundle that is not
+    resident wait for a single load, while requests for resident bundles are
+    never blocked by it.
+    """
+
+    def __init__(self, default: str = DEFAULT_MODEL, max_resident: int = 2,
+                 memory_budget_bytes: Optional[int] = None,
+                 cache_factory: Optional[Callable[[], PredictionCache]] = None):
+        """
+        Initialize an empty registry.
+
+        Args:
+            default: Name of the bundle used when a request names none
+            max_resident: Bundles kept loaded at the same time
+            memory_budget_bytes: Optional limit on the estimated memory of the
+                                 resident bundles; the most recently used
+                                 bundle is always kept
+            cache_factory: Optional callable creating a prediction cache for
+                           each loaded bundle
+        """
+        if max_resident < 1:
+            raise ValueError("max_resident must be >= 1")
+
+        self.default = default
+        self.max_resident = max_resident
+        self.memory_budget_bytes = memory_budget_bytes
+        self.cache_factory = cache_factory
+
+        self.bundles: Dict[str, ModelBundle] = {}
+        self._resident: "OrderedDict[str, ExoplanetDetector]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+
+    def register(self, bundle: ModelBundle) -> None:
+        """
+        Add a bundle, replacing (and unloading) any bundle of the same name.
+
+        Args:
+            bundle: Bundle to register
+        """
+        with self._lock:
+            self.bundles[bundle.name] = bundle
+            self._resident.pop(bundle.name, None)
+        logger.info(f"Registered model '{bundle.name}' ({bundle.mission}, version {bundle.version})")
+
+    @classmethod
+    def from_manifest(cls, manifest_path: str, **kwargs) -> "ModelRegistry":
+        """
+        Create a registry from a JSON manifest.
+
+        Args:
+            manifest_path: Path to the manifest file
+            **kwargs: Further ModelRegistry arguments
+
+        Returns:
+            ModelRegistry: Registry with every bundle of the manifest
+        """
+        manifest_file = Path(manifest_path)
+        manifest = json.loads(manifest_file.read_text())
+        base_dir = manifest_file.parent
+
+        models = manifest.get("models", {})
+        registry = cls(default=manifest.get("default", next(iter(models), DEFAULT_MODEL)), **kwargs)
+        for name, spec in models.items():
+            paths = {
+                key: str(base_dir / spec[key])
+                for key in ("model_path", "scaler_path", "features_path", "bundle_path", "medians_path")
+                if key in spec
+            }
+            registry.register(ModelBundle(
+                name,
+                mission=spec.get("mission"),
+                version=spec.get("version"),
+                engine=spec.get("engine", "xgboost"),
+                **paths
+            ))
+        return registry
+
+    def resolve(self, name: Optional[str] = None) -> str:
+        """
+        Map a requested model name to a registered bundle name.
+
+        Args:
+            name: Requested name, or None for the default bundle
+
+        Returns:
+            str: Registered bundle name
+
+        Raises:
+            UnknownModelError: If no bundle has that name
+        """
+        name = name or self.default
+        if name not in self.bundles:
+            raise UnknownModelError(name, list(self.bundles))
+        return name
+
+    def get(self, name: Optional[str] = None) -> ExoplanetDetector:
+        """
+        Return the detector of a bundle, loading it on first use.
+
+        Args:
+            name: Bundle name, or None for the default bundle
+
+        Returns:
+            ExoplanetDetector: Loaded detector
+
+        Raises:
+            UnknownModelError: If no bundle has that name
+            ModelLoadError: If the bundle's artifacts cannot be loaded
+        """
+        name = self.resolve(name)
+
+        with self._lock:
+            detector = self._touch(name)
+            if detector is not None:
+                return detector
+            load_lock = self._load_locks.setdefault(name, threading.Lock())
+
+        with load_lock:
+            # Another request may have loaded it while we waited
+            with self._lock:
+                detector = self._touch(name)
+                if detector is not None:
+                    return detector
+
+            detector = self._load(self.bundles[name])
+
+            with self._lock:
+                self._resident[name] = detector
+                self.bundles[name].last_used_at = time.time()
+                self._evict()
+            return detector
+
+    def _touch(self, name: str) -> Optional[ExoplanetDetector]:
+        """Return a resident detector and mark it most recently used."""
+        detector = self._resident.get(name)
+        if detector is not None:
+            self._resident.move_to_end(name)
+            self.bundles[name].last_used_at = time.time()
+        return detector
+
+    def _load(self, bundle: ModelBundle) -> ExoplanetDetector:
+        """Load the artifacts of a bundle and record the load statistics."""
+        logger.info(f"Loading model '{bundle.name}'...")
+        start = time.perf_counter()
+        detector = ExoplanetDetector(
+            model_path=bundle.model_path,
+            scaler_path=bundle.scaler_path,
+            features_path=bundle.features_path,
+            bundle_path=bundle.bundle_path,
+            medians_path=bundle.medians_path,
+            engine=bundle.engine,
+            cache=self.cache_factory() if self.cache_factory is not None else None
+        )
+        if not detector.is_loaded:
+            raise ModelLoadError(f"Model '{bundle.name}' could not be loaded")
+
+        bundle.load_time_seconds = time.perf_counter() - start
+        bundle.memory_bytes = estimate_memory_bytes(detector)
+        bundle.loaded_at = time.time()
+        bundle.loads += 1
+        logger.info(f"Model '{bundle.name}' loaded in {bundle.load_time_seconds:.3f}s")
+        return detector
+
+    def _resident_bytes(self) -> int:
+        return sum(self.bundles[name].memory_bytes or 0 for name in self._resident)
+
+    def _evict(self) -> None:
+        """Unload least recently used bundles until the limits are met."""
+        while len(self._resident) > 1 and (
+            len(self._resident) > self.max_resident
+            or (self.memory_budget_bytes is not None
+                and self._resident_bytes() > self.memory_budget_bytes)
+        ):
+            name, _ = self._resident.popitem(last=False)
+            self.bundles[name].evictions += 1
+            logger.info(f"Evicted model '{name}'")
+
+    def resident(self, name: Optional[str] = None) -> Optional[ExoplanetDetector]:
+        """
+        Return a detector only if it is already loaded, without loading it
+        or changing its recency.
+
+        Args:
+            name: Bundle name, or None for the default bundle
+
+        Returns:
+            Optional[ExoplanetDetector]: Resident detector or None
+        """
+        with self._lock:
+            return self._resident.get(name or self.default)
+
+    def get_stats(self) -> Dict:
+        """
+        Return the registry limits and the state of every bundle.
+
+        Returns:
+            Dict: Limits, resident bundles (least recently used first) and
+                  per-bundle residency, load time and memory estimate
+        """
+        with self._lock:
+            resident = list(self._resident)
+            models = {}
+            for name, bundle in self.bundles.items():
+                detector = self._resident.get(name)
+                models[name] = {
+                    "mission": bundle.mission,
+                    "version": bundle.version,
+                    "engine": bundle.engine,
+                    "resident": detector is not None,
+                    "loads": bundle.loads,
+                    "evictions": bundle.evictions,
+                    "load_time_seconds": bundle.load_time_seconds,
+                    "memory_bytes": bundle.memory_bytes,
+                    "loaded_at": bundle.loaded_at,
+                    "last_used_at": bundle.last_used_at,
+                    "fingerprint": detector.fingerprint if detector is not None else None
+                }
+
+            return {
+                "default": self.default,
+                "max_resident": self.max_resident,
+                "memory_budget_bytes": self.memory_budget_bytes,
+                "resident_memory_bytes": self._resident_bytes(),
+                "resident": resident,
+                "models": models
+            }
+
+    def cache_stats(self) -> Dict[str, Dict]:
+        """
+        Return the prediction cache statistics of the resident bundles.
+
+        Returns:
+            Dict[str, Dict]: Cache statistics keyed by bundle name
+        """
+        with self._lock:
+            return {
+                name: detector.cache.get_stats()
+                for name, detector in self._resident.items()
+                if detector.cache is not None
+            }
@@ -0,0 +1,227 @@
+"""
+Prediction Cache
+================
+
+Content-addressed cache of exoplanet probabilities.
+
+Entries are keyed by a hash of the ordered feature vector together with a
+fingerprint of the loaded model artifacts, so a candidate that is rescored
+with the same model is answered from memory and entries produced by another
+model can never be returned. The cache is a size-bounded LRU with an optional
+time-to-live per entry.
+
+An entry can also carry the candidate's top-k feature contributions, so
+explanations are served from the same entry as the prediction.
+
+Author: Felipe Coutinho
+NASA Space Apps Challenge 2025
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+
+def fingerprint_files(paths: Iterable[str], extra: str = "") -> str:
+    """
+    Compute a fingerprint of model artifact files.
+
+    Args:
+        paths: Files whose contents identify the model
+        extra: Additional identifying text (e.g. the inference engine)
+
+    Returns:
+        str: Hex digest over the file contents and ``extra``
+    """
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(Path(path).read_bytes())
+    digest.update(extra.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class PredictionCache:
+    """
+    Thread-safe LRU cache mapping feature vectors to exoplanet probabilities.
+    """
+
+    def __init__(self, max_entries: int = 100_000, ttl_seconds: Optional[float] = None):
+        """
+        Initialize an empty cache.
+
+        Args:
+            max_entries: Entries kept before the least recently used is evicted
+            ttl_seconds: Lifetime of an entry, or None to keep entries until evicted
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be >= 1")
+
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.fingerprint = ""
+
+        self._entries: "OrderedDict[bytes, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.explanation_hits = 0
+        self.explanation_misses = 0
+
+    def bind(self, fingerprint: str) -> None:
+        """
+        Associate the cache with a model, dropping entries of any other model.
+
+        Args:
+            fingerprint: Fingerprint of the loaded model artifacts
+        """
+        with self._lock:
+            if fingerprint != self.fingerprint:
+                if self._entries:
+                    self.invalidations += 1
+                self._entries.clear()
+                self.fingerprint = fingerprint
+
+    def make_keys(self, X: np.ndarray) -> List[bytes]:
+        """
+        Build cache keys for feature rows.
+
+        Args:
+            X: Raw feature rows in model column order, shape (n_rows, n_features)
+
+        Returns:
+            List[bytes]: One key per row
+        """
+        # Canonical bytes: float64, -0.0 folded into 0.0, a single NaN pattern
+        X = np.asarray(X, dtype=np.float64) + 0.0
+        X = np.where(np.isnan(X), np.nan, X)
+        prefix = self.fingerprint.encode("ascii")
+        return [
+            hashlib.blake2b(prefix + row.tobytes(), digest_size=16).digest()
+            for row in np.ascontiguousarray(X)
+        ]
+
+    def get_many(self, keys: List[bytes]) -> List[Optional[float]]:
+        """
+        Look up several keys, refreshing their recency.
+
+        Args:
+            keys: Keys from ``make_keys``
+
+        Returns:
+            List[Optional[float]]: Cached probability, or None on a miss
+        """
+        values = []
+        with self._lock:
+            for entry in self._lookup(keys):
+                if entry is None:
+                    self.misses += 1
+                    values.append(None)
+                else:
+                    self.hits += 1
+                    values.append(entry[0])
+        return values
+
+    def get_explanations(self, keys: List[bytes], top_k: int
+                         ) -> List[Optional[Tuple[float, Tuple[int, ...], Tuple[float, ...]]]]:
+        """
+        Look up cached explanations with at least ``top_k`` contributions.
+
+        Args:
+            keys: Keys from ``make_keys``
+            top_k: Contributions needed per row
+
+        Returns:
+            List: (probability, feature indices, contributions) truncated to
+                  ``top_k``, or None when no explanation that long is cached
+        """
+        values = []
+        with self._lock:
+            for entry in self._lookup(keys):
+                explanation = entry[2] if entry is not None else None
+                if explanation is None or len(explanation[0]) < top_k:
+                    self.explanation_misses += 1
+                    values.append(None)
+                else:
+                    self.explanation_hits += 1
+                    values.append((entry[0], explanation[0][:top_k], explanation[1][:top_k]))
+        return values
+
+    def _lookup(self, keys: List[bytes]) -> List[Optional[tuple]]:
+        """Entries for ``keys`` (None when absent or expired), refreshing recency."""
+        now = time.monotonic()
+        entries = []
+        for key in keys:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] is not None and entry[1] <= now:
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+            entries.append(entry)
+        return entries
+
+    def put_many(self, keys: List[bytes], values: Iterable[float],
+                 explanations: Optional[Iterable[Tuple[Tuple[int, ...], Tuple[float, ...]]]] = None) -> None:
+        """
+        Store probabilities, evicting least recently used entries when full.
+
+        Args:
+            keys: Keys from ``make_keys``
+            values: Probability for each key
+            explanations: Optional (feature indices, contributions) for each
+                          key, ordered by decreasing magnitude; without them
+                          a previously cached explanation is kept
+        """
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else None
+        if explanations is None:
+            explanations = [None] * len(keys)
+        with self._lock:
+            for key, value, explanation in zip(keys, values, explanations):
+                if explanation is None:
+                    previous = self._entries.get(key)
+                    explanation = previous[2] if previous is not None else None
+                self._entries[key] = (float(value), expires_at, explanation)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict:
+        """
+        Return cache size and counters.
+
+        Returns:
+            Dict: Size, limits, hit/miss/eviction counters and hit rate
+        """
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else None,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "explanation_hits": self.explanation_hits,
+            "explanation_misses": self.explanation_misses,
+            "model_fingerprint": self.fingerprint[:16]
+        }
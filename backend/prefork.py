@@ -0,0 +1,341 @@
+"""
+Pre-Fork Server
+===============
+
+Multi-process production server for the exoplanet detection API.
+
+The parent process imports the API, loads and warms up the default model and
+binds the listening socket once, then forks the workers. Each worker serves
+the shared socket with its own uvicorn event loop, so requests spread over
+all cores. The booster, scaler and compiled arrays are inherited
+copy-on-write: N workers share one copy of the model instead of loading N.
+``gc.freeze`` before forking keeps the garbage collector from writing to
+(and so copying) the inherited objects.
+
+The parent only supervises:
+
+    - a worker that exits is replaced in its slot
+    - ``max_requests`` recycles a worker after that many requests (plus up to
+      ``max_requests_jitter``, so workers do not restart together)
+    - SIGTERM/SIGINT stop the workers gracefully: in-flight requests get
+      ``graceful_timeout`` seconds before the workers are killed
+
+Request counts live in a small shared-memory table; each worker increments
+its own slot. ``/health`` reports the table under ``server``.
+
+Author: Felipe Coutinho
+NASA Space Apps Challenge 2025
+"""
+
+import gc
+import logging
+import mmap
+import os
+import random
+import signal
+import socket
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SLOT_DTYPE = np.dtype([
+    ("pid", "<i8"),
+    ("started_at", "<f8"),
+    ("requests", "<i8"),
+    ("retired_requests", "<i8"),
+    ("restarts", "<i8")
+])
+
+# Workers that exit sooner than this are restarted after a pause, so a
+# worker that fails at startup does not spin
+MIN_WORKER_SECONDS = 1.0
+
+# Supervisor polling interval
+POLL_SECONDS = 0.1
+
+
+class WorkerTable:
+    """
+    Per-worker counters in anonymous shared memory.
+
+    The mapping is created by the parent and inherited by every forked
+    worker. Each slot has a single writer at a time: its worker while it
+    runs, the parent between workers.
+    """
+
+    def __init__(self, workers: int):
+        """
+        Allocate the table.
+
+        Args:
+            workers: Number of worker slots
+        """
+        self._buffer = mmap.mmap(-1, SLOT_DTYPE.itemsize * workers)
+        self.slots = np.frombuffer(self._buffer, dtype=SLOT_DTYPE)
+
+    def get_stats(self) -> List[Dict[str, Any]]:
+        """
+        Return every slot.
+
+        Returns:
+            List[Dict]: Slot, worker pid, start time, requests of the current
+                        worker, requests over all workers of the slot and
+                        restarts
+        """
+        slots = self.slots.copy()
+        return [{
+            "slot": position,
+            "pid": int(slot["pid"]),
+            "started_at": float(slot["started_at"]),
+            "requests": int(slot["requests"]),
+            "total_requests": int(slot["requests"] + slot["retired_requests"]),
+            "restarts": int(slot["restarts"])
+        } for position, slot in enumerate(slots)]
+
+
+# Set in the parent before forking; _slot is set in each worker
+_table: Optional[WorkerTable] = None
+_slot: Optional[int] = None
+
+
+def active() -> bool:
+    """Whether the process is a pre-fork server or one of its workers."""
+    return _table is not None
+
+
+def record_request() -> None:
+    """Count a request for the current worker (no-op outside a worker)."""
+    if _slot is not None:
+        _table.slots["requests"][_slot] += 1
+
+
+def get_stats() -> Optional[Dict[str, Any]]:
+    """
+    Return the pre-fork state, or None in a single-process server.
+
+    Returns:
+        Optional[Dict]: Slot and pid of the answering worker and the stats
+                        of every worker
+    """
+    if _table is None:
+        return None
+    workers = _table.get_stats()
+    return {
+        "mode": "prefork",
+        "worker": _slot,
+        "pid": os.getpid(),
+        "total_requests": sum(worker["total_requests"] for worker in workers),
+        "workers": workers
+    }
+
+
+class RequestCounter:
+    """ASGI middleware feeding ``record_request``."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            record_request()
+        await self.app(scope, receive, send)
+
+
+class PreforkServer:
+    """
+    Forks uvicorn workers from a parent that has loaded the model.
+    """
+
+    def __init__(self, app, host: str = "0.0.0.0", port: int = 8000, workers: int = 2,
+                 max_requests: int = 0, max_requests_jitter: int = 0,
+                 graceful_timeout: float = 30.0, log_level: str = "info",
+                 preload: Optional[Callable[[], None]] = None,
+                 on_worker_exit: Optional[Callable[[int], None]] = None):
+        """
+        Configure the server.
+
+        Args:
+            app: ASGI application, imported in the parent
+            host: Bind address
+            port: Bind port
+            workers: Worker processes
+            max_requests: Requests after which a worker is recycled (0: never)
+            max_requests_jitter: Random extra requests added per worker
+            graceful_timeout: Seconds workers get to finish in-flight
+                              requests when stopping
+            log_level: uvicorn log level
+            preload: Called in the parent before forking (load models here)
+            on_worker_exit: Called in the parent with the pid of every
+                            worker that exited
+        """
+        if workers < 1:
+            raise ValueError("At least one worker is required")
+        self.app = app
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.max_requests = max_requests
+        self.max_requests_jitter = max_requests_jitter
+        self.graceful_timeout = graceful_timeout
+        self.log_level = log_level
+        self.preload = preload
+        self.on_worker_exit = on_worker_exit
+
+        self._socket: Optional[socket.socket] = None
+        self._pids: Dict[int, int] = {}
+        self._spawned_at: Dict[int, float] = {}
+        self._stopping = False
+
+    def run(self) -> None:
+        """Preload, fork the workers and supervise them until stopped."""
+        global _table
+        _table = WorkerTable(self.workers)
+
+        start = time.perf_counter()
+        if self.preload is not None:
+            self.preload()
+        logger.info(f"Preloaded the application in {time.perf_counter() - start:.2f}s")
+
+        self._socket = self._bind()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(sig, self._handle_stop)
+
+        # Objects that exist now are inherited by every worker; keep the
+        # collector from touching (and copying) them
+        gc.collect()
+        gc.freeze()
+        for slot in range(self.workers):
+            self._spawn(slot)
+        logger.info(f"Serving on http://{self.host}:{self.port} with {self.workers} workers")
+
+        try:
+            while not self._stopping:
+                self._reap()
+                time.sleep(POLL_SECONDS)
+        finally:
+            self._stop()
+
+    def _bind(self) -> socket.socket:
+        sock = socket.socket(socket.AF_INET6 if ":" in self.host else socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        sock.listen(2048)
+        sock.set_inheritable(True)
+        # The OS picks a free port when 0 is given
+        self.port = sock.getsockname()[1]
+        return sock
+
+    def _handle_stop(self, signum, frame) -> None:
+        self._stopping = True
+
+    def _spawn(self, slot: int) -> None:
+        """Fork a worker into ``slot``."""
+        pid = os.fork()
+        if pid == 0:
+            self._serve(slot)
+        self._pids[pid] = slot
+        self._spawned_at[slot] = time.monotonic()
+        _table.slots["pid"][slot] = pid
+
+    def _serve(self, slot: int) -> None:
+        """Worker body: serve the inherited socket until recycled or stopped."""
+        global _slot
+        import uvicorn
+
+        _slot = slot
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(sig, signal.SIG_DFL)
+        # Forked workers share the parent's random state
+        random.seed()
+
+        slots = _table.slots
+        slots["started_at"][slot] = time.time()
+        slots["requests"][slot] = 0
+        limit = None
+        if self.max_requests > 0:
+            limit = self.max_requests + random.randint(0, max(self.max_requests_jitter, 0))
+
+        code = 0
+        try:
+            server = uvicorn.Server(uvicorn.Config(
+                self.app,
+                log_level=self.log_level,
+                limit_max_requests=limit,
+                timeout_graceful_shutdown=self.graceful_timeout
+            ))
+            server.run(sockets=[self._socket])
+            if not server.started:
+                code = 3
+        except BaseException as e:
+            logger.error(f"Worker {slot} failed: {e}")
+            code = 1
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(code)
+
+    def _reap(self) -> None:
+        """Collect exited workers and replace them unless stopping."""
+        while self._pids:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            slot = self._pids.pop(pid, None)
+            if slot is None:
+                continue
+
+            slots = _table.slots
+            requests = int(slots["requests"][slot])
+            slots["retired_requests"][slot] += requests
+            slots["requests"][slot] = 0
+            slots["pid"][slot] = 0
+            if self.on_worker_exit is not None:
+                try:
+                    self.on_worker_exit(pid)
+                except Exception as e:
+                    logger.error(f"Cleanup after worker {pid} failed: {e}")
+
+            if self._stopping:
+                continue
+            code = os.waitstatus_to_exitcode(status)
+            if code == 0:
+                logger.info(f"Worker {slot} (pid {pid}) recycled after {requests} requests")
+            else:
+                logger.warning(f"Worker {slot} (pid {pid}) exited with status {code}")
+            if time.monotonic() - self._spawned_at[slot] < MIN_WORKER_SECONDS:
+                time.sleep(MIN_WORKER_SECONDS)
+            slots["restarts"][slot] += 1
+            self._spawn(slot)
+
+    def _stop(self) -> None:
+        """Stop the workers gracefully, killing those that overrun."""
+        self._stopping = True
+        logger.info(f"Stopping {len(self._pids)} workers")
+        for pid in list(self._pids):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+        deadline = time.monotonic() + self.graceful_timeout + 5
+        while self._pids and time.monotonic() < deadline:
+            self._reap()
+            time.sleep(POLL_SECONDS)
+        for pid in list(self._pids):
+            logger.warning(f"Killing worker {pid} after the graceful timeout")
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        while self._pids:
+            self._reap()
+            time.sleep(POLL_SECONDS)
+
+        self._socket.close()
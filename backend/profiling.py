@@ -0,0 +1,261 @@
+"""
+Request Profiling
+=================
+
+Opt-in profiling of individual API requests.
+
+A request is profiled when the client asks for it with ``?profile=true``
+and the ``X-Profile-Token`` header matching EXOPLANET_PROFILE_TOKEN, or when
+it is picked by the server-side sampling rate EXOPLANET_PROFILE_SAMPLE_RATE.
+The executor task of the request (parsing, validation, scoring and response
+building) then runs under ``cProfile`` and ``tracemalloc``, and the report
+lists the top functions by cumulative time and the allocation totals.
+
+Reports of explicitly requested profiles are attached to JSON responses.
+When EXOPLANET_PROFILE_DIR is set every report is also written there as
+``<id>.json``, next to the raw ``<id>.prof`` statistics for pstats or
+snakeviz; sampled requests only ever go to that directory (or the log).
+
+Author: Felipe Coutinho
+NASA Space Apps Challenge 2025
+"""
+
+import cProfile
+import hmac
+import json
+import logging
+import os
+import pstats
+import random
+import threading
+import time
+import tracemalloc
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# cProfile and tracemalloc are process-wide, so one request per process is
+# profiled at a time
+_PROFILE_LOCK = threading.Lock()
+
+
+class RequestProfiler:
+    """
+    Decides which requests are profiled and where their reports go.
+    """
+
+    def __init__(self, token: Optional[str] = None, sample_rate: float = 0.0,
+                 directory: Optional[str] = None, top_n: int = 25):
+        """
+        Initialize the profiler configuration.
+
+        Args:
+            token: Secret a client must send to profile its request; None
+                   rejects every explicit profiling request
+            sample_rate: Fraction of requests profiled without being asked
+            directory: Directory the reports are written to, if any
+            top_n: Functions and allocation sites listed in a report
+        """
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError(f"Profile sample rate must be between 0 and 1, got {sample_rate}")
+        self.token = token
+        self.sample_rate = sample_rate
+        self.directory = directory
+        self.top_n = top_n
+        self._profiled = 0
+        self._sampled = 0
+        self._rejected = 0
+
+    @classmethod
+    def from_env(cls) -> "RequestProfiler":
+        """Configuration from the EXOPLANET_PROFILE_* environment variables."""
+        return cls(
+            token=os.environ.get("EXOPLANET_PROFILE_TOKEN") or None,
+            sample_rate=float(os.environ.get("EXOPLANET_PROFILE_SAMPLE_RATE", "0")),
+            directory=os.environ.get("EXOPLANET_PROFILE_DIR") or None,
+            top_n=int(os.environ.get("EXOPLANET_PROFILE_TOP", "25"))
+        )
+
+    def authorize(self, token: Optional[str]) -> bool:
+        """
+        Check the token of an explicit profiling request.
+
+        Args:
+            token: Value of the client's X-Profile-Token header
+
+        Returns:
+            bool: True if profiling is enabled and the token matches
+        """
+        if self.token is None or token is None or not hmac.compare_digest(token, self.token):
+            self._rejected += 1
+            return False
+        self._profiled += 1
+        return True
+
+    def sample(self) -> bool:
+        """Whether a request that did not ask for profiling is sampled."""
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            self._sampled += 1
+            return True
+        return False
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return the profiling configuration and counters.
+
+        Returns:
+            Dict: Whether explicit profiling is enabled, the sample rate,
+                  report directory and request counts
+        """
+        return {
+            "enabled": self.token is not None,
+            "sample_rate": self.sample_rate,
+            "directory": self.directory,
+            "profiled_requests": self._profiled,
+            "sampled_requests": self._sampled,
+            "rejected_requests": self._rejected
+        }
+
+
+def _function_label(function: Tuple[str, int, str]) -> str:
+    filename, line, name = function
+    if filename == "~":
+        return name
+    return f"{os.path.basename(filename)}:{line}({name})"
+
+
+def build_report(profile: cProfile.Profile, snapshot: Optional[tracemalloc.Snapshot],
+                 peak_bytes: int, wall_seconds: float, task: str, top_n: int = 25) -> Dict[str, Any]:
+    """
+    Summarize a finished profile.
+
+    Args:
+        profile: Disabled profiler
+        snapshot: tracemalloc snapshot taken when the task finished
+        peak_bytes: Peak traced memory during the task
+        wall_seconds: Wall-clock duration of the task
+        task: Name of the profiled task
+        top_n: Functions and allocation sites to list
+
+    Returns:
+        Dict: Report with the top functions by cumulative time and the
+              allocation totals
+    """
+    stats = pstats.Stats(profile).stats
+    ranked = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)
+    top_functions: List[Dict[str, Any]] = [
+        {
+            "function": _function_label(function),
+            "calls": calls,
+            "primitive_calls": primitive_calls,
+            "own_seconds": round(own, 6),
+            "cumulative_seconds": round(cumulative, 6)
+        }
+        for function, (primitive_calls, calls, own, cumulative, _) in ranked[:top_n]
+    ]
+
+    memory: Dict[str, Any] = {"peak_bytes": peak_bytes}
+    if snapshot is not None:
+        allocations = snapshot.statistics("lineno")
+        memory["retained_bytes"] = sum(stat.size for stat in allocations)
+        memory["retained_blocks"] = sum(stat.count for stat in allocations)
+        memory["top_allocations"] = [
+            {
+                "location": f"{os.path.basename(stat.traceback[0].filename)}:{stat.traceback[0].lineno}",
+                "size_bytes": stat.size,
+                "blocks": stat.count
+            }
+            for stat in allocations[:top_n]
+        ]
+
+    return {
+        "id": uuid.uuid4().hex,
+        "task": task,
+        "created_at": datetime.now().isoformat(),
+        "wall_seconds": round(wall_seconds, 6),
+        "function_calls": sum(calls for _, calls, _, _, _ in stats.values()),
+        "top_functions": top_functions,
+        "memory": memory
+    }
+
+
+def write_report(report: Dict[str, Any], profile: Optional[cProfile.Profile], directory: str) -> str:
+    """
+    Write a report, and the raw profile statistics, to ``directory``.
+
+    Args:
+        report: Output of ``build_report``
+        profile: Profiler whose statistics are dumped as ``<id>.prof``
+        directory: Destination directory, created if missing
+
+    Returns:
+        str: Path of the JSON report
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{report['id']}.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    if profile is not None:
+        profile.dump_stats(os.path.join(directory, f"{report['id']}.prof"))
+    return path
+
+
+def run_profiled(func: Callable, top_n: int, directory: Optional[str], *args) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Run ``func(*args)`` under cProfile and tracemalloc.
+
+    Picklable, so it can be submitted to a process pool. If another request
+    is already being profiled in this process, ``func`` runs unprofiled and
+    the report only says so.
+
+    Args:
+        func: Task to profile
+        top_n: Functions and allocation sites listed in the report
+        directory: Directory the report is written to, if any; reports of
+                   failed tasks are written there before the error propagates
+        *args: Positional arguments for ``func``
+
+    Returns:
+        Tuple[Any, Dict]: The task's return value and the profile report
+    """
+    task = getattr(func, "__name__", repr(func))
+    if not _PROFILE_LOCK.acquire(blocking=False):
+        return func(*args), {"task": task, "skipped": "Another request is being profiled"}
+
+    try:
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        profile = cProfile.Profile()
+        error: Optional[BaseException] = None
+        start = time.perf_counter()
+        profile.enable()
+        try:
+            result = func(*args)
+        except BaseException as e:
+            error = e
+        finally:
+            profile.disable()
+            wall_seconds = time.perf_counter() - start
+            _, peak_bytes = tracemalloc.get_traced_memory()
+            snapshot = tracemalloc.take_snapshot()
+            if not tracing:
+                tracemalloc.stop()
+    finally:
+        _PROFILE_LOCK.release()
+
+    report = build_report(profile, snapshot, peak_bytes, wall_seconds, task, top_n)
+    if error is not None:
+        report["error"] = str(error)
+    if directory is not None:
+        report["path"] = write_report(report, profile, directory)
+    logger.info(
+        f"Profiled {task} in {wall_seconds:.3f}s "
+        f"(peak {peak_bytes / 1024 / 1024:.1f} MB), report {report.get('path', report['id'])}"
+    )
+    if error is not None:
+        raise error
+    return result, report
@@ -0,0 +1,138 @@
+"""
+Response Formats
+================
+
+Negotiated encodings for bulk prediction results.
+
+The default "json" format returns one object per row, with texts and
+explanations repeated in every row. The other formats are columnar: the
+feature list and prediction texts appear once, and kepid, prediction and
+probability are arrays, so no per-row dictionaries are built:
+
+- "compact": columnar JSON
+- "msgpack": the same layout as MessagePack (needs msgpack)
+- "arrow": Arrow IPC stream, metadata in the schema (needs pyarrow)
+- "parquet": Parquet file, metadata in the schema (needs pyarrow)
+
+The format is chosen with the ``format`` query parameter or, failing that,
+the Accept header.
+
+Author: Felipe Coutinho
+NASA Space Apps Challenge 2025
+"""
+
+import json
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+RESPONSE_FORMATS = ("json", "compact", "msgpack", "arrow", "parquet")
+
+MEDIA_TYPES = {
+    "json": "application/json",
+    "compact": "application/vnd.exoplanet.columnar+json",
+    "msgpack": "application/x-msgpack",
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet"
+}
+
+# Optional packages each format needs
+FORMAT_DEPENDENCIES = {
+    "msgpack": "msgpack",
+    "arrow": "pyarrow",
+    "parquet": "pyarrow"
+}
+
+# Media types recognised in Accept headers
+ACCEPTED_MEDIA_TYPES = {
+    **{media_type: fmt for fmt, media_type in MEDIA_TYPES.items()},
+    "application/msgpack": "msgpack",
+    "application/vnd.msgpack": "msgpack"
+}
+
+
+def negotiate_format(requested: Optional[str], accept: Optional[str]) -> str:
+    """
+    Pick the response format of a bulk prediction request.
+
+    Args:
+        requested: Value of the ``format`` query parameter, if any
+        accept: Accept header, if any
+
+    Returns:
+        str: One of RESPONSE_FORMATS; "json" when nothing else matches
+
+    Raises:
+        ValueError: If ``requested`` is not a known format
+    """
+    if requested:
+        if requested not in RESPONSE_FORMATS:
+            raise ValueError(f"Unknown response format '{requested}', expected one of {list(RESPONSE_FORMATS)}")
+        return requested
+
+    if not accept:
+        return "json"
+
+    # Highest quality first; listed order breaks ties
+    candidates = []
+    for position, item in enumerate(accept.split(",")):
+        media_type, *parameters = [part.strip() for part in item.split(";")]
+        quality = 1.0
+        for parameter in parameters:
+            if parameter.startswith("q="):
+                try:
+                    quality = float(parameter[2:])
+                except ValueError:
+                    quality = 0.0
+        candidates.append((-quality, position, media_type.lower()))
+
+    for negative_quality, _, media_type in sorted(candidates):
+        if negative_quality < 0 and media_type in ACCEPTED_MEDIA_TYPES:
+            return ACCEPTED_MEDIA_TYPES[media_type]
+    return "json"
+
+
+def _to_list(values: Any) -> List:
+    """Column values as a list, with NaN floats turned into None."""
+    if isinstance(values, np.ndarray):
+        items = values.tolist()
+        if values.dtype.kind == "f":
+            for position in np.flatnonzero(np.isnan(values)):
+                items[position] = None
+        return items
+    return list(values)
+
+
+def encode_columnar(fmt: str, metadata: Dict[str, Any], columns: Dict[str, Any],
+                    errors: Dict[int, str]) -> bytes:
+    """
+    Encode columnar results.
+
+    Args:
+        fmt: "compact", "msgpack", "arrow" or "parquet"
+        metadata: Values emitted once (status, summary, feature list, texts)
+        columns: Column name to array (numpy arrays or lists, one value per row)
+        errors: Error message by row position, for failed rows only
+
+    Returns:
+        bytes: Encoded response body
+    """
+    if fmt in ("arrow", "parquet"):
+        from columnar import write_table
+
+        row_count = len(next(iter(columns.values()))) if columns else 0
+        error_column = [None] * row_count
+        for position, error in errors.items():
+            error_column[position] = error
+        return write_table({**columns, "error": error_column}, fmt, metadata)
+
+    body = dict(metadata)
+    body["columns"] = {name: _to_list(values) for name, values in columns.items()}
+    body["errors"] = {str(position): error for position, error in errors.items()}
+
+    if fmt == "msgpack":
+        import msgpack
+        return msgpack.packb(body)
+    if fmt == "compact":
+        return json.dumps(body, separators=(",", ":"), allow_nan=False).encode("utf-8")
+    raise ValueError(f"Unknown columnar format '{fmt}'")
@@ -6,12 +6,20 @@ Run the Exoplanet Detection API Server
 Starts the FastAPI server for exoplanet classification.
 
 Usage:
-    python run_api.py
+    python run_api.py                 # single process
+    python run_api.py --workers 4     # pre-fork production server
+    python run_api.py --reload        # restart on code changes (development)
+
+A single process loads and warms up the default model in the background
+after it starts listening; see /health for readiness and cold-start timings.
+With ``--workers`` the model is loaded once before the workers are forked
+(see ``prefork``), and every worker is ready as soon as it starts.
 
 Author: Felipe Coutinho
 NASA Space Apps Challenge 2025
 """
 
+import argparse
 import uvicorn
 import sys
 import os
@@ -21,17 +29,56 @@ from pathlib import Path
 backend_dir = Path(__file__).parent
 sys.path.insert(0, str(backend_dir))
 
+def parse_args() -> argparse.Namespace:
+    env = os.environ.get
+    parser = argparse.ArgumentParser(description="Run the Exoplanet Detection API server.")
+    parser.add_argument("--host", default=env("EXOPLANET_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(env("EXOPLANET_PORT", "8000")))
+    parser.add_argument("--reload", action="store_true", help="Restart on code changes (development only)")
+    parser.add_argument("--workers", type=int, default=int(env("EXOPLANET_SERVER_WORKERS", "0")),
+                        help="Pre-forked worker processes; -1 for one per core (default: single process)")
+    parser.add_argument("--max-requests", type=int, default=int(env("EXOPLANET_MAX_REQUESTS", "0")),
+                        help="Recycle a worker after this many requests (0: never)")
+    parser.add_argument("--max-requests-jitter", type=int, default=int(env("EXOPLANET_MAX_REQUESTS_JITTER", "0")),
+                        help="Random extra requests per worker before recycling")
+    parser.add_argument("--graceful-timeout", type=float, default=float(env("EXOPLANET_GRACEFUL_TIMEOUT", "30")),
+                        help="Seconds in-flight requests get when stopping")
+    return parser.parse_args()
+
 if __name__ == "__main__":
+    args = parse_args()
+    workers = (os.cpu_count() or 1) if args.workers < 0 else args.workers
+    if args.reload and workers:
+        sys.exit("--reload cannot be combined with --workers")
+
     print("Starting Exoplanet Detection API Server...")
-    print("Server will be available at: http://localhost:8000")
-    print("API Documentation: http://localhost:8000/docs")
+    print(f"Server will be available at: http://localhost:{args.port}")
+    print(f"API Documentation: http://localhost:{args.port}/docs")
     print("Press Ctrl+C to stop the server")
     print("-" * 50)
-    
-    uvicorn.run(
-        "main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,
-        log_level="info"
-    )
+
+    if workers:
+        import main
+        from prefork import PreforkServer
+
+        PreforkServer(
+            main.app,
+            host=args.host,
+            port=args.port,
+            workers=workers,
+            max_requests=args.max_requests,
+            max_requests_jitter=args.max_requests_jitter,
+            graceful_timeout=args.graceful_timeout,
+            preload=main.prepare_prefork,
+            on_worker_exit=main.release_worker_jobs
+        ).run()
+    else:
+        uvicorn.run(
+            "main:app",
+            host=args.host,
+            port=args.port,
+            reload=args.reload,
+            log_level="info",
+            limit_max_requests=args.max_requests or None,
+            timeout_graceful_shutdown=args.graceful_timeout
+        )
@@ -0,0 +1,493 @@
+#!/usr/bin/env python3
+"""
+Bulk Catalog Scoring
+====================
+
+Scores a CSV or Parquet catalog of any size offline, without the API.
+
+The catalog is split into shards of consecutive rows that are scored in
+parallel by a process pool; each worker loads ExoplanetDetector once and
+reads only its own rows, so memory stays bounded by the shard size. Results
+are written as one Parquet (or CSV) part file per shard. A checkpoint file in
+the output directory records completed shards, so rerunning the same command
+after an interruption only scores the remaining ones.
+
+Usage:
+    python score_catalog.py cumulative.csv scores/
+    python score_catalog.py catalog.parquet scores/ --workers 8 --shard-rows 100000
+
+CSV catalogs may start with '#' comment lines (as Exoplanet Archive exports
+do) but must not contain quoted line breaks. Parquet input and output need
+pyarrow.
+
+With ``--dataset-cache DIR`` a KOI catalog is parsed once into the
+preprocessed dataset cache (see ``dataset_cache``); shards are then row
+ranges of its memory-mapped feature matrix, so no worker parses CSV. Cells
+that are not numbers count as missing values in that mode, and only
+``kepid`` and ``kepoi_name`` are copied to the output.
+
+Author: Felipe Coutinho
+NASA Space Apps Challenge 2025
+"""
+
+import argparse
+import json
+import logging
+import os
+import pickle
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Add the backend directory to Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+logger = logging.getLogger("score_catalog")
+
+CHECKPOINT_FILE = "_checkpoint.json"
+
+# Identifier columns copied to the output when present in the catalog
+ID_COLUMNS = ["kepid", "kepoi_name", "kepler_name"]
+
+# Detector of the current worker process, set by init_worker
+_detector = None
+
+
+def catalog_format(path: Path) -> str:
+    """Input format from the file extension."""
+    return "parquet" if path.suffix.lower() in (".parquet", ".pq") else "csv"
+
+
+def read_csv_header(path: Path) -> List[str]:
+    """Column names of a CSV catalog, skipping leading '#' comment lines."""
+    with open(path, "rb") as f:
+        for line in f:
+            if line.strip() and not line.startswith(b"#"):
+                return [column.strip().strip('"') for column in line.decode("utf-8").rstrip("\r\n").split(",")]
+    raise ValueError(f"{path} has no header line")
+
+
+def plan_csv_shards(path: Path, shard_rows: int) -> List[Dict]:
+    """
+    Split a CSV catalog into shards by scanning it once for line offsets.
+
+    Args:
+        path: CSV catalog
+        shard_rows: Data rows per shard
+
+    Returns:
+        List[Dict]: Shards with their byte offset, first row and row count
+    """
+    shards = []
+    header_seen = False
+    row = 0
+    offset = 0
+    with open(path, "rb") as f:
+        for line in f:
+            if line.strip() and not line.startswith(b"#"):
+                if not header_seen:
+                    header_seen = True
+                else:
+                    if row % shard_rows == 0:
+                        shards.append({"id": len(shards), "offset": offset, "start": row, "rows": 0})
+                    shards[-1]["rows"] += 1
+                    row += 1
+            offset += len(line)
+    return shards
+
+
+def plan_parquet_shards(path: Path, shard_rows: int) -> List[Dict]:
+    """
+    Split a Parquet catalog into shards of whole row groups.
+
+    Row groups are packed together until a shard holds at least
+    ``shard_rows`` rows; a single larger row group forms its own shard.
+
+    Args:
+        path: Parquet catalog
+        shard_rows: Target rows per shard
+
+    Returns:
+        List[Dict]: Shards with their row groups, first row and row count
+    """
+    import pyarrow.parquet as pq
+
+    metadata = pq.ParquetFile(path).metadata
+    shards = []
+    row = 0
+    for group in range(metadata.num_row_groups):
+        group_rows = metadata.row_group(group).num_rows
+        if not shards or shards[-1]["rows"] >= shard_rows:
+            shards.append({"id": len(shards), "row_groups": [], "start": row, "rows": 0})
+        shards[-1]["row_groups"].append(group)
+        shards[-1]["rows"] += group_rows
+        row += group_rows
+    return shards
+
+
+def read_shard(path: Path, shard: Dict, columns: List[str]):
+    """
+    Read the rows of one shard, keeping only ``columns`` that exist.
+
+    Args:
+        path: Catalog file
+        shard: Shard from ``plan_csv_shards`` or ``plan_parquet_shards``
+        columns: Columns needed for scoring and output
+
+    Returns:
+        pd.DataFrame: Rows of the shard
+    """
+    import pandas as pd
+
+    if catalog_format(path) == "parquet":
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(path)
+        available = [column for column in columns if column in parquet_file.schema_arrow.names]
+        return parquet_file.read_row_groups(shard["row_groups"], columns=available).to_pandas()
+
+    header = read_csv_header(path)
+    with open(path, "rb") as f:
+        f.seek(shard["offset"])
+        return pd.read_csv(
+            f,
+            header=None,
+            names=header,
+            usecols=[column for column in columns if column in header],
+            nrows=shard["rows"],
+            comment='#',
+            skip_blank_lines=True
+        )
+
+
+def plan_dataset_shards(rows: int, shard_rows: int) -> List[Dict]:
+    """Split a cached dataset of ``rows`` rows into row ranges."""
+    return [
+        {"id": shard_id, "start": start, "rows": min(shard_rows, rows - start)}
+        for shard_id, start in enumerate(range(0, rows, shard_rows))
+    ]
+
+
+def read_dataset_shard(dataset_dir: str, shard: Dict, features: List[str]):
+    """
+    Slice one shard out of a cached dataset.
+
+    Args:
+        dataset_dir: Cache entry of the catalog
+        shard: Shard from ``plan_dataset_shards``
+        features: Model features, all present in the cache
+
+    Returns:
+        Tuple[np.ndarray, Dict]: Raw feature rows in model order and the
+                                 identifier columns
+    """
+    from dataset_cache import KOIDataset
+
+    dataset = KOIDataset(dataset_dir)
+    rows = slice(shard["start"], shard["start"] + shard["rows"])
+    positions = [dataset.features.index(feature) for feature in features]
+    identifiers = {"kepid": dataset.groups[rows], "kepoi_name": dataset.kepoi_names[rows]}
+    return dataset.raw[rows][:, positions], identifiers
+
+
+def init_worker(model_path: str, scaler_path: str, features_path: str, engine: str,
+                bundle_path: Optional[str] = None) -> None:
+    """Load the detector once per worker process (a bundle is mapped, not copied)."""
+    global _detector
+    from exoplanet_detector_model import ExoplanetDetector
+
+    _detector = ExoplanetDetector(
+        model_path=model_path,
+        scaler_path=scaler_path,
+        features_path=features_path,
+        bundle_path=bundle_path,
+        engine=engine
+    )
+    if not _detector.is_loaded:
+        raise RuntimeError("Model could not be loaded")
+    # One scoring thread per process; parallelism comes from the pool
+    _detector.load_booster_model().set_params(n_jobs=1)
+
+
+def score_shard(path: str, shard: Dict, output_dir: str, output_format: str,
+                dataset_dir: Optional[str] = None) -> Dict:
+    """
+    Score one shard and write its part file.
+
+    Args:
+        path: Catalog file
+        shard: Shard description
+        output_dir: Directory for part files
+        output_format: "parquet" or "csv"
+        dataset_dir: Dataset cache entry to read the shard from instead of
+                     the catalog
+
+    Returns:
+        Dict: Shard id, row counts, timing and worker pid
+    """
+    import numpy as np
+    import pandas as pd
+
+    start = time.perf_counter()
+    if dataset_dir is not None:
+        features, identifiers = read_dataset_shard(dataset_dir, shard, _detector.features)
+    else:
+        features = read_shard(Path(path), shard, ID_COLUMNS + _detector.features)
+        identifiers = {column: features[column].to_numpy() for column in ID_COLUMNS if column in features.columns}
+    batch = _detector.predict_batch(features)
+    if not batch["success"]:
+        raise ValueError(batch["error"])
+
+    result = pd.DataFrame({"row_index": np.arange(shard["start"], shard["start"] + len(features))})
+    for column, values in identifiers.items():
+        result[column] = values
+    result["prediction"] = batch["predictions"]
+    result["probability_exoplanet"] = batch["probabilities"]
+    result["error"] = batch["errors"]
+
+    # Write under a temporary name so a part file is either complete or absent
+    part = Path(output_dir) / f"part-{shard['id']:05d}.{output_format}"
+    temporary = part.with_name(part.name + ".tmp")
+    if output_format == "parquet":
+        result.to_parquet(temporary, index=False)
+    else:
+        result.to_csv(temporary, index=False)
+    os.replace(temporary, part)
+
+    return {
+        "id": shard["id"],
+        "rows": len(features),
+        "failed": int(batch["error_mask"].sum()),
+        "exoplanets": int((batch["predictions"] == 1).sum()),
+        "seconds": time.perf_counter() - start,
+        "pid": os.getpid()
+    }
+
+
+def input_signature(path: Path, shard_rows: int, fingerprint: str) -> Dict:
+    """Identifies a run; checkpoints of a different run are not reused."""
+    stat = path.stat()
+    return {
+        "input": str(path.resolve()),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "shard_rows": shard_rows,
+        "model_fingerprint": fingerprint
+    }
+
+
+def load_checkpoint(output_dir: Path, signature: Dict) -> Dict[int, Dict]:
+    """Completed shards of a previous run with the same signature."""
+    checkpoint_path = output_dir / CHECKPOINT_FILE
+    if not checkpoint_path.exists():
+        return {}
+
+    checkpoint = json.loads(checkpoint_path.read_text())
+    if checkpoint.get("signature") != signature:
+        logger.warning("Checkpoint belongs to a different input, model or shard size; starting over")
+        return {}
+    return {int(shard_id): stats for shard_id, stats in checkpoint["completed"].items()}
+
+
+def save_checkpoint(output_dir: Path, signature: Dict, completed: Dict[int, Dict]) -> None:
+    """Atomically write the completed shards."""
+    checkpoint_path = output_dir / CHECKPOINT_FILE
+    temporary = checkpoint_path.with_name(CHECKPOINT_FILE + ".tmp")
+    temporary.write_text(json.dumps({
+        "signature": signature,
+        "completed": {str(shard_id): stats for shard_id, stats in sorted(completed.items())}
+    }, indent=2))
+    os.replace(temporary, checkpoint_path)
+
+
+def score_catalog(input_path: str, output_dir: str, workers: Optional[int] = None,
+                  shard_rows: int = 50_000, output_format: str = "parquet",
+                  model_path: str = "exoplanet_detector_model.pkl",
+                  scaler_path: str = "exoplanet_scaler.pkl",
+                  features_path: str = "exoplanet_features.pkl",
+                  engine: str = "xgboost",
+                  bundle_path: Optional[str] = None,
+                  dataset_cache: Optional[str] = None) -> Dict:
+    """
+    Score a catalog into part files, resuming from a previous checkpoint.
+
+    Args:
+        input_path: CSV or Parquet catalog
+        output_dir: Directory for part files and the checkpoint
+        workers: Worker processes (default: one per CPU)
+        shard_rows: Rows per shard
+        output_format: "parquet" or "csv"
+        model_path: Path to the trained model file
+        scaler_path: Path to the scaler file
+        features_path: Path to the features list file
+        engine: Inference engine used by the workers
+        bundle_path: Single-file model bundle, used instead of the three
+                     pickle files; every worker maps the same copy
+        dataset_cache: Score a KOI CSV catalog from this preprocessed dataset
+                       cache instead of parsing it in every worker
+
+    Returns:
+        Dict: Row counts and throughput, overall and per worker
+    """
+    from input_validation import MEDIANS_FILENAME
+    from prediction_cache import fingerprint_files
+
+    if shard_rows < 1:
+        raise ValueError("shard_rows must be >= 1")
+
+    path = Path(input_path)
+    output = Path(output_dir)
+    output.mkdir(parents=True, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+
+    if bundle_path is not None:
+        from model_bundle import MappedBundle
+
+        bundle = MappedBundle(bundle_path)
+        features = bundle.features
+        fingerprint = bundle.fingerprint(extra=engine)
+    else:
+        with open(features_path, "rb") as f:
+            features = pickle.load(f)
+        artifacts = [model_path, scaler_path, features_path]
+        # Workers impute with the medians stored next to the model, if any
+        medians_path = Path(model_path).with_name(MEDIANS_FILENAME)
+        if medians_path.exists():
+            artifacts.append(str(medians_path))
+        fingerprint = fingerprint_files(artifacts, extra=engine)
+
+    dataset_dir = None
+    planning_start = time.perf_counter()
+    if dataset_cache is not None:
+        from dataset_cache import load_dataset
+
+        if catalog_format(path) == "parquet":
+            raise ValueError("The dataset cache only reads CSV catalogs")
+        dataset = load_dataset(str(path), dataset_cache)
+        dataset_dir = dataset.directory
+        columns = dataset.features
+    elif catalog_format(path) == "parquet":
+        import pyarrow.parquet as pq
+        columns = pq.ParquetFile(path).schema_arrow.names
+    else:
+        columns = read_csv_header(path)
+    missing_columns = [feature for feature in features if feature not in columns]
+    if missing_columns:
+        raise ValueError(f"Missing required columns: {missing_columns}")
+
+    signature = input_signature(path, shard_rows, fingerprint)
+    if dataset_dir is not None:
+        signature["dataset"] = os.path.basename(dataset_dir)
+    completed = load_checkpoint(output, signature)
+
+    if dataset_dir is not None:
+        shards = plan_dataset_shards(dataset.rows, shard_rows)
+    elif catalog_format(path) == "parquet":
+        shards = plan_parquet_shards(path, shard_rows)
+    else:
+        shards = plan_csv_shards(path, shard_rows)
+    pending = [
+        shard for shard in shards
+        if shard["id"] not in completed
+        or not (output / f"part-{shard['id']:05d}.{output_format}").exists()
+    ]
+    logger.info(
+        f"{len(shards)} shards planned in {time.perf_counter() - planning_start:.2f}s; "
+        f"{len(shards) - len(pending)} already completed, {len(pending)} to score "
+        f"with {workers} workers"
+    )
+
+    start = time.perf_counter()
+    run_stats = []
+    if pending:
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(pending)),
+            initializer=init_worker,
+            initargs=(model_path, scaler_path, features_path, engine, bundle_path)
+        ) as pool:
+            futures = [
+                pool.submit(score_shard, str(path), shard, str(output), output_format, dataset_dir)
+                for shard in pending
+            ]
+            for future in as_completed(futures):
+                stats = future.result()
+                run_stats.append(stats)
+                completed[stats["id"]] = {key: stats[key] for key in ("rows", "failed", "exoplanets", "seconds")}
+                save_checkpoint(output, signature, completed)
+                logger.info(
+                    f"Shard {stats['id'] + 1}/{len(shards)}: {stats['rows']} rows in "
+                    f"{stats['seconds']:.2f}s ({len(completed)}/{len(shards)} done)"
+                )
+    elapsed = time.perf_counter() - start
+
+    # Throughput of this run; each worker is measured over its own busy time
+    per_worker: Dict[int, Dict] = {}
+    for stats in run_stats:
+        worker = per_worker.setdefault(stats["pid"], {"shards": 0, "rows": 0, "seconds": 0.0})
+        worker["shards"] += 1
+        worker["rows"] += stats["rows"]
+        worker["seconds"] += stats["seconds"]
+    for worker in per_worker.values():
+        worker["rows_per_second"] = worker["rows"] / worker["seconds"] if worker["seconds"] else None
+
+    scored_rows = sum(stats["rows"] for stats in run_stats)
+    return {
+        "shards": len(shards),
+        "shards_scored": len(run_stats),
+        "shards_skipped": len(shards) - len(run_stats),
+        "total_rows": sum(stats["rows"] for stats in completed.values()),
+        "failed_rows": sum(stats["failed"] for stats in completed.values()),
+        "exoplanets_detected": sum(stats["exoplanets"] for stats in completed.values()),
+        "rows_scored": scored_rows,
+        "seconds": elapsed,
+        "rows_per_second": scored_rows / elapsed if scored_rows and elapsed else None,
+        "workers": {str(pid): worker for pid, worker in per_worker.items()}
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Score a Kepler catalog offline with the exoplanet detector.")
+    parser.add_argument("input", help="CSV or Parquet catalog")
+    parser.add_argument("output_dir", help="Directory for part files and the checkpoint")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--shard-rows", type=int, default=50_000, help="Rows per shard (default: 50000)")
+    parser.add_argument("--output-format", choices=["parquet", "csv"], default="parquet")
+    parser.add_argument("--engine", choices=["xgboost", "compiled"], default="xgboost")
+    parser.add_argument("--model-path", default=str(backend_dir / "exoplanet_detector_model.pkl"))
+    parser.add_argument("--scaler-path", default=str(backend_dir / "exoplanet_scaler.pkl"))
+    parser.add_argument("--features-path", default=str(backend_dir / "exoplanet_features.pkl"))
+    parser.add_argument("--bundle", help="Single-file model bundle to use instead of the pickles")
+    parser.add_argument("--dataset-cache", help="Read a KOI CSV catalog through this preprocessed dataset cache")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+
+    summary = score_catalog(
+        args.input,
+        args.output_dir,
+        workers=args.workers,
+        shard_rows=args.shard_rows,
+        output_format=args.output_format,
+        model_path=args.model_path,
+        scaler_path=args.scaler_path,
+        features_path=args.features_path,
+        engine=args.engine,
+        bundle_path=args.bundle,
+        dataset_cache=args.dataset_cache
+    )
+
+    print("-" * 50)
+    print(f"Rows scored:        {summary['total_rows']} ({summary['failed_rows']} failed)")
+    print(f"Exoplanets found:   {summary['exoplanets_detected']}")
+    print(f"Shards:             {summary['shards_scored']} scored, {summary['shards_skipped']} skipped")
+    if summary["rows_per_second"]:
+        print(f"Overall throughput: {summary['rows_per_second']:.0f} rows/s in {summary['seconds']:.2f}s")
+    for pid, worker in summary["workers"].items():
+        print(f"  worker {pid}: {worker['rows']} rows, {worker['rows_per_second']:.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Startup State
+=============
+
+Cold-start tracking for the exoplanet detection API process.
+
+Records how long the API module took to import, how long the default model
+took to load and warm up, and the time from process start to the first
+completed prediction. It also decides when the process is ready to receive
+traffic, which is reported separately from liveness.
+
+Author: Felipe Coutinho
+NASA Space Apps Challenge 2025
+"""
+
+import logging
+import time
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class StartupState:
+    """
+    Cold-start timings and readiness of the API process.
+
+    Without warm-up the process is ready as soon as it is live, and models
+    are loaded by the first request that needs them. With warm-up it becomes
+    ready once the default model has been loaded and has scored a synthetic
+    batch.
+    """
+
+    def __init__(self, started_at: float, warmup: bool = True):
+        """
+        Initialize the startup state.
+
+        Args:
+            started_at: ``time.perf_counter()`` value when startup began
+            warmup: Whether readiness waits for the warm-up
+        """
+        self.started_at = started_at
+        self.warmup = warmup
+
+        self.import_seconds: Optional[float] = None
+        self.model_load_seconds: Optional[float] = None
+        self.warmup_seconds: Optional[float] = None
+        self.time_to_first_prediction_seconds: Optional[float] = None
+        self.error: Optional[str] = None
+        self._warmed_up = False
+
+    @property
+    def ready(self) -> bool:
+        """Whether the process should receive traffic."""
+        return self.error is None and (self._warmed_up or not self.warmup)
+
+    def mark_imported(self) -> None:
+        """Record that the API module finished importing."""
+        self.import_seconds = time.perf_counter() - self.started_at
+        logger.info(f"API module imported in {self.import_seconds:.3f}s")
+
+    def mark_first_prediction(self) -> None:
+        """Record the first completed prediction; later calls are ignored."""
+        if self.time_to_first_prediction_seconds is None:
+            self.time_to_first_prediction_seconds = time.perf_counter() - self.started_at
+            logger.info(f"First prediction completed {self.time_to_first_prediction_seconds:.3f}s after startup")
+
+    def run_warmup(self, load_model: Callable[[], Any]) -> None:
+        """
+        Load the default model and score a synthetic batch with it.
+
+        Args:
+            load_model: Callable returning the loaded default detector
+        """
+        try:
+            start = time.perf_counter()
+            model = load_model()
+            self.model_load_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            model.warm_up()
+            self.warmup_seconds = time.perf_counter() - start
+        except Exception as e:
+            self.error = str(e)
+            logger.error(f"Warm-up failed: {e}")
+            return
+
+        self._warmed_up = True
+        self.mark_first_prediction()
+        logger.info(
+            f"Default model loaded in {self.model_load_seconds:.3f}s "
+            f"and warmed up in {self.warmup_seconds:.3f}s"
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return the startup timings.
+
+        Returns:
+            Dict: Warm-up setting, timings in seconds and any warm-up error
+        """
+        return {
+            "warmup": self.warmup,
+            "import_seconds": self.import_seconds,
+            "model_load_seconds": self.model_load_seconds,
+            "warmup_seconds": self.warmup_seconds,
+            "time_to_first_prediction_seconds": self.time_to_first_prediction_seconds,
+            "error": self.error
+        }
@@ -0,0 +1,135 @@
+"""
+Tests for the asynchronous batch job API
+========================================
+
+Run from the backend directory with:
+    python -m pytest -q
+"""
+
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from batch_jobs import BatchJobManager
+
+BACKEND_DIR = Path(__file__).parent
+SAMPLE_CSV = BACKEND_DIR / "output_15_linhas.csv"
+
+
+def create_manager(directory, chunk_rows: int = 4, **overrides) -> BatchJobManager:
+    options = {
+        "get_model": main.get_model,
+        "required_columns": main.required_features,
+        "read_batches": main.iter_csv_batches,
+        "format_results": main.csv_batch_results,
+        "chunk_rows": chunk_rows
+    }
+    options.update(overrides)
+    return BatchJobManager(str(directory), **options)
+
+
+def wait_for(manager: BatchJobManager, job_id: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = manager.get_job(job_id)
+        if job["status"] in ("completed", "failed"):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    manager = create_manager(tmp_path)
+    monkeypatch.setattr(main, "job_manager", manager)
+    yield TestClient(main.app)
+    manager.shutdown()
+
+
+def test_job_results_match_predict_csv(client):
+    expected = client.post("/predict-csv", files={"file": ("sample.csv", SAMPLE_CSV.read_bytes())}).json()
+
+    response = client.post("/jobs", files={"file": ("sample.csv", SAMPLE_CSV.read_bytes())})
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+    assert response.json()["deduplicated"] is False
+
+    job = wait_for(main.job_manager, job_id)
+    assert job["status"] == "completed"
+    status = client.get(f"/jobs/{job_id}").json()
+    assert status["summary"] == expected["summary"]
+    assert status["progress"]["chunks"] == 4
+
+    first = client.get(f"/jobs/{job_id}/results", params={"limit": 10}).json()
+    second = client.get(f"/jobs/{job_id}/results", params={"offset": first["next_offset"]}).json()
+    assert second["next_offset"] is None
+    assert first["results"] + second["results"] == expected["results"]
+
+
+def test_resubmitted_catalog_is_deduplicated(client):
+    job_id = client.post("/jobs", files={"file": ("sample.csv", SAMPLE_CSV.read_bytes())}).json()["job_id"]
+    wait_for(main.job_manager, job_id)
+
+    again = client.post("/jobs", files={"file": ("renamed.csv", SAMPLE_CSV.read_bytes())}).json()
+    assert again["deduplicated"] is True
+    assert again["job_id"] == job_id
+    assert again["status"] == "completed"
+    assert main.job_manager.get_stats()["jobs"]["completed"] == 1
+
+
+def test_job_rejects_missing_columns(client):
+    response = client.post("/jobs", files={"file": ("bad.csv", b"kepid,koi_score\n1,0.5\n")})
+    assert response.status_code == 400
+    assert "Missing required columns" in response.json()["detail"]
+    assert client.get("/jobs/unknown").status_code == 404
+
+
+def test_interrupted_job_resumes_after_last_chunk(tmp_path):
+    first_chunk = threading.Event()
+
+    def stop_after_first_chunk(model, df, batch):
+        interrupted._stopping.set()
+        first_chunk.set()
+        return main.csv_batch_results(model, df, batch)
+
+    interrupted = create_manager(tmp_path, format_results=stop_after_first_chunk)
+    with SAMPLE_CSV.open("rb") as f:
+        job, _ = interrupted.submit(f, "sample.csv", main.resolve_mission(None))
+    assert first_chunk.wait(30)
+    # Waits for the first chunk to be committed
+    interrupted.shutdown()
+
+    resumed = create_manager(tmp_path)
+    partial = resumed.get_job(job["job_id"])
+    assert partial["status"] == "running" and partial["total"] == 4
+    assert resumed.resume() == 1
+
+    finished = wait_for(resumed, job["job_id"])
+    assert finished["status"] == "completed"
+    assert finished["total"] == 15 and finished["chunks"] == 4
+    results = resumed.get_results(job["job_id"])
+    assert [result["row_index"] for result in results] == list(range(15))
+    resumed.shutdown()
+
+
+def test_jobs_claimed_by_another_process_are_skipped(tmp_path):
+    manager = create_manager(tmp_path)
+    store = manager.store
+    store.create_job({"job_id": "job", "dedup_key": "key", "content_hash": "hash",
+                      "mission": "kepler", "upload_bytes": 0})
+
+    # A sibling worker of the same server holds the job
+    sibling = manager.owner(pid=1)
+    assert store.claim("job", sibling)
+    assert not store.claim("job", manager.owner())
+    assert manager.resume(release=False) == 1
+    manager.shutdown()
+    assert create_manager(tmp_path).store.get_job("job")["owner"] == sibling
+
+    # Releasing the exited worker's claims lets the next worker take over
+    assert manager.release_claims(sibling) == 1
+    assert create_manager(tmp_path).store.claim("job", "replacement")
@@ -0,0 +1,73 @@
+"""
+Tests for the benchmark suite
+=============================
+
+Run from the backend directory with:
+    python -m pytest -q
+"""
+
+import os
+import pickle
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from benchmark import compare_to_baseline, peak_rss_mb, reset_peak_rss, run_in_process, synthetic_catalog
+
+BACKEND_DIR = Path(__file__).parent
+with open(BACKEND_DIR / "exoplanet_features.pkl", "rb") as f:
+    FEATURES = pickle.load(f)
+
+
+def test_synthetic_catalog_is_reproducible():
+    table = synthetic_catalog(500, FEATURES, seed=3)
+    assert table.equals(synthetic_catalog(500, FEATURES, seed=3))
+    assert not table.equals(synthetic_catalog(500, FEATURES, seed=4))
+
+    assert list(table.columns) == ["kepid", "kepoi_name"] + FEATURES
+    assert table["kepid"].is_unique
+    assert set(table["koi_fpflag_nt"].dropna().unique()) <= {0, 1}
+    assert table["koi_score"].dropna().between(0, 1).all()
+
+
+def test_in_process_cases_report_percentiles(make_detector):
+    detector = make_detector()
+    results = run_in_process(detector, synthetic_catalog(20, FEATURES), ["predict", "predict_batch"])
+
+    assert results["predict"]["calls"] == 20
+    assert results["predict_batch"]["rows"] == 20 * results["predict_batch"]["calls"]
+    for summary in results.values():
+        assert 0 < summary["p50_ms"] <= summary["p99_ms"]
+        assert summary["throughput_rows_per_s"] > 0
+
+
+@pytest.mark.skipif(not os.access("/proc/self/clear_refs", os.W_OK),
+                    reason="peak RSS cannot be reset on this platform")
+def test_peak_rss_is_measured_per_case(make_detector):
+    detector = make_detector()
+    # An earlier allocation must not show up in the next case's peak
+    reset_peak_rss()
+    block = np.ones(50_000_000)
+    earlier_peak = peak_rss_mb()
+    del block
+
+    summary = run_in_process(detector, synthetic_catalog(20, FEATURES), ["predict_batch"])["predict_batch"]
+    assert summary["rss_before_mb"] <= summary["peak_rss_mb"] < earlier_peak - 300
+
+
+def test_regressions_are_flagged_beyond_tolerance():
+    baseline = {"cases": {
+        "predict_batch/100": {"throughput_rows_per_s": 1000.0, "p50_ms": 10.0, "peak_rss_mb": 200.0},
+        "http_predict_csv/1000000": {"skipped": "more than 100000 rows"},
+    }}
+    results = {"cases": {
+        "predict_batch/100": {"throughput_rows_per_s": 700.0, "p50_ms": 11.0, "peak_rss_mb": 200.0},
+        "http_predict_csv/1000000": {"skipped": "more than 100000 rows"},
+        "predict/100": {"throughput_rows_per_s": 1.0, "p50_ms": 1.0, "peak_rss_mb": 1.0},
+    }}
+
+    regressions = compare_to_baseline(results, baseline, tolerance=0.25)
+    assert [(r["case"], r["metric"]) for r in regressions] == [("predict_batch/100", "throughput_rows_per_s")]
+    assert np.isclose(regressions[0]["change"], -0.3)
+    assert compare_to_baseline(results, baseline, tolerance=0.5) == []
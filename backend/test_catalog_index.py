@@ -0,0 +1,67 @@
+"""
+Tests for the catalog score index
+=================================
+
+Run from the backend directory with:
+    python -m pytest -q
+"""
+
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import main
+from catalog_index import CatalogIndexManager, build_index, read_catalog
+
+BACKEND_DIR = Path(__file__).parent
+CATALOG = BACKEND_DIR / "cumulative_2025.10.04_14.14.53.csv"
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    path = tmp_path / "catalog.csv"
+    read_catalog(CATALOG).head(300).to_csv(path, index=False)
+    return path
+
+
+def test_lookup_and_top_match_scored_rows(catalog):
+    model = main.get_model()
+    index = build_index(str(catalog), model, main.csv_batch_results)
+    probabilities = model.predict_batch(pd.read_csv(catalog))["probabilities"]
+    np.testing.assert_array_equal(index.probabilities, probabilities)
+
+    star = json.loads(index.encode(index.lookup("10797460")))["results"]
+    assert [result["kepoi_name"] for result in star] == ["K00752.01", "K00752.02"]
+    assert index.lookup("k00752.02") == [1]
+    assert index.lookup("K99999.01") == []
+
+    positions, total = index.top(k=5, min_probability=0.2, max_probability=0.9, offset=2)
+    in_range = np.flatnonzero((probabilities >= 0.2) & (probabilities <= 0.9))
+    expected = in_range[np.argsort(-probabilities[in_range], kind="stable")]
+    assert total == len(expected)
+    assert positions == expected[2:7].tolist()
+
+
+def test_rebuild_only_scores_changed_rows(catalog):
+    manager = CatalogIndexManager(str(catalog), main.get_model, main.csv_batch_results, check_interval=0)
+    first = manager.get()
+    assert not manager.refresh()
+
+    df = pd.read_csv(catalog)
+    df.loc[3, 'koi_period'] *= 2
+    added = df.iloc[[0]].assign(kepoi_name="K99999.01")
+    pd.concat([df, added]).to_csv(catalog, index=False)
+    os.utime(catalog, ns=(first.source_stat[0] + 10**9,) * 2)
+
+    assert manager.refresh()
+    index = manager.current()
+    assert index.build_stats["scored_rows_in_build"] == 2
+    assert index.build_stats["reused_rows"] == 300 - 1
+    assert index.lookup("K99999.01") == [300]
+    full = build_index(str(catalog), main.get_model(), main.csv_batch_results)
+    np.testing.assert_array_equal(index.probabilities, full.probabilities)
+    assert index.records == full.records
@@ -0,0 +1,107 @@
+"""
+Parity tests for CompiledTreeEnsemble
+=====================================
+
+The compiled engine must take the same branches as the stock
+StandardScaler + XGBoost pipeline it was built from.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from compiled_model import CompiledTreeEnsemble
+
+BACKEND_DIR = Path(__file__).parent
+
+
+@pytest.fixture(scope="module")
+def detector(make_detector):
+    return make_detector(engine="xgboost")
+
+
+@pytest.fixture(scope="module")
+def compiled(detector):
+    return CompiledTreeEnsemble.from_model(detector.model, detector.scaler, detector.features)
+
+
+@pytest.fixture(scope="module")
+def catalog_features(detector):
+    catalog = pd.read_csv(BACKEND_DIR / "cumulative_2025.10.04_14.14.53.csv", comment="#")
+    return catalog[detector.features].apply(pd.to_numeric, errors="coerce")
+
+
+def stock_proba(detector, X):
+    frame = pd.DataFrame(X, columns=detector.features)
+    return detector.model.predict_proba(detector.scaler.transform(frame))[:, 1]
+
+
+def test_parity_on_cumulative_catalog(detector, compiled, catalog_features):
+    expected = stock_proba(detector, catalog_features)
+    actual = compiled.predict_proba(catalog_features.to_numpy())
+
+    np.testing.assert_allclose(actual, expected, atol=1e-5)
+
+
+def test_parity_with_missing_values_and_threshold_ties(detector, compiled, catalog_features):
+    rng = np.random.default_rng(42)
+    X = catalog_features.sample(2000, random_state=0).to_numpy().copy()
+    X[rng.random(X.shape) < 0.2] = np.nan
+
+    # Put values exactly on the folded split boundaries
+    tie_rows = rng.integers(0, len(X), 500)
+    tie_slots = rng.choice(np.flatnonzero(np.isfinite(compiled.threshold)), 500)
+    tie_columns = compiled.feature[tie_slots] % compiled.n_features
+    X[tie_rows, tie_columns] = compiled.threshold[tie_slots]
+
+    np.testing.assert_allclose(
+        compiled.predict_proba(X), stock_proba(detector, X), atol=1e-5
+    )
+
+
+def test_chunking_does_not_change_results(compiled, catalog_features):
+    X = catalog_features.to_numpy()[:1000]
+    np.testing.assert_array_equal(
+        compiled.predict_margin(X, chunk_size=7), compiled.predict_margin(X)
+    )
+
+
+def test_detector_engine_switch(make_detector, detector, catalog_features):
+    compiled_detector = make_detector(engine="compiled")
+    assert compiled_detector.get_model_info()["engine"] == "compiled"
+
+    sample = catalog_features.head(200)
+    stock = detector.predict_batch(sample)
+    fast = compiled_detector.predict_batch(sample)
+    np.testing.assert_array_equal(fast["predictions"], stock["predictions"])
+    np.testing.assert_allclose(fast["probabilities"], stock["probabilities"], atol=1e-5)
+
+    record = sample.iloc[0].to_dict()
+    assert compiled_detector.predict(record)["prediction"] == detector.predict(record)["prediction"]
+
+
+def test_large_batches_run_on_the_booster(make_detector, detector, catalog_features, monkeypatch):
+    sample = catalog_features.head(200)
+    stock = detector.predict_batch(sample)["probabilities"]
+    routed = make_detector(engine="compiled", compiled_max_rows=100)
+
+    def compiled_predict_proba(X):
+        raise RuntimeError(f"compiled engine called with {len(X)} rows")
+
+    # Batches over compiled_max_rows never reach the compiled engine
+    monkeypatch.setattr(routed.compiled_model, "predict_proba", compiled_predict_proba)
+    batch = routed.predict_batch(sample)
+    assert batch["success"] and not batch["error_mask"].any()
+    np.testing.assert_allclose(batch["probabilities"], stock, atol=1e-5)
+    small = routed.predict_batch(sample.head(100))
+    assert not small["success"] and "compiled engine called with 100 rows" in small["error"]
+
+    compiled_only = make_detector(engine="compiled", compiled_max_rows=None).predict_batch(sample)["probabilities"]
+    np.testing.assert_allclose(compiled_only, stock, atol=1e-5)
+
+
+def test_unknown_engine_is_rejected(make_detector):
+    with pytest.raises(ValueError):
+        make_detector(engine="onnx")
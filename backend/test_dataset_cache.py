@@ -0,0 +1,53 @@
+"""
+Tests for the preprocessed dataset cache
+========================================
+
+Run from the backend directory with:
+    python -m pytest -q
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dataset_cache import load_dataset, preprocess_catalog
+from score_catalog import score_catalog
+
+
+
+def test_cached_dataset_matches_preprocessing_and_reloads(catalog_sample, tmp_path):
+    dataset = load_dataset(str(catalog_sample), str(tmp_path))
+    expected = preprocess_catalog(str(catalog_sample))
+    assert dataset.features == expected["features"]
+    np.testing.assert_array_equal(dataset.X, expected["X"])
+    np.testing.assert_array_equal(dataset.y, expected["y"])
+
+    reloaded = load_dataset(str(catalog_sample), str(tmp_path))
+    assert reloaded.directory == dataset.directory
+    assert isinstance(reloaded.X, np.memmap)
+    assert not reloaded.X.flags.writeable
+
+
+def test_edited_catalog_gets_a_new_entry(catalog_sample, tmp_path):
+    original = load_dataset(str(catalog_sample), str(tmp_path))
+    edited = tmp_path / "edited.csv"
+    edited.write_text(catalog_sample.read_text().rsplit("\n", 2)[0] + "\n")
+
+    dataset = load_dataset(str(edited), str(tmp_path))
+    assert dataset.directory != original.directory
+    assert dataset.rows == original.rows - 1
+
+
+def test_score_catalog_from_cache_matches_csv(catalog_sample, model_files, tmp_path):
+    from_csv = tmp_path / "csv"
+    from_cache = tmp_path / "cache"
+    score_catalog(str(catalog_sample), str(from_csv), workers=1, shard_rows=64, **model_files)
+    summary = score_catalog(str(catalog_sample), str(from_cache), workers=1, shard_rows=64,
+                            dataset_cache=str(tmp_path / "dataset"), **model_files)
+    assert summary["total_rows"] == 200
+
+    expected = pd.concat([pd.read_parquet(part) for part in sorted(from_csv.glob("part-*.parquet"))])
+    scores = pd.concat([pd.read_parquet(part) for part in sorted(from_cache.glob("part-*.parquet"))])
+    assert scores["kepoi_name"].tolist() == expected["kepoi_name"].tolist()
+    assert scores["kepid"].tolist() == expected["kepid"].tolist()
+    np.testing.assert_allclose(scores["probability_exoplanet"], expected["probability_exoplanet"], rtol=1e-6)
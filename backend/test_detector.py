@@ -0,0 +1,130 @@
+"""
+Tests for ExoplanetDetector
+===========================
+
+Run from the backend directory with:
+    python -m pytest -q
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from prediction_cache import PredictionCache
+
+BACKEND_DIR = Path(__file__).parent
+
+
+@pytest.fixture(scope="module")
+def detector(make_detector):
+    return make_detector()
+
+
+@pytest.fixture(scope="module")
+def sample_df():
+    return pd.read_csv(BACKEND_DIR / "output_15_linhas.csv")
+
+
+def test_predict_batch_matches_single_predictions(detector, sample_df):
+    batch = detector.predict_batch(sample_df)
+    assert batch["success"]
+    assert not batch["error_mask"].any()
+
+    for position, record in enumerate(sample_df[detector.features].to_dict("records")):
+        single = detector.predict(record)
+        assert batch["predictions"][position] == single["prediction"]
+        assert batch["probabilities"][position] == pytest.approx(
+            single["probability_exoplanet"], abs=1e-6
+        )
+
+
+def test_predict_batch_accepts_arrays_and_records(detector, sample_df):
+    from_frame = detector.predict_batch(sample_df)
+    from_array = detector.predict_batch(sample_df[detector.features].to_numpy())
+    from_records = detector.predict_batch(sample_df.to_dict("records"))
+
+    np.testing.assert_allclose(from_array["probabilities"], from_frame["probabilities"])
+    np.testing.assert_allclose(from_records["probabilities"], from_frame["probabilities"])
+
+
+def test_predict_batch_flags_bad_rows(detector, sample_df):
+    records = sample_df[detector.features].head(3).to_dict("records")
+    del records[1]["koi_period"]
+    records[2]["koi_depth"] = "not a number"
+
+    batch = detector.predict_batch(records)
+    assert batch["success"]
+    assert batch["error_mask"].tolist() == [False, True, True]
+    assert "koi_period" in batch["errors"][1]
+    assert "koi_depth" in batch["errors"][2]
+    assert batch["predictions"][1] == -1
+    assert np.isnan(batch["probabilities"][2])
+
+
+def test_predict_batch_rejects_missing_columns(detector, sample_df):
+    batch = detector.predict_batch(sample_df.drop(columns=["koi_score"]))
+    assert not batch["success"]
+    assert "koi_score" in batch["error"]
+
+
+def test_cache_scores_only_misses(make_detector, sample_df):
+    cache = PredictionCache(max_entries=10)
+    cached_detector = make_detector(cache=cache)
+
+    first = cached_detector.predict_batch(sample_df.head(8))
+    assert (cache.misses, cache.hits) == (8, 0)
+
+    again = cached_detector.predict_batch(sample_df.head(12))
+    assert (cache.misses, cache.hits) == (12, 8)
+    assert cache.evictions == 2
+    np.testing.assert_array_equal(again["probabilities"][:8], first["probabilities"])
+
+    single = cached_detector.predict(sample_df[cached_detector.features].iloc[11].to_dict())
+    assert cache.hits == 9
+    assert single["probability_exoplanet"] == again["probabilities"][11]
+
+    cache.bind("another-model")
+    assert len(cache) == 0
+    assert cache.invalidations == 1
+
+
+def test_cache_entries_expire():
+    cache = PredictionCache(max_entries=10, ttl_seconds=-1)
+    keys = cache.make_keys(np.zeros((1, 3)))
+    cache.put_many(keys, [0.5])
+    assert cache.get_many(keys) == [None]
+    assert cache.expirations == 1
+
+
+def test_validator_masks_and_imputes_columns():
+    from input_validation import InputValidator
+
+    features = ["koi_period", "koi_score", "koi_fpflag_nt", "koi_kepmag"]
+    validator = InputValidator(features, medians=np.array([10.0, 0.5, 0.0, np.nan]))
+    frame = pd.DataFrame({
+        "koi_period": [1.0, -2.0, None, 3.0],
+        "koi_score": [0.2, 0.3, 0.4, "high"],
+        "koi_fpflag_nt": [0, 465, 1, 0],
+        "koi_kepmag": [12.0, 13.0, None, np.inf],
+    })
+
+    result = validator.validate(frame)
+    assert result["error_mask"].tolist() == [False, True, False, True]
+    assert "koi_period" in result["errors"][1] and "koi_fpflag_nt" in result["errors"][1]
+    assert result["errors"][3].startswith("Non-numeric values in: ['koi_score']")
+    assert "Out of range values in: ['koi_kepmag']" in result["errors"][3]
+    assert result["imputed_mask"].tolist() == [False, False, True, False]
+    assert result["X"][2, 0] == 10.0 and np.isnan(result["X"][2, 3])
+    assert result["masks"]["missing"][2].tolist() == [True, False, False, True]
+
+
+def test_predict_rejects_out_of_range_values(detector, sample_df):
+    record = sample_df[detector.features].iloc[0].to_dict()
+    record["koi_fpflag_ss"] = 2
+    result = detector.predict(record)
+    assert not result["success"]
+    assert "koi_fpflag_ss" in result["error"]
+    with pytest.raises(ValueError):
+        detector.preprocess_data(record)
@@ -0,0 +1,66 @@
+"""
+Tests for the model evaluation module
+=====================================
+
+Run from the backend directory with:
+    python -m pytest -q
+"""
+
+import numpy as np
+import pytest
+from sklearn.metrics import average_precision_score, precision_recall_curve, roc_auc_score
+
+from evaluation import (
+    choose_thresholds, disposition_labels, threshold_curve, threshold_metrics, write_threshold_bundle
+)
+from exoplanet_detector_model import ExoplanetDetector
+
+
+@pytest.fixture
+def scores():
+    rng = np.random.default_rng(0)
+    y_true = rng.integers(0, 2, 4000)
+    # Rounded so that many rows share a score
+    return y_true, np.round(np.clip(0.35 * y_true + 0.65 * rng.random(4000), 0, 1), 2)
+
+
+def test_curve_matches_sklearn(scores, monkeypatch):
+    # requirements_api.txt pins NumPy 1.x, which has no np.trapezoid
+    monkeypatch.delattr(np, "trapezoid", raising=False)
+    y_true, probabilities = scores
+    curve = threshold_curve(y_true, probabilities)
+
+    assert curve["roc_auc"] == pytest.approx(roc_auc_score(y_true, probabilities))
+    assert curve["average_precision"] == pytest.approx(average_precision_score(y_true, probabilities))
+    for index in (0, len(curve["scores"]) // 2, len(curve["scores"]) - 1):
+        metrics = threshold_metrics(y_true, probabilities, float(np.nextafter(curve["scores"][index], -1)))
+        assert metrics["precision"] == pytest.approx(curve["precision"][index])
+        assert metrics["recall"] == pytest.approx(curve["recall"][index])
+
+
+def test_min_precision_threshold_follows_notebook_rule(scores):
+    y_true, probabilities = scores
+    choice = choose_thresholds(threshold_curve(y_true, probabilities), min_precision=0.75)["min_precision"]
+
+    # Notebook: highest recall among precision_recall_curve cuts (>=) with precision >= 0.75
+    precision, recall, thresholds = precision_recall_curve(y_true, probabilities)
+    eligible = precision[:-1] >= 0.75
+    best = np.flatnonzero(eligible)[np.argmax(recall[:-1][eligible])]
+    assert choice["recall"] == pytest.approx(recall[best])
+
+    # The detector classifies with '>', which keeps the same rows
+    metrics = threshold_metrics(y_true, probabilities, choice["threshold"])
+    assert metrics["precision"] == pytest.approx(choice["precision"])
+    assert metrics["recall"] == pytest.approx(choice["recall"])
+    assert choice["threshold"] < thresholds[best]
+
+
+def test_disposition_labels_and_threshold_bundle(tmp_path):
+    labels = disposition_labels(["CONFIRMED", "candidate ", "FALSE POSITIVE", "NOT DISPOSITIONED", None])
+    assert labels.tolist() == [1, 1, 0, -1, -1]
+
+    detector = ExoplanetDetector()
+    write_threshold_bundle(detector, str(tmp_path / "tuned.bundle"), 0.3)
+    tuned = ExoplanetDetector(bundle_path=str(tmp_path / "tuned.bundle"))
+    assert tuned.decision_threshold == 0.3
+    assert tuned.features == detector.features
@@ -0,0 +1,74 @@
+"""
+Tests for the light-curve feature pipeline
+==========================================
+
+Run from the backend directory with:
+    python -m pytest -q
+"""
+
+import numpy as np
+import pytest
+
+from lightcurve_features import extract_directory, extract_features, period_grid
+
+PERIOD = 3.7
+DURATION_HOURS = 3.0
+DEPTH = 600e-6
+
+
+def synthetic_light_curve(days: float = 27.0, cadence_minutes: float = 10.0, seed: int = 0):
+    """Noisy light curve with a slow trend and a box transit."""
+    rng = np.random.default_rng(seed)
+    time_values = np.arange(131.0, 131.0 + days, cadence_minutes / 1440.0)
+    flux = 1.0 + 150e-6 * rng.standard_normal(len(time_values)) + 2e-3 * np.sin(time_values / 5.0)
+    phase = (time_values - 132.2 + PERIOD / 2) % PERIOD - PERIOD / 2
+    flux[np.abs(phase) < DURATION_HOURS / 48.0] -= DEPTH
+    return time_values, flux
+
+
+def test_period_grid_spacing_follows_baseline():
+    grid = period_grid(100.0, 0.5, 100.0, 1.0 / 24, 2.0)
+    assert grid[0] == 0.5 and grid[-1] >= 50.0
+    assert np.allclose(grid[1:] / grid[:-1], 1 + (1.0 / 24) / (2.0 * 100.0))
+    with pytest.raises(ValueError):
+        period_grid(0.8, 0.5, 100.0, 1.0 / 24, 2.0)
+
+
+def test_injected_transit_is_recovered():
+    features = extract_features(*synthetic_light_curve(), stellar={"koi_srad": 1.0})
+    assert features["koi_period"] == pytest.approx(PERIOD, rel=2e-3)
+    assert features["koi_duration"] == pytest.approx(DURATION_HOURS, rel=0.25)
+    assert features["koi_depth"] == pytest.approx(DEPTH * 1e6, rel=0.15)
+    phase = (features["koi_time0bk"] - 132.2 + PERIOD / 2) % PERIOD - PERIOD / 2
+    assert abs(phase) < 0.05
+    assert features["koi_model_snr"] > 20
+    assert features["koi_prad"] == pytest.approx(np.sqrt(DEPTH) * 109.076, rel=0.1)
+
+
+def test_directory_is_processed_scored_and_cached(tmp_path):
+    fits = pytest.importorskip("astropy.io.fits")
+
+    time_values, flux = synthetic_light_curve()
+    lightcurves = tmp_path / "lightcurves"
+    lightcurves.mkdir()
+    for half, cadences in enumerate(np.array_split(np.arange(len(time_values)), 2)):
+        primary = fits.PrimaryHDU()
+        primary.header.update({"TELESCOP": "Kepler", "RADIUS": 1.0, "TEFF": 5700, "LOGG": 4.4, "KEPMAG": 12.0})
+        table = fits.BinTableHDU.from_columns([
+            fits.Column(name="TIME", format="D", array=time_values[cadences]),
+            fits.Column(name="PDCSAP_FLUX", format="D", array=flux[cadences] * 1e4),
+            fits.Column(name="QUALITY", format="J", array=np.zeros(len(cadences), dtype=np.int32)),
+        ])
+        fits.HDUList([primary, table]).writeto(lightcurves / f"kplr000757450-20090{half}_llc.fits")
+
+    output = tmp_path / "features.csv"
+    summary = extract_directory(str(lightcurves), str(output), workers=1, score=True)
+    assert summary["targets"] == 1 and summary["processed"] == 1 and summary["failed"] == 0
+
+    import pandas as pd
+    frame = pd.read_csv(output)
+    assert frame.loc[0, "kepid"] == 757450
+    assert frame.loc[0, "koi_period"] == pytest.approx(PERIOD, rel=2e-3)
+    assert 0.0 <= frame.loc[0, "probability_exoplanet"] <= 1.0
+
+    assert extract_directory(str(lightcurves), str(output), workers=1)["cached"] == 1
@@ -0,0 +1,49 @@
+"""
+Tests for the load generator
+============================
+
+Run from the backend directory with:
+    python -m pytest -q
+"""
+
+import asyncio
+
+import pytest
+
+from load_generator import find_saturation, parse_mix, run_load
+
+
+def level(concurrency, throughput, error_rate=0.0, p99_ms=10.0):
+    return {
+        "concurrency": concurrency,
+        "throughput_rps": throughput,
+        "throughput_rows_per_s": throughput,
+        "error_rate": error_rate,
+        "p99_ms": p99_ms
+    }
+
+
+def test_parse_mix_and_saturation():
+    assert parse_mix("predict=8,predict-json=1,catalog=0") == {"predict": 8.0, "predict-json": 1.0}
+    with pytest.raises(ValueError):
+        parse_mix("predict=1,stream=1")
+
+    levels = [level(1, 100), level(2, 190), level(4, 200), level(8, 210)]
+    saturation = find_saturation(levels, min_gain=0.1)
+    assert saturation["saturated"] and saturation["concurrency"] == 4
+    assert saturation["capacity"]["concurrency"] == 2
+
+    assert find_saturation(levels[:2])["saturated"] is False
+    assert find_saturation([level(1, 100), level(2, 190, error_rate=0.2)])["concurrency"] == 2
+    assert find_saturation(levels, max_p99_ms=5.0)["capacity"] is None
+
+
+def test_in_process_run_reports_every_request_type():
+    mix = {"predict": 2, "predict-json": 1, "predict-csv": 1, "catalog": 1}
+    report = asyncio.run(run_load(None, mix, [2, 1], duration=0.5, warmup=0.0, batch_size=5, csv_rows=20))
+
+    assert [summary["concurrency"] for summary in report["levels"]] == [1, 2]
+    for summary in report["levels"]:
+        assert summary["requests"] > 0 and summary["errors"] == 0
+        assert summary["p50_ms"] <= summary["p99_ms"] <= summary["max_ms"]
+        assert sum(group["requests"] for group in summary["by_type"].values()) == summary["requests"]
@@ -0,0 +1,464 @@
+"""
+Tests for the FastAPI endpoints
+===============================
+
+Runs the app in-process; no server needs to be started.
+"""
+
+import asyncio
+import gc
+import io
+import json
+import sys
+import time
+from pathlib import Path
+
+import httpx
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from micro_batcher import MicroBatcher
+from startup import StartupState
+
+BACKEND_DIR = Path(__file__).parent
+SAMPLE_CSV = BACKEND_DIR / "output_15_linhas.csv"
+CATALOG = BACKEND_DIR / "cumulative_2025.10.04_14.14.53.csv"
+
+
+@pytest.fixture(scope="module")
+def client():
+    return TestClient(main.app)
+
+
+def post_csv(client, content, params=None):
+    return client.post("/predict-csv", params=params, files={"file": ("sample.csv", content)})
+
+
+def test_predict_csv(client):
+    response = post_csv(client, SAMPLE_CSV.read_bytes())
+    assert response.status_code == 200
+
+    body = response.json()
+    assert body["summary"]["total_rows"] == 15
+    assert body["summary"]["successful_predictions"] == 15
+    assert body["results"][0]["kepoi_name"] == "K00752.01"
+
+
+def test_predict_csv_stream_matches_full_response(client, monkeypatch):
+    # Several batches for the 15-row sample
+    monkeypatch.setattr(main, "CSV_STREAM_BATCH_ROWS", 4)
+
+    expected = post_csv(client, SAMPLE_CSV.read_bytes()).json()
+    response = post_csv(client, SAMPLE_CSV.read_bytes(), params={"stream": "true"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines[:-1] == expected["results"]
+    assert lines[-1]["summary"] == expected["summary"]
+
+    # An Exoplanet Archive export, '#' metadata header included
+    with CATALOG.open("rb") as catalog:
+        export = b"".join(catalog.readline() for _ in range(120))
+    full = post_csv(client, export)
+    assert full.status_code == 200
+    expected = full.json()
+    assert expected["summary"]["total_rows"] == 120 - 54
+
+    lines = [json.loads(line) for line in post_csv(client, export, params={"stream": "true"}).text.splitlines()]
+    assert lines[:-1] == expected["results"]
+    assert lines[-1]["summary"] == expected["summary"]
+
+
+def test_predict_csv_stream_rejects_missing_columns(client):
+    response = post_csv(client, b"kepid,koi_score\n1,0.5\n", params={"stream": "true"})
+    assert response.status_code == 400
+    assert "koi_period" in response.json()["detail"]
+
+
+def test_predict_csv_stream_client_disconnect_closes_reader(monkeypatch):
+    monkeypatch.setattr(main, "CSV_STREAM_BATCH_ROWS", 4)
+    readers = []
+    iter_csv_batches = main.iter_csv_batches
+
+    def tracked_batches(source, batch_rows):
+        readers.append(iter_csv_batches(source, batch_rows))
+        return readers[-1]
+
+    monkeypatch.setattr(main, "iter_csv_batches", tracked_batches)
+    unraisable = []
+    monkeypatch.setattr(sys, "unraisablehook", unraisable.append)
+
+    request = httpx.Request(
+        "POST", "http://test/predict-csv?stream=true",
+        files={"file": ("sample.csv", SAMPLE_CSV.read_bytes())}
+    )
+    scope = {
+        "type": "http", "asgi": {"version": "3.0", "spec_version": "2.4"}, "http_version": "1.1",
+        "method": "POST", "scheme": "http", "path": "/predict-csv", "raw_path": b"/predict-csv",
+        "query_string": b"stream=true", "root_path": "", "client": ("test", 1), "server": ("test", 80),
+        "headers": [(key.encode(), value.encode()) for key, value in request.headers.items()]
+    }
+    messages = [{"type": "http.request", "body": request.read(), "more_body": False}]
+    chunks = []
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            chunks.append(message["body"])
+            if len(chunks) == 2:
+                raise OSError("client disconnected")
+
+    async def disconnect_mid_stream():
+        try:
+            await main.app(scope, receive, send)
+        except Exception:
+            pass
+
+    asyncio.run(disconnect_mid_stream())
+    gc.collect()
+
+    assert len(chunks) == 2
+    assert readers[0].gi_frame is None
+    assert unraisable == []
+
+
+def test_default_model_imputes_missing_features():
+    model = main.get_model()
+    assert model.bundle is None and model.imputation_medians is not None
+
+    frame = pd.read_csv(SAMPLE_CSV).head(2)
+    frame.loc[0, "koi_steff"] = np.nan
+    batch = model.predict_batch(frame)
+    assert batch["imputed_mask"].tolist() == [True, False]
+    assert not batch["error_mask"].any()
+
+    filled = frame.copy()
+    filled.loc[0, "koi_steff"] = model.imputation_medians[model.features.index("koi_steff")]
+    np.testing.assert_allclose(batch["probabilities"], model.predict_batch(filled)["probabilities"])
+
+
+def test_predict_json_reports_missing_features(client):
+    record = {feature: 1.0 for feature in main.REQUIRED_FEATURES}
+    response = client.post("/predict-json", json={"data": [record, {"kepid": 1}]})
+    assert response.status_code == 200
+
+    body = response.json()
+    assert body["summary"]["successful_predictions"] == 1
+    assert body["results"][1]["success"] is False
+    assert "Missing features" in body["results"][1]["error"]
+
+
+def test_health_reports_executor_load(client):
+    body = client.get("/health").json()
+    assert body["executor"]["queue_length"] == 0
+    assert body["executor"]["max_workers"] == main.executor.max_workers
+
+
+def test_saturated_executor_returns_503(client, monkeypatch):
+    saturated = main.InferenceExecutor(max_workers=1, max_queue=0, retry_after=7)
+    saturated._pending = 1
+    monkeypatch.setattr(main, "executor", saturated)
+
+    record = {feature: 1.0 for feature in main.REQUIRED_FEATURES}
+    response = client.post("/predict", json={"candidate_data": record})
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "7"
+
+    response = post_csv(client, SAMPLE_CSV.read_bytes(), params={"stream": "true"})
+    assert response.status_code == 503
+    assert client.get("/health").json()["executor"]["rejected"] == 2
+
+
+def test_failed_tasks_are_not_counted_as_completed():
+    executor = main.InferenceExecutor(max_workers=1)
+
+    def fail():
+        raise ValueError("bad batch")
+
+    async def run_tasks():
+        await executor.run(sum, [1, 2])
+        with pytest.raises(ValueError):
+            await executor.run(fail)
+
+    asyncio.run(run_tasks())
+    executor.shutdown()
+    stats = executor.get_stats()
+    assert (stats["completed"], stats["failed"]) == (1, 1)
+
+
+def test_micro_batched_predictions_match_direct_predictions(monkeypatch):
+    records = pd.read_csv(SAMPLE_CSV)[main.REQUIRED_FEATURES].to_dict("records")
+    expected = [main.process_single_request({"candidate_data": record}) for record in records]
+
+    batcher = MicroBatcher(main.score_micro_batch, max_batch_size=4, max_wait_ms=50)
+    monkeypatch.setattr(main, "micro_batcher", batcher)
+
+    async def post_all():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            responses = await asyncio.gather(*[
+                client.post("/predict", json={"candidate_data": record}) for record in records
+            ])
+        return [response.json() for response in responses]
+
+    assert asyncio.run(post_all()) == expected
+
+    stats = batcher.get_stats()
+    assert stats["batch_size"]["sum"] == len(records)
+    assert stats["batch_size"]["count"] == 4
+    assert stats["wait_time_ms"]["count"] == len(records)
+
+
+def test_mission_parameter_selects_registered_model(client):
+    response = client.get("/model-info", params={"mission": "kepler"})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["mission"] == "kepler"
+    assert body["required_features"] == main.REQUIRED_FEATURES
+    assert body["registry"]["models"]["kepler"]["resident"]
+
+    response = client.post("/predict", params={"mission": "jwst"}, json={"candidate_data": {}})
+    assert response.status_code == 404
+    assert "jwst" in response.json()["detail"]
+
+
+def test_warmup_reports_readiness_separately_from_liveness(monkeypatch):
+    monkeypatch.setattr(main, "startup", StartupState(time.perf_counter(), warmup=True))
+
+    with TestClient(main.app) as client:
+        assert client.get("/health/live").json() == {"live": True}
+        for _ in range(200):
+            if client.get("/health/ready").status_code == 200:
+                break
+            time.sleep(0.05)
+
+        body = client.get("/health").json()
+    assert body["live"] and body["ready"] and body["status"] == "healthy"
+    assert body["startup"]["warmup_seconds"] > 0
+    assert body["startup"]["time_to_first_prediction_seconds"] > 0
+
+
+def test_not_ready_until_warmup_finishes(client, monkeypatch):
+    monkeypatch.setattr(main, "startup", StartupState(time.perf_counter(), warmup=True))
+    response = client.get("/health/ready")
+    assert response.status_code == 503
+    assert client.get("/health").json()["status"] == "starting"
+
+
+def parquet_bytes(df):
+    buffer = io.BytesIO()
+    df.to_parquet(buffer, index=False)
+    return buffer.getvalue()
+
+
+def test_predict_parquet_matches_csv(client):
+    expected = post_csv(client, SAMPLE_CSV.read_bytes()).json()
+    content = parquet_bytes(pd.read_csv(SAMPLE_CSV))
+    response = client.post("/predict-parquet", files={"file": ("sample.parquet", content)})
+    assert response.status_code == 200
+    assert response.json()["results"] == expected["results"]
+    assert response.json()["summary"] == expected["summary"]
+
+
+def test_predict_arrow_returns_columnar_results(client):
+    df = pd.read_csv(SAMPLE_CSV)
+    table = pa.Table.from_pandas(df)
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+
+    response = client.post("/predict-arrow", params={"columnar": "true"},
+                           files={"file": ("sample.arrows", sink.getvalue())})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/vnd.apache.arrow.stream"
+
+    results = pa.ipc.open_stream(response.content).read_all()
+    expected = post_csv(client, SAMPLE_CSV.read_bytes()).json()
+    assert results.column("kepid").to_pylist() == df["kepid"].tolist()
+    assert results.column("prediction").to_pylist() == [r["prediction"] for r in expected["results"]]
+    summary = json.loads(results.schema.metadata[b"summary"])
+    assert summary == expected["summary"]
+
+
+def test_predict_parquet_rejects_bad_columns(client):
+    df = pd.read_csv(SAMPLE_CSV)
+    response = client.post("/predict-parquet",
+                           files={"file": ("x.parquet", parquet_bytes(df.drop(columns=["koi_depth"])))})
+    assert response.status_code == 400
+    assert "koi_depth" in response.json()["detail"]
+
+    df["koi_depth"] = df["koi_depth"].astype(str)
+    response = client.post("/predict-parquet", files={"file": ("x.parquet", parquet_bytes(df))})
+    assert response.status_code == 400
+    assert "koi_depth" in response.json()["detail"]
+
+
+def test_compact_and_msgpack_responses_match_json(client):
+    import msgpack
+
+    expected = post_csv(client, SAMPLE_CSV.read_bytes()).json()
+    compact = post_csv(client, SAMPLE_CSV.read_bytes(), params={"format": "compact"})
+    assert compact.headers["content-type"] == "application/vnd.exoplanet.columnar+json"
+    packed = post_csv(client, SAMPLE_CSV.read_bytes(), params={"format": "msgpack"})
+    assert packed.headers["content-type"] == "application/x-msgpack"
+
+    for body in (compact.json(), msgpack.unpackb(packed.content, strict_map_key=False)):
+        assert body["summary"] == expected["summary"]
+        assert body["features_used"] == main.get_model(None).features
+        columns = body["columns"]
+        assert columns["kepoi_name"] == [r["kepoi_name"] for r in expected["results"]]
+        assert columns["prediction"] == [r["prediction"] for r in expected["results"]]
+        assert columns["probability_exoplanet"] == [r["probability_exoplanet"] for r in expected["results"]]
+        assert body["errors"] == {}
+
+
+def test_response_format_follows_accept_header(client):
+    record = {feature: 1.0 for feature in main.REQUIRED_FEATURES}
+    response = client.post("/predict-json", json={"data": [record, {"kepid": 7}]},
+                           headers={"Accept": "application/json;q=0.5, application/vnd.exoplanet.columnar+json"})
+    assert response.status_code == 200
+
+    body = response.json()
+    assert body["columns"]["kepid"] == [1, 7]
+    assert body["columns"]["prediction"][1] == -1
+    assert "Missing features" in body["errors"]["1"]
+
+    response = post_csv(client, SAMPLE_CSV.read_bytes(), params={"format": "yaml"})
+    assert response.status_code == 400
+
+
+def test_explain_contributions_sum_to_margin(client):
+    row = pd.read_csv(SAMPLE_CSV).iloc[0]
+    candidate = {feature: float(row[feature]) for feature in main.REQUIRED_FEATURES}
+    response = client.post("/explain", json={"candidate_data": candidate})
+    assert response.status_code == 200
+
+    data = response.json()["data"]
+    assert len(data["contributions"]) == len(main.get_model(None).features)
+    margin = data["base_value"] + sum(c["contribution"] for c in data["contributions"])
+    assert 1 / (1 + np.exp(-margin)) == pytest.approx(data["probabilities"]["exoplanet"], abs=1e-5)
+
+    magnitudes = [abs(c["contribution"]) for c in data["contributions"]]
+    assert magnitudes == sorted(magnitudes, reverse=True)
+
+
+def test_explain_csv_returns_top_k_per_row(client):
+    expected = post_csv(client, SAMPLE_CSV.read_bytes()).json()
+    response = client.post("/explain-csv", params={"top_k": 3},
+                           files={"file": ("sample.csv", SAMPLE_CSV.read_bytes())})
+    assert response.status_code == 200
+
+    body = response.json()
+    assert body["summary"] == expected["summary"]
+    for result, scored in zip(body["results"], expected["results"]):
+        assert result["prediction"] == scored["prediction"]
+        assert len(result["contributions"]) == 3
+
+
+def test_metrics_exposes_csv_stage_histograms(client):
+    assert post_csv(client, SAMPLE_CSV.read_bytes()).status_code == 200
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    text = response.text
+    for stage in ("read_upload", "decode", "parse", "validate", "score", "build_response", "total"):
+        assert f'exoplanet_stage_duration_seconds_count{{pipeline="csv",stage="{stage}"}}' in text
+    assert 'exoplanet_stage_duration_seconds_bucket{pipeline="predict_batch",stage="model",le="+Inf"}' in text
+    assert 'exoplanet_rows_total{pipeline="csv"}' in text
+
+
+def test_pipeline_metrics_drain_and_merge():
+    from metrics import PipelineMetrics
+
+    worker = PipelineMetrics()
+    with worker.stage("csv", "parse"):
+        pass
+    with pytest.raises(ValueError):
+        with worker.stage("csv", "validate"):
+            raise ValueError("bad upload")
+    worker.add_rows("csv", 10, failed=2)
+
+    server = PipelineMetrics()
+    server.merge(worker.drain())
+    assert worker.get_stats() == {}
+
+    stats = server.get_stats()["csv"]
+    assert stats["rows"] == 10 and stats["failed_rows"] == 2
+    assert stats["stages"]["parse"]["count"] == 1
+    assert stats["stages"]["validate"]["errors"] == 1
+    assert 'exoplanet_stage_errors_total{pipeline="csv",stage="validate"} 1' in server.render_prometheus()
+
+
+def test_profiling_requires_token(client):
+    response = client.post("/predict-csv", params={"profile": "true"},
+                           files={"file": ("sample.csv", SAMPLE_CSV.read_bytes())})
+    assert response.status_code == 403
+
+
+def test_profiled_csv_request_returns_report(client, monkeypatch, tmp_path):
+    from profiling import RequestProfiler
+
+    monkeypatch.setattr(main, "profiler", RequestProfiler(token="secret", directory=str(tmp_path)))
+    response = client.post("/predict-csv", params={"profile": "true"},
+                           headers={"X-Profile-Token": "secret"},
+                           files={"file": ("sample.csv", SAMPLE_CSV.read_bytes())})
+    assert response.status_code == 200
+
+    report = response.json()["profile"]
+    assert report["task"] == "score_csv_upload"
+    functions = [entry["function"] for entry in report["top_functions"]]
+    assert any("parse_csv" in function for function in functions)
+    assert report["memory"]["peak_bytes"] > 0
+    assert (tmp_path / f"{report['id']}.json").exists()
+    assert (tmp_path / f"{report['id']}.prof").exists()
+
+
+def test_sampled_requests_are_written_not_returned(client, monkeypatch, tmp_path):
+    from profiling import RequestProfiler
+
+    monkeypatch.setattr(main, "profiler", RequestProfiler(sample_rate=1.0, directory=str(tmp_path)))
+    response = client.post("/predict-json", json={"data": [{"kepid": 1}]})
+    assert response.status_code == 200
+    assert "profile" not in response.json()
+    assert len(list(tmp_path.glob("*.json"))) == 1
+
+
+def test_evaluate_labeled_catalog(client):
+    catalog = BACKEND_DIR / "cumulative_2025.10.04_14.14.53.csv"
+    lines = catalog.read_bytes().splitlines(keepends=True)
+    header = next(i for i, line in enumerate(lines) if not line.startswith(b"#"))
+    content = b"".join(lines[:header + 401])
+
+    response = client.post("/evaluate", params={"min_precision": 0.9},
+                           files={"file": ("labeled.csv", content)})
+    assert response.status_code == 200
+    report = response.json()["evaluation"]
+    assert report["rows"] + report["failed_rows"] + report["unlabeled_rows"] == 400
+    assert report["positives"] + report["negatives"] == report["rows"]
+    assert report["thresholds"]["min_precision"]["precision"] >= 0.9
+    assert report["current_threshold"] == 0.5
+    assert sum(map(sum, report["at_current_threshold"]["confusion_matrix"])) == report["rows"]
+
+    unlabeled = client.post("/evaluate", files={"file": ("sample.csv", SAMPLE_CSV.read_bytes())})
+    assert unlabeled.status_code == 400
+    assert "koi_disposition" in unlabeled.json()["detail"]
+
+
+def test_catalog_lookup_and_top(client):
+    koi = client.get("/catalog/K00752.01")
+    assert koi.status_code == 200
+    assert koi.json()["results"][0]["kepid"] == 10797460
+    assert client.get("/catalog/K99999.01").status_code == 404
+
+    top = client.get("/catalog/top", params={"k": 5, "max_probability": 0.9}).json()
+    probabilities = [result["probability_exoplanet"] for result in top["results"]]
+    assert len(probabilities) == 5 and top["total"] >= 5
+    assert probabilities == sorted(probabilities, reverse=True) and probabilities[0] <= 0.9
@@ -0,0 +1,87 @@
+"""
+Tests for the single-file model bundle
+======================================
+
+Run from the backend directory with:
+    python -m pytest -q
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from exoplanet_detector_model import ExoplanetDetector
+from model_bundle import BundleFormatError, MappedBundle, convert_pickles
+from model_registry import ModelBundle, ModelRegistry
+
+BACKEND_DIR = Path(__file__).parent
+CATALOG = BACKEND_DIR / "cumulative_2025.10.04_14.14.53.csv"
+
+
+@pytest.fixture(scope="module")
+def bundle_path(model_files, tmp_path_factory):
+    path = tmp_path_factory.mktemp("bundle") / "kepler.bundle"
+    convert_pickles(str(path), training_data=str(CATALOG),
+                    dataset_cache=str(tmp_path_factory.mktemp("dataset")), **model_files)
+    return path
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    return pd.read_csv(CATALOG, comment="#").head(500)
+
+
+@pytest.mark.parametrize("engine", ["xgboost", "compiled"])
+def test_bundle_predictions_match_pickles(make_detector, bundle_path, catalog, engine):
+    expected = make_detector(engine=engine).predict_batch(catalog)
+    detector = ExoplanetDetector(bundle_path=str(bundle_path), engine=engine)
+    assert detector.is_loaded
+    batch = detector.predict_batch(catalog)
+
+    # Both impute missing cells with the same training medians
+    complete = catalog[detector.features].notna().all(axis=1).to_numpy()
+    np.testing.assert_array_equal(batch["imputed_mask"], ~complete)
+    np.testing.assert_array_equal(expected["imputed_mask"], ~complete)
+    np.testing.assert_array_equal(batch["predictions"], expected["predictions"])
+    np.testing.assert_allclose(batch["probabilities"], expected["probabilities"], rtol=1e-6)
+
+    candidate = catalog.iloc[0].to_dict()
+    assert detector.predict(candidate)["prediction"] == expected["predictions"][0]
+
+
+def test_bundle_arrays_are_mapped_read_only(bundle_path):
+    bundle = MappedBundle(str(bundle_path))
+    medians = pd.read_csv(CATALOG, comment="#")[bundle.features].median()
+    np.testing.assert_allclose(bundle.array("imputation_medians"), medians)
+
+    compiled = bundle.compiled_model()
+    assert not compiled.threshold.flags.writeable
+    assert not compiled.threshold.flags.owndata
+
+
+def test_corrupted_bundle_is_rejected(bundle_path, tmp_path):
+    data = bytearray(bundle_path.read_bytes())
+    data[-1] ^= 0xFF
+    corrupted = tmp_path / "corrupted.bundle"
+    corrupted.write_bytes(bytes(data))
+    with pytest.raises(BundleFormatError, match="Checksum"):
+        MappedBundle(str(corrupted))
+
+    assert not ExoplanetDetector(bundle_path=str(corrupted)).is_loaded
+
+    (tmp_path / "not_a_bundle").write_bytes(b"x" * 64)
+    with pytest.raises(BundleFormatError):
+        MappedBundle(str(tmp_path / "not_a_bundle"))
+
+
+def test_registry_serves_bundles(model_files, bundle_path):
+    registry = ModelRegistry(default="kepler")
+    registry.register(ModelBundle("kepler", bundle_path=str(bundle_path), engine="compiled"))
+    detector = registry.get()
+    assert detector.fingerprint == MappedBundle(str(bundle_path)).fingerprint(extra="compiled")
+    assert registry.get_stats()["models"]["kepler"]["memory_bytes"] == bundle_path.stat().st_size
+
+    with pytest.raises(ValueError):
+        ModelBundle("incomplete", model_path=model_files["model_path"])
@@ -0,0 +1,119 @@
+"""
+Tests for ModelRegistry
+=======================
+
+Run from the backend directory with:
+    python -m pytest -q
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from model_registry import ModelBundle, ModelLoadError, ModelRegistry, UnknownModelError
+from prediction_cache import PredictionCache
+
+BACKEND_DIR = Path(__file__).parent
+
+
+def bundle(name, engine="xgboost", model_path=None):
+    return ModelBundle(
+        name,
+        model_path=model_path or str(BACKEND_DIR / "exoplanet_detector_model.pkl"),
+        scaler_path=str(BACKEND_DIR / "exoplanet_scaler.pkl"),
+        features_path=str(BACKEND_DIR / "exoplanet_features.pkl"),
+        engine=engine
+    )
+
+
+def make_registry(**kwargs):
+    registry = ModelRegistry(default="kepler", **kwargs)
+    registry.register(bundle("kepler"))
+    registry.register(bundle("kepler-compiled", engine="compiled"))
+    registry.register(bundle("kepler-copy"))
+    return registry
+
+
+def test_models_load_on_first_use_and_stay_resident():
+    registry = make_registry()
+    assert registry.get_stats()["resident"] == []
+
+    detector = registry.get()
+    assert detector.is_loaded
+    assert registry.get("kepler") is detector
+
+    stats = registry.get_stats()
+    assert stats["resident"] == ["kepler"]
+    assert stats["models"]["kepler"]["loads"] == 1
+    assert stats["models"]["kepler"]["load_time_seconds"] > 0
+    assert stats["models"]["kepler"]["memory_bytes"] > 0
+    assert not stats["models"]["kepler-copy"]["resident"]
+
+
+def test_least_recently_used_model_is_evicted():
+    registry = make_registry(max_resident=2)
+    first = registry.get("kepler")
+    registry.get("kepler-compiled")
+    registry.get("kepler")
+    registry.get("kepler-copy")
+
+    stats = registry.get_stats()
+    assert stats["resident"] == ["kepler", "kepler-copy"]
+    assert stats["models"]["kepler-compiled"]["evictions"] == 1
+    assert registry.get("kepler") is first
+
+    registry.get("kepler-compiled")
+    assert registry.get_stats()["models"]["kepler-compiled"]["loads"] == 2
+
+
+def test_memory_budget_keeps_most_recent_model():
+    registry = make_registry(max_resident=3, memory_budget_bytes=1)
+    registry.get("kepler")
+    registry.get("kepler-copy")
+    assert registry.get_stats()["resident"] == ["kepler-copy"]
+
+
+def test_each_model_gets_its_own_cache():
+    registry = make_registry(cache_factory=lambda: PredictionCache(max_entries=10))
+    assert registry.get("kepler").cache is not registry.get("kepler-compiled").cache
+    assert set(registry.cache_stats()) == {"kepler", "kepler-compiled"}
+
+
+def test_unknown_and_unloadable_models():
+    registry = make_registry()
+    registry.register(bundle("broken", model_path=str(BACKEND_DIR / "missing.pkl")))
+
+    with pytest.raises(UnknownModelError):
+        registry.get("jwst")
+    with pytest.raises(ModelLoadError):
+        registry.get("broken")
+    assert registry.get_stats()["resident"] == []
+
+
+def test_manifest_paths_are_relative_to_manifest(tmp_path):
+    manifest = tmp_path / "models.json"
+    manifest.write_text(json.dumps({
+        "default": "kepler",
+        "models": {
+            "kepler": {
+                "mission": "Kepler",
+                "version": "1.0",
+                "model_path": str(BACKEND_DIR / "exoplanet_detector_model.pkl"),
+                "scaler_path": str(BACKEND_DIR / "exoplanet_scaler.pkl"),
+                "features_path": str(BACKEND_DIR / "exoplanet_features.pkl")
+            },
+            "tess": {
+                "model_path": "tess_model.pkl",
+                "scaler_path": "tess_scaler.pkl",
+                "features_path": "tess_features.pkl"
+            }
+        }
+    }))
+
+    registry = ModelRegistry.from_manifest(str(manifest))
+    assert registry.default == "kepler"
+    assert registry.bundles["kepler"].version == "1.0"
+    assert registry.bundles["tess"].mission == "tess"
+    assert registry.bundles["tess"].model_path == str(tmp_path / "tess_model.pkl")
+    assert registry.get().is_loaded
@@ -0,0 +1,69 @@
+"""
+Tests for the pre-fork server
+=============================
+
+Starts ``run_api.py --workers`` as a subprocess on a free port.
+"""
+
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).parent
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def get_json(url: str, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with urllib.request.urlopen(url, timeout=5) as response:
+                return json.load(response)
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.2)
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="pre-fork needs os.fork")
+def test_workers_are_recycled_and_stop_gracefully(tmp_path):
+    port = free_port()
+    env = dict(os.environ, EXOPLANET_JOB_DIR=str(tmp_path / "jobs"))
+    server = subprocess.Popen(
+        [sys.executable, "run_api.py", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", "2", "--max-requests", "5"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        url = f"http://127.0.0.1:{port}"
+        assert get_json(f"{url}/health")["ready"]
+        for _ in range(30):
+            get_json(f"{url}/health/live")
+
+        # Workers exit shortly after their fifth request and are replaced
+        deadline = time.monotonic() + 30
+        while True:
+            stats = get_json(f"{url}/health")["server"]
+            restarts = [worker["restarts"] for worker in stats["workers"]]
+            if min(restarts) >= 1 or time.monotonic() > deadline:
+                break
+            time.sleep(0.2)
+        assert stats["mode"] == "prefork" and len(restarts) == 2
+        assert min(restarts) >= 1
+        assert stats["total_requests"] >= 32
+    finally:
+        server.send_signal(signal.SIGTERM)
+        assert server.wait(timeout=60) == 0
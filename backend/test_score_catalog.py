@@ -0,0 +1,72 @@
+"""
+Tests for the bulk catalog scoring CLI
+======================================
+
+Run from the backend directory with:
+    python -m pytest -q
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from score_catalog import CHECKPOINT_FILE, plan_csv_shards, score_catalog
+
+
+def read_parts(output_dir, suffix="parquet"):
+    parts = sorted(Path(output_dir).glob(f"part-*.{suffix}"))
+    reader = pd.read_parquet if suffix == "parquet" else pd.read_csv
+    return pd.concat([reader(part) for part in parts], ignore_index=True)
+
+
+@pytest.mark.parametrize("catalog_sample", [300], indirect=True)
+def test_csv_shards_cover_every_row(catalog_sample):
+    shards = plan_csv_shards(catalog_sample, 128)
+    assert [shard["rows"] for shard in shards] == [128, 128, 44]
+    assert [shard["start"] for shard in shards] == [0, 128, 256]
+
+
+@pytest.mark.parametrize("catalog_sample", [300], indirect=True)
+def test_sharded_scores_match_batch_scores_and_resume(catalog_sample, model_files, make_detector, tmp_path):
+    summary = score_catalog(str(catalog_sample), str(tmp_path), workers=2, shard_rows=128,
+                            **model_files)
+    assert summary["total_rows"] == 300
+    assert summary["shards_scored"] == 3
+
+    expected = make_detector().predict_batch(pd.read_csv(catalog_sample, comment="#"))
+    scores = read_parts(tmp_path)
+    assert scores["row_index"].tolist() == list(range(300))
+    np.testing.assert_allclose(scores["probability_exoplanet"], expected["probabilities"], rtol=1e-6)
+    assert summary["exoplanets_detected"] == int((expected["predictions"] == 1).sum())
+
+    # An interrupted run leaves a shard without its part file
+    (tmp_path / "part-00001.parquet").unlink()
+    checkpoint = json.loads((tmp_path / CHECKPOINT_FILE).read_text())
+    assert set(checkpoint["completed"]) == {"0", "1", "2"}
+
+    rerun = score_catalog(str(catalog_sample), str(tmp_path), workers=1, shard_rows=128,
+                          **model_files)
+    assert (rerun["shards_scored"], rerun["shards_skipped"]) == (1, 2)
+    assert read_parts(tmp_path)["row_index"].tolist() == list(range(300))
+
+
+@pytest.mark.parametrize("catalog_sample", [300], indirect=True)
+def test_parquet_catalog_is_sharded_by_row_group(catalog_sample, model_files, tmp_path):
+    parquet_path = tmp_path / "sample.parquet"
+    pd.read_csv(catalog_sample, comment="#").to_parquet(parquet_path, row_group_size=100)
+
+    summary = score_catalog(str(parquet_path), str(tmp_path / "out"), workers=1, shard_rows=150,
+                            output_format="csv", **model_files)
+    assert (summary["shards"], summary["total_rows"]) == (2, 300)
+    assert read_parts(tmp_path / "out", "csv")["row_index"].tolist() == list(range(300))
+
+
+def test_missing_columns_are_rejected(model_files, tmp_path):
+    path = tmp_path / "bad.csv"
+    path.write_text("kepid,koi_period\n1,2.0\n")
+    with pytest.raises(ValueError, match="koi_score"):
+        score_catalog(str(path), str(tmp_path / "out"),
+                      features_path=model_files["features_path"])
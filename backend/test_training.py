@@ -0,0 +1,64 @@
+"""
+Tests for the training pipeline
+===============================
+
+Run from the backend directory with:
+    python -m pytest -q
+"""
+
+import json
+import warnings
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from exoplanet_detector_model import ExoplanetDetector
+from training import sample_params, train
+
+BACKEND_DIR = Path(__file__).parent
+CATALOG = BACKEND_DIR / "cumulative_2025.10.04_14.14.53.csv"
+
+
+@pytest.fixture(scope="module")
+def trained(tmp_path_factory):
+    output_dir = tmp_path_factory.mktemp("models")
+    report = train(str(CATALOG), str(output_dir), version="test", n_trials=2, n_folds=2,
+                   max_estimators=60, early_stopping_rounds=10, max_rows=2000,
+                   cache_dir=str(output_dir / "dataset"))
+    return output_dir / "test", report
+
+
+def test_training_writes_loadable_artifacts(trained):
+    version_dir, report = trained
+    assert json.loads((version_dir / "metrics.json").read_text())["version"] == "test"
+    assert report["holdout"]["roc_auc"] > 0.95
+    assert set(report["timings"]) >= {"search_seconds", "refit_seconds", "total_seconds"}
+    assert len(report["trials"]) == 2
+
+    catalog = pd.read_csv(CATALOG, comment="#").head(200)
+    detector = ExoplanetDetector(
+        model_path=str(version_dir / "exoplanet_detector_model.pkl"),
+        scaler_path=str(version_dir / "exoplanet_scaler.pkl"),
+        features_path=str(version_dir / "exoplanet_features.pkl")
+    )
+    with warnings.catch_warnings():
+        # The scaler was fitted with the feature names the detector's frames carry
+        warnings.simplefilter("error")
+        from_pickles = detector.predict_batch(catalog)
+        detector.predict(catalog.iloc[0].to_dict())
+    from_bundle = ExoplanetDetector(
+        bundle_path=str(version_dir / "exoplanet_model.bundle"), engine="compiled"
+    ).predict_batch(catalog)
+    # Both impute missing cells with the training medians written alongside
+    assert from_bundle["imputed_mask"].any()
+    np.testing.assert_array_equal(from_pickles["imputed_mask"], from_bundle["imputed_mask"])
+    np.testing.assert_allclose(from_bundle["probabilities"], from_pickles["probabilities"], rtol=1e-5)
+
+
+def test_search_starts_from_notebook_params():
+    trials = sample_params(5, seed=7)
+    assert trials[0]["max_depth"] == 6 and trials[0]["learning_rate"] == 0.05
+    assert len({json.dumps(trial, sort_keys=True) for trial in trials}) == 5
+    assert trials == sample_params(5, seed=7)
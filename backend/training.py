@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+"""
+Model Training
+==============
+
+Headless, reproducible replacement for the training cells of
+``nasa_space_apps_2025.ipynb``.
+
+The pipeline follows the notebook:
+    1. Load the cumulative KOI catalog and derive ``is_planet``
+       (CONFIRMED and CANDIDATE are positive, FALSE POSITIVE negative)
+    2. Coerce the candidate features to numbers, drop features with more
+       than 50% missing values, fill the rest with the catalog medians
+       (flags with 0); steps 1 and 2 come from the ``dataset_cache``
+    3. Hold out 20% of the stars with GroupShuffleSplit by ``kepid``
+
+and then, instead of one hand-configured XGBClassifier:
+    4. Search hyperparameters with grouped K-fold cross-validation on the
+       training stars. Every fold is standardized and turned into an
+       XGBoost DMatrix once, and all trials reuse those cached matrices.
+       Trials run in parallel across cores with histogram tree building and
+       early stopping on the validation fold's log loss.
+    5. Refit the best configuration on the whole training split, evaluate
+       it on the held-out stars and write a versioned artifact directory.
+
+Each version directory holds the three pickles ``ExoplanetDetector`` loads
+by default, a single-file model bundle (see ``model_bundle``) and
+``metrics.json`` with the search results, hold-out metrics and wall-clock
+timings of every stage.
+
+Usage:
+    python training.py cumulative_2025.10.04_14.14.53.csv models/
+    python training.py catalog.csv models/ --trials 40 --folds 5 --n-jobs 8
+
+Author: Felipe Coutinho
+NASA Space Apps Challenge 2025
+"""
+
+import argparse
+import json
+import logging
+import os
+import pickle
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# Add the backend directory to Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+from dataset_cache import load_dataset
+from input_validation import MEDIANS_FILENAME, write_medians
+
+logger = logging.getLogger("training")
+
+# Hyperparameters of the notebook model; always evaluated as the first trial
+BASELINE_PARAMS = {
+    "max_depth": 6,
+    "learning_rate": 0.05,
+    "subsample": 0.8,
+    "colsample_bytree": 0.8,
+    "min_child_weight": 1,
+    "gamma": 0.0,
+    "reg_lambda": 1.0
+}
+
+# Values sampled by the random search
+SEARCH_SPACE = {
+    "max_depth": [3, 4, 5, 6, 7, 8],
+    "learning_rate": [0.02, 0.03, 0.05, 0.08, 0.1, 0.15],
+    "subsample": [0.6, 0.7, 0.8, 0.9, 1.0],
+    "colsample_bytree": [0.5, 0.6, 0.7, 0.8, 0.9, 1.0],
+    "min_child_weight": [1, 2, 4, 8],
+    "gamma": [0.0, 0.1, 0.3, 1.0],
+    "reg_lambda": [0.5, 1.0, 2.0, 5.0]
+}
+
+
+def holdout_split(y: np.ndarray, groups: np.ndarray, test_size: float = 0.2, seed: int = 42):
+    """Train/test row indices with no star in both (the notebook's split)."""
+    from sklearn.model_selection import GroupShuffleSplit
+
+    splitter = GroupShuffleSplit(n_splits=1, test_size=test_size, random_state=seed)
+    return next(splitter.split(np.zeros(len(y)), y, groups=groups))
+
+
+def scale_pos_weight(y: np.ndarray) -> float:
+    """Negative-to-positive ratio, weighting the positive class."""
+    n_pos = int(y.sum())
+    return (len(y) - n_pos) / max(1, n_pos)
+
+
+def build_folds(X: np.ndarray, y: np.ndarray, groups: np.ndarray, n_folds: int = 5) -> List[Dict[str, Any]]:
+    """
+    Standardize and convert every grouped CV fold once.
+
+    The resulting DMatrix objects (and the histogram cuts XGBoost computes on
+    first use) are shared by all search trials.
+
+    Args:
+        X: Training feature matrix
+        y: Training labels
+        groups: Star of each training row
+        n_folds: Number of folds
+
+    Returns:
+        List[Dict]: Per fold its ``train`` and ``valid`` DMatrix and the
+                    train split's ``scale_pos_weight``
+    """
+    import xgboost as xgb
+    from sklearn.model_selection import GroupKFold
+    from sklearn.preprocessing import StandardScaler
+
+    folds = []
+    for train_idx, valid_idx in GroupKFold(n_splits=n_folds).split(X, y, groups=groups):
+        scaler = StandardScaler().fit(X[train_idx])
+        folds.append({
+            "train": xgb.DMatrix(scaler.transform(X[train_idx]), label=y[train_idx]),
+            "valid": xgb.DMatrix(scaler.transform(X[valid_idx]), label=y[valid_idx]),
+            "scale_pos_weight": scale_pos_weight(y[train_idx])
+        })
+    return folds
+
+
+def sample_params(n_trials: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """
+    Hyperparameter configurations to try: the notebook's first, then
+    distinct random draws from ``SEARCH_SPACE``.
+    """
+    rng = np.random.RandomState(seed)
+    trials = [dict(BASELINE_PARAMS)]
+    seen = {json.dumps(BASELINE_PARAMS, sort_keys=True)}
+    attempts = 0
+    while len(trials) < n_trials and attempts < n_trials * 100:
+        attempts += 1
+        params = {name: values[rng.randint(len(values))] for name, values in SEARCH_SPACE.items()}
+        key = json.dumps(params, sort_keys=True)
+        if key not in seen:
+            seen.add(key)
+            trials.append(params)
+    return trials
+
+
+def booster_params(params: Dict[str, Any], spw: float, nthread: int, seed: int) -> Dict[str, Any]:
+    """Native XGBoost parameters for a configuration."""
+    return dict(
+        params,
+        objective="binary:logistic",
+        eval_metric=["auc", "logloss"],  # the last one drives early stopping
+        tree_method="hist",
+        scale_pos_weight=spw,
+        nthread=nthread,
+        seed=seed
+    )
+
+
+def run_trial(params: Dict[str, Any], folds: List[Dict[str, Any]], max_estimators: int,
+              early_stopping_rounds: int, nthread: int = 1, seed: int = 42) -> Dict[str, Any]:
+    """
+    Cross-validate one configuration on the cached folds.
+
+    Args:
+        params: Hyperparameters
+        folds: Output of ``build_folds``
+        max_estimators: Upper bound on boosting rounds
+        early_stopping_rounds: Rounds without validation log-loss improvement
+                               before a fold stops
+        nthread: Threads used by this trial
+        seed: XGBoost random seed
+
+    Returns:
+        Dict: Parameters, mean/std validation log loss and AUC at the best
+              iteration, best iteration per fold and wall time
+    """
+    import xgboost as xgb
+
+    start = time.perf_counter()
+    log_losses, aucs, best_iterations = [], [], []
+    for fold in folds:
+        history: Dict[str, Dict[str, List[float]]] = {}
+        booster = xgb.train(
+            booster_params(params, fold["scale_pos_weight"], nthread, seed),
+            fold["train"],
+            num_boost_round=max_estimators,
+            evals=[(fold["valid"], "valid")],
+            early_stopping_rounds=early_stopping_rounds,
+            evals_result=history,
+            verbose_eval=False
+        )
+        best = booster.best_iteration
+        best_iterations.append(best + 1)
+        log_losses.append(history["valid"]["logloss"][best])
+        aucs.append(history["valid"]["auc"][best])
+
+    return {
+        "params": params,
+        "valid_logloss": float(np.mean(log_losses)),
+        "valid_logloss_std": float(np.std(log_losses)),
+        "valid_auc": float(np.mean(aucs)),
+        "best_iterations": best_iterations,
+        "seconds": time.perf_counter() - start
+    }
+
+
+def search(folds: List[Dict[str, Any]], trials: List[Dict[str, Any]], max_estimators: int = 1000,
+           early_stopping_rounds: int = 50, n_jobs: int = -1, seed: int = 42) -> List[Dict[str, Any]]:
+    """
+    Evaluate configurations in parallel, best (lowest log loss) first.
+
+    XGBoost releases the GIL while training, so trials run on threads that
+    share the cached fold matrices; cores are split evenly between them.
+
+    Args:
+        folds: Output of ``build_folds``
+        trials: Configurations to evaluate
+        max_estimators: Upper bound on boosting rounds
+        early_stopping_rounds: Early stopping patience
+        n_jobs: Concurrent trials (-1: one per core)
+        seed: XGBoost random seed
+
+    Returns:
+        List[Dict]: ``run_trial`` results sorted by validation log loss
+    """
+    cores = os.cpu_count() or 1
+    workers = min(len(trials), cores if n_jobs is None or n_jobs < 1 else n_jobs)
+    nthread = max(1, cores // workers)
+    logger.info(f"Running {len(trials)} trials on {workers} workers with {nthread} threads each")
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(
+            lambda params: run_trial(params, folds, max_estimators, early_stopping_rounds, nthread, seed),
+            trials
+        ))
+    for trial, result in enumerate(results):
+        result["trial"] = trial
+    return sorted(results, key=lambda result: result["valid_logloss"])
+
+
+def evaluate(y_true: np.ndarray, probabilities: np.ndarray, threshold: float = 0.5) -> Dict[str, Any]:
+    """
+    Hold-out classification metrics at a decision threshold.
+
+    Args:
+        y_true: True labels
+        probabilities: Predicted exoplanet probabilities
+        threshold: Probability above which a row is classified positive
+
+    Returns:
+        Dict: Accuracy, precision, recall, F1, ROC AUC, PR AUC and the
+              confusion matrix
+    """
+    from sklearn.metrics import (
+        accuracy_score, average_precision_score, confusion_matrix,
+        f1_score, precision_score, recall_score, roc_auc_score
+    )
+
+    y_pred = (probabilities > threshold).astype(np.int64)
+    return {
+        "threshold": threshold,
+        "accuracy": float(accuracy_score(y_true, y_pred)),
+        "precision": float(precision_score(y_true, y_pred, zero_division=0)),
+        "recall": float(recall_score(y_true, y_pred, zero_division=0)),
+        "f1": float(f1_score(y_true, y_pred, zero_division=0)),
+        "roc_auc": float(roc_auc_score(y_true, probabilities)),
+        "pr_auc": float(average_precision_score(y_true, probabilities)),
+        "confusion_matrix": confusion_matrix(y_true, y_pred).tolist()
+    }
+
+
+def train(data_path: str, output_dir: str, version: Optional[str] = None, n_trials: int = 20,
+          n_folds: int = 5, n_jobs: int = -1, max_estimators: int = 1000,
+          early_stopping_rounds: int = 50, decision_threshold: float = 0.5,
+          seed: int = 42, max_rows: Optional[int] = None,
+          cache_dir: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Run the full training pipeline and write a versioned artifact directory.
+
+    Args:
+        data_path: Cumulative KOI catalog CSV
+        output_dir: Parent directory of the version directories
+        version: Version name (default: UTC timestamp)
+        n_trials: Hyperparameter configurations to evaluate
+        n_folds: Grouped cross-validation folds
+        n_jobs: Concurrent trials (-1: one per core)
+        max_estimators: Upper bound on boosting rounds
+        early_stopping_rounds: Early stopping patience
+        decision_threshold: Threshold stored with the model
+        seed: Seed of the splits, the search and XGBoost
+        max_rows: Only use the first rows of the catalog (for quick runs)
+        cache_dir: Preprocessed dataset cache (see ``dataset_cache``)
+
+    Returns:
+        Dict: The metrics report, also written as ``metrics.json``
+    """
+    import joblib
+    import pandas as pd
+    import xgboost as xgb
+    from sklearn.preprocessing import StandardScaler
+
+    from model_bundle import write_bundle
+
+    timings: Dict[str, float] = {}
+    started = time.perf_counter()
+    version = version or datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S")
+    version_dir = Path(output_dir) / version
+    if version_dir.exists():
+        raise FileExistsError(f"Model version {version_dir} already exists")
+
+    stage = time.perf_counter()
+    dataset = load_dataset(data_path, cache_dir)
+    rows = slice(None, max_rows)
+    X, y, groups = dataset.X[rows], np.asarray(dataset.y[rows]), dataset.groups[rows]
+    features = dataset.features
+    train_idx, test_idx = holdout_split(y, groups, seed=seed)
+    timings["load_seconds"] = time.perf_counter() - stage
+    logger.info(f"Loaded {len(y)} rows ({len(train_idx)} train, {len(test_idx)} test) with {len(features)} features")
+
+    stage = time.perf_counter()
+    folds = build_folds(X[train_idx], y[train_idx], groups[train_idx], n_folds)
+    timings["fold_cache_seconds"] = time.perf_counter() - stage
+
+    stage = time.perf_counter()
+    results = search(folds, sample_params(n_trials, seed), max_estimators, early_stopping_rounds, n_jobs, seed)
+    timings["search_seconds"] = time.perf_counter() - stage
+    best = results[0]
+    n_estimators = int(round(np.mean(best["best_iterations"])))
+    logger.info(f"Best trial {best['trial']}: log loss {best['valid_logloss']:.4f}, "
+                f"AUC {best['valid_auc']:.4f}, {n_estimators} trees")
+
+    # Refit on the whole training split with the notebook's preprocessing
+    stage = time.perf_counter()
+    # Fitted on a frame, like the notebook's scaler, so the feature names
+    # travel with it and ExoplanetDetector's frames transform without warnings
+    train_frame = pd.DataFrame(X[train_idx], columns=features)
+    scaler = StandardScaler().fit(train_frame)
+    model = xgb.XGBClassifier(
+        n_estimators=n_estimators,
+        tree_method="hist",
+        eval_metric="logloss",
+        scale_pos_weight=scale_pos_weight(y[train_idx]),
+        random_state=seed,
+        n_jobs=-1,
+        **best["params"]
+    )
+    model.fit(scaler.transform(train_frame), y[train_idx])
+    timings["refit_seconds"] = time.perf_counter() - stage
+
+    stage = time.perf_counter()
+    test_frame = pd.DataFrame(X[test_idx], columns=features)
+    probabilities = model.predict_proba(scaler.transform(test_frame))[:, 1]
+    holdout = evaluate(y[test_idx], probabilities, decision_threshold)
+    timings["evaluate_seconds"] = time.perf_counter() - stage
+
+    stage = time.perf_counter()
+    version_dir.mkdir(parents=True)
+    joblib.dump(model, version_dir / "exoplanet_detector_model.pkl")
+    joblib.dump(scaler, version_dir / "exoplanet_scaler.pkl")
+    with open(version_dir / "exoplanet_features.pkl", "wb") as f:
+        pickle.dump(features, f)
+    write_medians(str(version_dir / MEDIANS_FILENAME), features, np.asarray(dataset.medians))
+    write_bundle(str(version_dir / "exoplanet_model.bundle"), model, scaler, features,
+                 imputation_medians=np.asarray(dataset.medians), decision_threshold=decision_threshold)
+    timings["write_seconds"] = time.perf_counter() - stage
+    timings["total_seconds"] = time.perf_counter() - started
+
+    report = {
+        "version": version,
+        "created_at": datetime.now().isoformat(),
+        "data": {
+            "path": str(data_path),
+            "sha256": dataset.source_sha256,
+            "rows": int(len(y)),
+            "train_rows": int(len(train_idx)),
+            "test_rows": int(len(test_idx)),
+            "positive_fraction": float(y.mean())
+        },
+        "features": features,
+        "settings": {
+            "trials": n_trials,
+            "folds": n_folds,
+            "n_jobs": n_jobs,
+            "max_estimators": max_estimators,
+            "early_stopping_rounds": early_stopping_rounds,
+            "seed": seed,
+            "xgboost_version": xgb.__version__
+        },
+        "best": {
+            "params": best["params"],
+            "n_estimators": n_estimators,
+            "cv_logloss": best["valid_logloss"],
+            "cv_auc": best["valid_auc"]
+        },
+        "holdout": holdout,
+        "trials": results,
+        "timings": timings
+    }
+    with open(version_dir / "metrics.json", "w") as f:
+        json.dump(report, f, indent=2)
+    logger.info(f"Wrote model version {version_dir} in {timings['total_seconds']:.1f}s")
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Train the exoplanet detector from the cumulative KOI catalog.")
+    parser.add_argument("data", help="Cumulative KOI catalog CSV")
+    parser.add_argument("output_dir", help="Directory receiving the versioned artifacts")
+    parser.add_argument("--version", help="Version directory name (default: UTC timestamp)")
+    parser.add_argument("--trials", type=int, default=20, help="Hyperparameter configurations (default: 20)")
+    parser.add_argument("--folds", type=int, default=5, help="Grouped CV folds (default: 5)")
+    parser.add_argument("--n-jobs", type=int, default=-1, help="Concurrent trials (default: one per core)")
+    parser.add_argument("--max-estimators", type=int, default=1000)
+    parser.add_argument("--early-stopping-rounds", type=int, default=50)
+    parser.add_argument("--decision-threshold", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--dataset-cache", help="Preprocessed dataset cache directory")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+
+    report = train(
+        args.data,
+        args.output_dir,
+        version=args.version,
+        n_trials=args.trials,
+        n_folds=args.folds,
+        n_jobs=args.n_jobs,
+        max_estimators=args.max_estimators,
+        early_stopping_rounds=args.early_stopping_rounds,
+        decision_threshold=args.decision_threshold,
+        seed=args.seed,
+        cache_dir=args.dataset_cache
+    )
+
+    holdout = report["holdout"]
+    print("-" * 50)
+    print(f"Version:            {report['version']}")
+    print(f"Best parameters:    {report['best']['params']} ({report['best']['n_estimators']} trees)")
+    print(f"CV log loss / AUC:  {report['best']['cv_logloss']:.4f} / {report['best']['cv_auc']:.4f}")
+    print(f"Hold-out accuracy:  {holdout['accuracy']:.4f}")
+    print(f"Hold-out F1:        {holdout['f1']:.4f}")
+    print(f"Hold-out ROC AUC:   {holdout['roc_auc']:.4f}")
+    for name, seconds in report["timings"].items():
+        print(f"  {name.replace('_seconds', ''):<12} {seconds:.2f}s")
+
+
+if __name__ == "__main__":
+    main()